@@ -1212,6 +1212,73 @@ class UnifiedAdminService:
                 'timestamp': datetime.now().isoformat()
             }
 
+    def _local_caches(self) -> Dict[str, Any]:
+        """Local analysis caches by name (None when a cache is disabled)"""
+        from cache_store import get_conflict_verdict_cache, get_analysis_result_cache, get_llm_response_cache
+        
+        return {
+            'conflict_verdicts': get_conflict_verdict_cache(),
+            'analysis_results': get_analysis_result_cache(),
+            'llm_responses': get_llm_response_cache()
+        }
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Get hit/miss statistics for local analysis caches"""
+        try:
+            caches = {}
+            for name, cache in self._local_caches().items():
+                caches[name] = cache.get_stats() if cache else {'enabled': False}
+            
+            return {
+                'caches': caches,
+                'timestamp': datetime.now().isoformat()
+            }
+            
+        except Exception as e:
+            print(f"❌ Error getting cache stats: {e}")
+            return {
+                'caches': {},
+                'error': str(e),
+                'timestamp': datetime.now().isoformat()
+            }
+
+    def invalidate_cache(self, cache_name: str, cache_key: Optional[str] = None) -> Dict[str, Any]:
+        """Invalidate one entry (or every entry) of a local analysis cache"""
+        try:
+            caches = self._local_caches()
+            if cache_name not in caches:
+                return {
+                    'success': False,
+                    'message': f'Unknown cache: {cache_name}',
+                    'action': 'invalidate_cache',
+                    'timestamp': datetime.now().isoformat()
+                }
+            
+            cache = caches[cache_name]
+            removed = cache.invalidate(cache_key) if cache else 0
+            
+            target = f'{cache_name}:{cache_key}' if cache_key else cache_name
+            self._log_admin_action('invalidate_cache', target, f'Removed {removed} cache entries', True)
+            
+            return {
+                'success': True,
+                'message': f'Removed {removed} entries from {cache_name} cache',
+                'action': 'invalidate_cache',
+                'cache': cache_name,
+                'removed_entries': removed,
+                'timestamp': datetime.now().isoformat()
+            }
+            
+        except Exception as e:
+            self._log_admin_action('invalidate_cache', cache_name,
+                                   f'Cache invalidation failed: {str(e)}', False)
+            return {
+                'success': False,
+                'message': f'Failed to invalidate cache: {str(e)}',
+                'action': 'invalidate_cache',
+                'timestamp': datetime.now().isoformat()
+            }
+
     def acknowledge_alert(self, alert_id: str) -> Dict[str, Any]:
         """Acknowledge a specific alert"""
         try:
@@ -1491,6 +1558,25 @@ def register_admin_routes(app, config):
                 'timestamp': datetime.now().isoformat()
             }), 500
 
+    @admin_bp.route('/actions/invalidate-cache', methods=['POST'])
+    def invalidate_cache():
+        """Invalidate a local analysis cache (whole cache or a single key)"""
+        try:
+            data = request.get_json() or {}
+            cache_name = data.get('cache', 'analysis_results')
+            cache_key = data.get('key')
+            
+            result = admin_service.invalidate_cache(cache_name, cache_key)
+            status_code = 200 if result['success'] else 400
+            return jsonify(result), status_code
+        except Exception as e:
+            return jsonify({
+                'success': False,
+                'message': f'Failed to invalidate cache: {str(e)}',
+                'action': 'invalidate_cache',
+                'timestamp': datetime.now().isoformat()
+            }), 500
+
     @admin_bp.route('/actions/export-logs', methods=['POST'])
     def export_logs():
         """Export system logs"""
@@ -1560,6 +1646,24 @@ def register_admin_routes(app, config):
                 'timestamp': datetime.now().isoformat()
             }), 500
 
+    @admin_bp.route('/stats/cache', methods=['GET'])
+    def get_cache_stats():
+        """Get local cache hit/miss statistics"""
+        try:
+            stats = admin_service.get_cache_stats()
+            return jsonify({
+                'success': True,
+                'data': stats,
+                'timestamp': datetime.now().isoformat()
+            }), 200
+        except Exception as e:
+            return jsonify({
+                'success': False,
+                'message': f'Failed to get cache stats: {str(e)}',
+                'action': 'get_cache_stats',
+                'timestamp': datetime.now().isoformat()
+            }), 500
+
     @admin_bp.route('/test/create-session', methods=['POST'])
     def create_test_session():
         """Create a test session for testing dashboard statistics (development only)"""
@@ -14,6 +14,8 @@ from datetime import datetime
 class AMSPAnalyzer(AnalyzerOutputStandardizer):
     """AMSP Anti-Malware Log Analyzer with Intelligent Processing and AI/ML/RAG Integration"""
     
+    ANALYZER_VERSION = '2'
+    
     def __init__(self, session_manager=None, session_id=None, rag_system=None, ml_analyzer=None):
         """Initialize with optional progress tracking, RAG system, ML analyzer, and intelligent processor"""
         self.session_manager = session_manager
@@ -649,7 +651,7 @@ class AMSPAnalyzer(AnalyzerOutputStandardizer):
                         
                         from dynamic_rag_system import apply_dynamic_rag_to_analysis
                         self._update_progress('Dynamic RAG & AI Intelligence', 'Processing with Claude AI...', 80)
-                        results = apply_dynamic_rag_to_analysis(results, log_content)
+                        results = apply_dynamic_rag_to_analysis(results, log_content, analyzer='amsp_logs')
                         self._update_progress('Dynamic RAG & AI Intelligence', 'Dynamic RAG analysis completed', 90)
                         
                         dynamic_rag = results.get('dynamic_rag_analysis', {})
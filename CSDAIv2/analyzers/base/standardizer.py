@@ -9,6 +9,31 @@ from ..shared_imports import *
 class AnalyzerOutputStandardizer:
     """Mixin class for standardizing analyzer output structures"""
     
+    # Every analyzer sets its own ANALYZER_VERSION and bumps it whenever its output
+    # changes, so results cached under the old version are not reused
+    
+    # Set when an AI call failed and the analyzer fell back to rule-based output
+    ai_degraded = False
+    
+    @classmethod
+    def analyzer_versions(cls) -> Dict[str, str]:
+        """Versions that the analyzer's output depends on, by class name"""
+        return {cls.__name__: cls.ANALYZER_VERSION}
+    
+    @staticmethod
+    def _has_ai_degraded_marker(data) -> bool:
+        """Whether any nested result carries 'ai_degraded': True (dynamic RAG and sub-analyzer results)"""
+        stack = [data]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, dict):
+                if item.get('ai_degraded') is True:
+                    return True
+                stack.extend(value for value in item.values() if isinstance(value, (dict, list, tuple)))
+            elif isinstance(item, (list, tuple)):
+                stack.extend(value for value in item if isinstance(value, (dict, list, tuple)))
+        return False
+    
     def _standardize_analyzer_output(self, raw_results, analysis_type):
         """Standardize analyzer output structure for frontend compatibility"""
         try:
@@ -42,6 +67,9 @@ class AnalyzerOutputStandardizer:
                 'status': 'completed',
                 'timestamp': datetime.now().isoformat(),
                 
+                # AI fallback output is served but never cached
+                'ai_degraded': bool(self.ai_degraded or self._has_ai_degraded_marker(raw_results)),
+                
                 # Core data - standardized fields with safe extraction
                 'summary': self._extract_summary(raw_results),
                 'details': self._extract_details(raw_results),
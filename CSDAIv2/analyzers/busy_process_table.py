@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+"""
+Busy Process Table - Columnar engine for TopNBusyProcess.txt snapshots
+Parses every "Top N Busy Proc" block into one pandas table and derives per-process
+scan-count / CPU trend statistics with vectorized group-bys
+"""
+
+from .shared_imports import *
+
+try:
+    import numpy as np
+    import pandas as pd
+    PANDAS_AVAILABLE = True
+except ImportError:
+    PANDAS_AVAILABLE = False
+    print("⚠️ pandas/numpy not available - TopNBusyProcess trend statistics disabled")
+
+# "Top 10 Busy Proc [3]:" - the bracketed rank restarting marks a new snapshot
+SNAPSHOT_HEADER_PATTERN = re.compile(r'^Top\s+\d+\s+Busy\s+Proc(?:\s*\[(\d+)\])?', re.IGNORECASE)
+
+# Raw keys mapped onto the fixed table columns
+CORE_FIELD_MAP = {
+    'name': 'process',
+    'count': 'scan_count',
+    'pid': 'pid',
+    'processid': 'pid',
+    'process id': 'pid',
+    'cpu': 'cpu',
+    'cpu%': 'cpu',
+    'cpu usage': 'cpu',
+}
+
+CORE_COLUMNS = ['snapshot', 'rank', 'process', 'pid', 'cpu', 'scan_count']
+EVENT_COLUMN_PREFIX = 'AMSP_EVENT_ID_'
+MAX_LINE_LENGTH = 1000
+
+# Relative change in scan count across the capture needed to call a trend
+TREND_THRESHOLD = 0.10
+
+
+def parse_busy_process_snapshots(txt_path: str) -> 'pd.DataFrame':
+    """
+    Stream TopNBusyProcess.txt into a table with one row per (snapshot, process)
+
+    Columns: snapshot, rank, process, pid, cpu, scan_count plus any AMSP_EVENT_ID_*
+    counters and other key/value fields found in the file. Numeric columns are
+    converted in bulk once the file has been read.
+    """
+    rows = []
+    proc = None
+    snapshot = 0
+    last_rank = 0
+
+    with open(txt_path, 'r', encoding='utf-8', errors='ignore') as f:
+        for line in f:
+            line = line.strip()
+            header = SNAPSHOT_HEADER_PATTERN.match(line)
+            if header:
+                if proc:
+                    rows.append(proc)
+                rank = int(header.group(1)) if header.group(1) else last_rank + 1
+                # Ranks restart at the top of every capture interval
+                if rank <= last_rank:
+                    snapshot += 1
+                last_rank = rank
+                proc = {'snapshot': snapshot, 'rank': rank}
+            elif proc is not None and "=" in line and len(line) < MAX_LINE_LENGTH:
+                key, val = line.split("=", 1)
+                key = key.strip()
+                val = val.strip()
+                if key and val:
+                    proc[CORE_FIELD_MAP.get(key.lower(), key)] = val
+
+    if proc:
+        rows.append(proc)
+
+    table = pd.DataFrame(rows)
+    for column in CORE_COLUMNS:
+        if column not in table.columns:
+            table[column] = np.nan
+
+    if table.empty:
+        return table
+
+    # Sanitize each distinct process name once rather than per row
+    table['process'] = table['process'].fillna('').astype(str)
+    unique_names = table['process'].unique()
+    table['process'] = table['process'].map({n: sanitize_process_name(n) for n in unique_names})
+
+    numeric_columns = ['pid', 'cpu', 'scan_count'] + [c for c in table.columns if c.startswith(EVENT_COLUMN_PREFIX)]
+    for column in numeric_columns:
+        table[column] = pd.to_numeric(
+            table[column].astype(str).str.replace(',', '', regex=False).str.rstrip('%'),
+            errors='coerce'
+        )
+
+    return table
+
+
+def combine_snapshot_tables(tables: List['pd.DataFrame']) -> 'pd.DataFrame':
+    """Concatenate tables from several captures, keeping snapshot indices distinct"""
+    combined = []
+    offset = 0
+    for table in tables:
+        if table is None or table.empty:
+            continue
+        combined.append(table.assign(snapshot=table['snapshot'] + offset))
+        offset += int(table['snapshot'].max()) + 1
+
+    if not combined:
+        return pd.DataFrame(columns=CORE_COLUMNS)
+    return pd.concat(combined, ignore_index=True, sort=False)
+
+
+def summarize_process_trends(table: 'pd.DataFrame') -> 'pd.DataFrame':
+    """
+    Aggregate per-process statistics across all snapshots
+
+    Returns one row per process (keyed on lowercased name) ordered by exclusion
+    priority: peak scan count, then how persistently the process stays busy.
+    """
+    if table is None or table.empty:
+        return pd.DataFrame()
+
+    df = table.assign(process_key=table['process'].str.strip().str.lower())
+    df = df[df['process_key'] != '']
+    if df.empty:
+        return pd.DataFrame()
+
+    total_snapshots = df['snapshot'].nunique()
+    grouped = df.groupby('process_key', sort=False)
+
+    summary = grouped.agg(
+        process=('process', 'last'),
+        snapshots_seen=('snapshot', 'nunique'),
+        first_snapshot=('snapshot', 'min'),
+        last_snapshot=('snapshot', 'max'),
+        best_rank=('rank', 'min'),
+        mean_count=('scan_count', 'mean'),
+        peak_count=('scan_count', 'max'),
+        last_count=('scan_count', 'last'),
+    )
+    summary['p95_count'] = grouped['scan_count'].quantile(0.95)
+    summary['presence_ratio'] = summary['snapshots_seen'] / total_snapshots
+
+    if df['cpu'].notna().any():
+        summary['mean_cpu'] = grouped['cpu'].mean()
+        summary['peak_cpu'] = grouped['cpu'].max()
+        summary['p95_cpu'] = grouped['cpu'].quantile(0.95)
+
+    if df['pid'].notna().any():
+        summary['pid_count'] = grouped['pid'].nunique()
+
+    event_columns = [c for c in df.columns if c.startswith(EVENT_COLUMN_PREFIX)]
+    if event_columns:
+        summary = summary.join(grouped[event_columns].max())
+
+    # Least-squares slope of scan count over snapshot index, built from grouped sums
+    points = df.loc[df['scan_count'].notna(), ['process_key', 'snapshot', 'scan_count']]
+    x = points['snapshot'].astype(float)
+    y = points['scan_count'].astype(float)
+    sums = points.assign(n=1.0, x=x, y=y, xx=x * x, xy=x * y).groupby('process_key')[['n', 'x', 'y', 'xx', 'xy']].sum()
+    denominator = sums['n'] * sums['xx'] - sums['x'] ** 2
+    slope = (sums['n'] * sums['xy'] - sums['x'] * sums['y']) / denominator.where(denominator != 0)
+    summary['count_slope'] = slope.reindex(summary.index).fillna(0.0)
+
+    # Projected change across the whole capture relative to the mean
+    span = (summary['last_snapshot'] - summary['first_snapshot']).astype(float)
+    relative_change = (summary['count_slope'] * span) / summary['mean_count'].where(summary['mean_count'] > 0)
+    summary['count_trend'] = np.select(
+        [summary['snapshots_seen'] < 2, relative_change > TREND_THRESHOLD, relative_change < -TREND_THRESHOLD],
+        ['single snapshot', 'rising', 'falling'],
+        default='stable'
+    )
+
+    summary = summary.sort_values(
+        ['peak_count', 'snapshots_seen', 'best_rank'],
+        ascending=[False, False, True],
+        na_position='last'
+    )
+    return summary
+
+
+def busy_process_records(summary: 'pd.DataFrame') -> List[Dict[str, Any]]:
+    """Convert the ranked summary into the Name/Count dicts consumed by ResourceAnalyzer"""
+    if summary is None or summary.empty:
+        return []
+
+    records = []
+    event_columns = [c for c in summary.columns if c.startswith(EVENT_COLUMN_PREFIX)]
+    optional_columns = [c for c in ('mean_cpu', 'peak_cpu', 'p95_cpu', 'pid_count') if c in summary.columns]
+
+    for row in summary.itertuples():
+        peak_count = getattr(row, 'peak_count')
+        record = {
+            'Name': row.process,
+            'Count': str(int(peak_count)) if pd.notna(peak_count) else 'N/A',
+        }
+        for column in event_columns:
+            value = getattr(row, column)
+            if pd.notna(value):
+                record[column] = str(int(value))
+
+        record['snapshots_seen'] = int(row.snapshots_seen)
+        record['presence_ratio'] = round(float(row.presence_ratio), 3)
+        record['mean_count'] = round(float(row.mean_count), 1) if pd.notna(row.mean_count) else None
+        record['p95_count'] = round(float(row.p95_count), 1) if pd.notna(row.p95_count) else None
+        record['count_trend'] = row.count_trend
+        for column in optional_columns:
+            value = getattr(row, column)
+            if pd.notna(value):
+                record[column] = round(float(value), 2)
+        records.append(record)
+
+    return records
@@ -6,10 +6,17 @@ Extracted from analyzers.py lines 1825-2215 with safety enhancements
 
 from .shared_imports import *
 from .base.standardizer import AnalyzerOutputStandardizer
+from cache_store import get_conflict_verdict_cache
+from typing import Optional
+
+# First line the prompt asks the model to start its answer with
+VERDICT_HEADERS = ('CONFLICTS DETECTED', 'NO CONFLICTS DETECTED')
 
 class ConflictAnalyzer(AnalyzerOutputStandardizer):
     """AntiVirus Conflict Analyzer"""
     
+    ANALYZER_VERSION = '2'
+    
     def __init__(self, session_manager=None, session_id=None, rag_system=None, ml_analyzer=None):
         """Initialize with optional progress tracking, RAG system, and ML analyzer"""
         self.session_manager = session_manager
@@ -20,26 +27,8 @@ class ConflictAnalyzer(AnalyzerOutputStandardizer):
     def extract_processes_from_xml(self, xml_path: str) -> List[str]:
         """Extract process names from RunningProcesses.xml"""
         try:
-            validate_xml_content(xml_path)
-            
-            with open(xml_path, 'rb') as f:
-                content = f.read()
-            
-            root = ET.fromstring(content)
-            processes = []
-            
-            host_metadata_elements = root.findall(".//HostMetaData")
-            
-            for host in host_metadata_elements:
-                for attr in host.findall(".//Attribute"):
-                    if attr.attrib.get("name") == "process":
-                        proc_name = attr.attrib.get("value")
-                        if proc_name:
-                            sanitized_name = sanitize_process_name(proc_name)
-                            if sanitized_name:
-                                processes.append(sanitized_name)
-            
-            return processes
+            # Single streaming validate+extract pass, shared with other analyzers on the same file
+            return extract_running_processes(xml_path)
             
         except SecurityError as e:
             raise SecurityError(f"XML processing failed: {str(e)}")
@@ -206,6 +195,16 @@ class ConflictAnalyzer(AnalyzerOutputStandardizer):
             if not config.OPENAI_API_KEY:
                 return "OpenAI API key not configured"
             
+            # PERFORMANCE OPTIMIZATION: Reuse verdicts for previously seen AV process sets
+            verdict_cache = get_conflict_verdict_cache()
+            cache_key = None
+            if verdict_cache:
+                cache_key = verdict_cache.key_for(av_focused_processes, config.OPENAI_MODEL)
+                cached_text = verdict_cache.get(cache_key)
+                if cached_text:
+                    print(f"⚡ Conflict verdict cache hit for {len(av_focused_processes)} processes")
+                    return cached_text
+            
             try:
                 # PERFORMANCE OPTIMIZATION: Increased timeout and optimized client settings
                 client = OpenAI(
@@ -214,6 +213,7 @@ class ConflictAnalyzer(AnalyzerOutputStandardizer):
                     timeout=60.0  # Increased from 30 to 60 seconds
                 )
             except Exception as e:
+                self.ai_degraded = True
                 return f"Failed to initialize OpenAI client: {str(e)}"
                 
             # PERFORMANCE OPTIMIZATION: Streamlined prompt for faster processing
@@ -254,6 +254,7 @@ class ConflictAnalyzer(AnalyzerOutputStandardizer):
                 )
                 
                 text = response.choices[0].message.content
+                finish_reason = response.choices[0].finish_reason
                 
             except Exception as api_error:
                 # FALLBACK: If AI fails, provide basic analysis
@@ -261,14 +262,29 @@ class ConflictAnalyzer(AnalyzerOutputStandardizer):
             
             conflicts = self.parse_conflict_response(text)
             
+            # Only cache complete responses that open with a verdict header, so truncated ones are retried
+            if verdict_cache and cache_key and finish_reason == 'stop' and self._verdict_header(text):
+                verdict_cache.set(cache_key, text, {
+                    'process_count': len(av_focused_processes),
+                    'conflicts_count': len(conflicts),
+                    'model': config.OPENAI_MODEL
+                })
+            
             # Return just the raw AI response text, not HTML formatted
             return text
             
         except Exception as e:
             return self._fallback_analysis(av_focused_processes)
             
+    @staticmethod
+    def _verdict_header(text: Optional[str]) -> Optional[str]:
+        """The response's first line when it is exactly one of the two verdict headers"""
+        first_line = (text or '').strip().split('\n', 1)[0].strip().strip('*#').strip().upper()
+        return first_line if first_line in VERDICT_HEADERS else None
+    
     def _fallback_analysis(self, av_focused_processes: List[str]) -> str:
         """Fallback analysis when AI times out - basic pattern matching with EDR exclusion"""
+        self.ai_degraded = True
         known_av_patterns = {
             'norton': 'Norton/Symantec',
             'mcafee': 'McAfee',
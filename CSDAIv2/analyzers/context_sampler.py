@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+"""
+Context Sampler - Importance-weighted, fixed-budget log sampling for ML/RAG context
+A single pass keeps a weighted reservoir of lines (severity x template rarity x recency)
+plus the latest occurrence of every error template, then renders them in file order
+within a byte budget
+"""
+
+import re
+import math
+import heapq
+import random
+from typing import Iterable, List, Optional, Tuple
+
+SEVERITY_WEIGHTS = {'critical': 16.0, 'error': 8.0, 'warning': 3.0, 'info': 1.0}
+SEVERITY_RANK = {'critical': 3, 'error': 2, 'warning': 1, 'info': 0}
+
+# Cheap substring screen first; the word-boundary pattern only runs on candidate lines
+SEVERITY_KEYWORDS = ('crit', 'fatal', 'panic', 'crash', 'err', 'fail', 'exception', 'denied', 'time', 'warn', 'retry')
+SEVERITY_PATTERN = re.compile(
+    r'\b(?:(critical|fatal|panic|crash(?:ed)?)'
+    r'|(errors?|fail(?:ed|ure|s)?|exception|denied|timeout|timed out)'
+    r'|(warn(?:ing)?|retry(?:ing)?))\b',
+    re.IGNORECASE
+)
+SEVERITY_GROUPS = ('critical', 'error', 'warning')
+
+# Templates: digits become '#', then every token containing them collapses to '*'
+# (timestamps, ids, hex values, addresses and numbered file names alike)
+DIGIT_TRANSLATION = str.maketrans('0123456789', '##########')
+TEMPLATE_VARIABLE_PATTERN = re.compile(r'#[#\w.:-]*')
+TEMPLATE_MAX_CHARS = 200
+
+MAX_LINE_CHARS = 400
+
+# State held during the pass is sized from the sampler's byte budget: candidate text is
+# capped at CANDIDATE_BUDGET_MULTIPLE budgets (LINES_PER_TEMPLATE lines per tracked template),
+# and error coverage at the number of COVERAGE_LINE_BYTES lines the budget could render
+CANDIDATE_BUDGET_MULTIPLE = 64
+LINES_PER_TEMPLATE = 4
+COVERAGE_LINE_BYTES = 32
+OVERFLOW_TEMPLATE = '\x00overflow'
+
+# Weight multiplier for the last line of a file relative to the first
+RECENCY_BOOST = 4.0
+
+
+def line_severity(line: str) -> str:
+    """Highest severity keyword found in a line"""
+    lowered = line.lower()
+    if not any(keyword in lowered for keyword in SEVERITY_KEYWORDS):
+        return 'info'
+    best = None
+    for match in SEVERITY_PATTERN.finditer(line):
+        group = match.lastindex - 1
+        if group == 0:
+            return 'critical'
+        if best is None or group < best:
+            best = group
+    return SEVERITY_GROUPS[best] if best is not None else 'info'
+
+
+def line_template(line: str) -> str:
+    """Line with timestamps, identifiers and numbers masked"""
+    return TEMPLATE_VARIABLE_PATTERN.sub('*', line[:TEMPLATE_MAX_CHARS * 2].translate(DIGIT_TRANSLATION))[:TEMPLATE_MAX_CHARS]
+
+
+class ImportanceSampler:
+    """
+    One-pass importance sampler producing a context of at most budget_bytes
+
+    The budget also bounds memory: templates beyond max_templates share one overflow
+    bucket and error templates beyond max_coverage are not covered.
+
+    Sampling is an exponential race (Efraimidis-Spirakis): every line draws
+    key = Exp(1) / weight with weight = severity x recency / template frequency,
+    and the smallest keys that fit the budget win. Template frequency is only known
+    at the end, but it is constant within a template, so each template keeps its
+    LINES_PER_TEMPLATE best severity x recency keys during the pass and the
+    frequency term is applied when rendering - the result is the exact race.
+    Keys are kept in log space so the recency boost never overflows.
+    """
+
+    def __init__(self, budget_bytes: int = 10000, seed: Optional[str] = None):
+        self.budget_bytes = budget_bytes
+        self.max_templates = max(1, budget_bytes * CANDIDATE_BUDGET_MULTIPLE // (LINES_PER_TEMPLATE * MAX_LINE_CHARS))
+        self.max_coverage = max(1, budget_bytes // COVERAGE_LINE_BYTES)
+        self.random = random.Random(seed)
+        self.line_count = 0
+        self._log_recency = math.log(RECENCY_BOOST)
+        self._log_severity = {severity: math.log(weight) for severity, weight in SEVERITY_WEIGHTS.items()}
+
+        # template -> [count, heap of (-log_key, line_no, text)]
+        self.templates = {}
+
+        # template -> [line_no, text, count, severity] for every error/critical template
+        self.coverage = {}
+
+    def add(self, line: str, position: float = 0.0):
+        """Offer the next line; position is its relative offset in the file (0..1)"""
+        line = line.rstrip('\r\n')
+        if not line.strip():
+            return
+        self.line_count += 1
+        line_no = self.line_count
+        text = line[:MAX_LINE_CHARS]
+
+        severity = line_severity(line)
+        template = line_template(line)
+
+        bucket = self.templates.get(template)
+        if bucket is None:
+            if len(self.templates) >= self.max_templates:
+                template = OVERFLOW_TEMPLATE
+                bucket = self.templates.setdefault(template, [0, []])
+            else:
+                bucket = self.templates[template] = [0, []]
+        bucket[0] += 1
+
+        if SEVERITY_RANK[severity] >= SEVERITY_RANK['error']:
+            covered = self.coverage.get(template)
+            if covered is not None:
+                # Keep the latest occurrence - failures tend to be near the end
+                covered[0], covered[1], covered[2] = line_no, text, covered[2] + 1
+            elif len(self.coverage) < self.max_coverage:
+                self.coverage[template] = [line_no, text, 1, severity]
+
+        log_key = (
+            math.log(self.random.expovariate(1.0) or 1e-300)
+            - self._log_severity[severity]
+            - self._log_recency * min(max(position, 0.0), 1.0)
+        )
+
+        # Per-template max-heap on log key (negated): the root is the weakest candidate
+        candidates = bucket[1]
+        if len(candidates) < LINES_PER_TEMPLATE:
+            heapq.heappush(candidates, (-log_key, line_no, text))
+        elif log_key < -candidates[0][0]:
+            heapq.heapreplace(candidates, (-log_key, line_no, text))
+
+    def render(self, budget_bytes: Optional[int] = None) -> str:
+        """Selected lines in file order, prefixed with line numbers, within the byte budget"""
+        budget_bytes = self.budget_bytes if budget_bytes is None else budget_bytes
+        selected = {}
+        used = 0
+
+        def take(line_no: int, text: str) -> bool:
+            nonlocal used
+            if line_no in selected:
+                return True
+            rendered = f"L{line_no}: {text}"
+            size = len(rendered.encode('utf-8', errors='ignore')) + 1
+            if used + size > budget_bytes:
+                return False
+            selected[line_no] = rendered
+            used += size
+            return True
+
+        # Guaranteed coverage first: most severe, then most recent templates
+        for line_no, text, count, severity in sorted(
+                self.coverage.values(), key=lambda item: (-SEVERITY_RANK[item[3]], -item[0])):
+            take(line_no, f"{text} [x{count}]" if count > 1 else text)
+
+        # Then the race winners, with the template frequency term applied
+        candidates = [
+            (math.log(count) - negated_key, line_no, text)
+            for count, template_candidates in self.templates.values()
+            for negated_key, line_no, text in template_candidates
+        ]
+        for _, line_no, text in sorted(candidates):
+            if used >= budget_bytes:
+                break
+            take(line_no, text)
+
+        return '\n'.join(selected[line_no] for line_no in sorted(selected))
+
+
+def build_sampler(lines: Iterable[str], total_size: Optional[int] = None, seed: Optional[str] = None,
+                  budget_bytes: int = 10000) -> ImportanceSampler:
+    """Run the single pass over a line stream; the sampler can then be rendered at up to budget_bytes"""
+    sampler = ImportanceSampler(budget_bytes, seed=seed)
+    consumed = 0
+    for line in lines:
+        consumed += len(line)
+        sampler.add(line, consumed / total_size if total_size else 0.0)
+    return sampler
+
+
+def sample_lines(lines: Iterable[str], budget_bytes: int, total_size: Optional[int] = None,
+                 seed: Optional[str] = None) -> str:
+    """Importance-sample an iterable of lines into at most budget_bytes of context"""
+    return build_sampler(lines, total_size, seed, budget_bytes).render(budget_bytes)
+
+
+def split_budget(budget_bytes: int, weights: List[Tuple[str, float]]) -> dict:
+    """Divide a byte budget between named sources proportionally to their weights"""
+    total = sum(weight for _, weight in weights)
+    if not total:
+        return {}
+    return {name: int(budget_bytes * weight / total) for name, weight in weights}
@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+"""
+Correlation Engine - Epoch-normalized event timeline for multi-log correlation
+Events are normalized once (epoch, source code, component code, severity code) and
+correlated with a sweep-line over the sorted epoch array plus counting arrays
+"""
+
+import re
+import calendar
+import warnings
+from datetime import datetime
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Iterable
+
+import numpy as np
+
+# Fast path for ISO-like timestamps: 2025-01-31 12:34:56(.789)
+ISO_TIMESTAMP_PATTERN = re.compile(r'^(\d{4})-(\d{2})-(\d{2})[ T](\d{2}):(\d{2}):(\d{2})(?:[.,](\d{1,6}))?')
+
+# Remaining formats accepted by the previous pairwise comparison, in the same order
+FALLBACK_TIMESTAMP_FORMATS = [
+    '%m/%d/%Y %I:%M:%S %p',
+    '%d/%m/%Y %H:%M:%S'
+]
+
+DEFAULT_WINDOW_SECONDS = 5 * 60
+
+
+@lru_cache(maxsize=65536)
+def parse_timestamp_epoch(timestamp: str) -> Optional[float]:
+    """Convert a log timestamp to epoch seconds (naive times treated as UTC), None if unparseable"""
+    if not timestamp:
+        return None
+
+    timestamp = timestamp.strip()
+    match = ISO_TIMESTAMP_PATTERN.match(timestamp)
+    if match:
+        year, month, day, hour, minute, second, fraction = match.groups()
+        try:
+            epoch = calendar.timegm((int(year), int(month), int(day), int(hour), int(minute), int(second)))
+        except (ValueError, OverflowError):
+            return None
+        if fraction:
+            epoch += int(fraction) / (10 ** len(fraction))
+        return float(epoch)
+
+    for fmt in FALLBACK_TIMESTAMP_FORMATS:
+        try:
+            parsed = datetime.strptime(timestamp, fmt)
+            return float(calendar.timegm(parsed.timetuple()))
+        except ValueError:
+            continue
+
+    return None
+
+
+class _Codebook:
+    """Dense integer codes for categorical values"""
+
+    def __init__(self):
+        self.codes = {}
+        self.values = []
+
+    def encode(self, value: str) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.codes[value] = code
+            self.values.append(value)
+        return code
+
+    def __len__(self):
+        return len(self.values)
+
+
+class CorrelationTimeline:
+    """Columnar event timeline shared by every log source in a diagnostic package"""
+
+    def __init__(self):
+        self._epochs = None
+        self._sources = []
+        self._components = []
+        self._severities = []
+        self._timestamps = []
+
+        self.source_codes = _Codebook()
+        self.component_codes = _Codebook()
+        self.severity_codes = _Codebook()
+
+    def __len__(self):
+        return len(self._timestamps)
+
+    def add_event(self, source: str, timestamp: str, component: str, severity: str):
+        """Append a single event (timestamps are converted to epoch in bulk on first use)"""
+        if timestamp and not isinstance(timestamp, str):
+            timestamp = str(timestamp)
+        self._epochs = None
+        self._sources.append(self.source_codes.encode(source))
+        self._components.append(self.component_codes.encode(component))
+        self._severities.append(self.severity_codes.encode(severity))
+        self._timestamps.append(timestamp)
+
+    def add_events(self, source: str, records: Iterable[Dict[str, Any]], severity: str,
+                   component_field: str = 'component', timestamp_field: str = 'timestamp'):
+        """Append analyzer records (dicts) from one source with a fixed severity"""
+        for record in records:
+            self.add_event(
+                source,
+                record.get(timestamp_field, ''),
+                record.get(component_field, ''),
+                severity
+            )
+
+    def add_event_table(self, source: str, timestamps: List[str], components, severities: List[str]):
+        """Append a batch of events given as columns (components may be one value for the whole batch)"""
+        self._epochs = None
+        count = len(timestamps)
+        self._sources.extend([self.source_codes.encode(source)] * count)
+        if isinstance(components, str):
+            self._components.extend([self.component_codes.encode(components)] * count)
+        else:
+            self._components.extend(self.component_codes.encode(c) for c in components)
+        self._severities.extend(self.severity_codes.encode(s) for s in severities)
+        self._timestamps.extend(timestamps)
+
+    def epochs(self) -> 'np.ndarray':
+        """Epoch seconds per event (NaN when unparseable), converted once per timeline"""
+        if self._epochs is not None:
+            return self._epochs
+
+        epochs = np.full(len(self._timestamps), np.nan)
+
+        # ISO timestamps go through numpy's vectorized datetime parser, the rest are parsed individually
+        iso_index = []
+        other_index = []
+        for i, ts in enumerate(self._timestamps):
+            if not ts:
+                continue
+            if len(ts) >= 19 and ts[4] == '-' and ts[10] in ' T':
+                iso_index.append(i)
+            else:
+                other_index.append(i)
+
+        if iso_index:
+            try:
+                with warnings.catch_warnings():
+                    warnings.simplefilter('ignore')
+                    parsed = np.array([self._timestamps[i] for i in iso_index], dtype='datetime64[us]')
+                epochs[iso_index] = parsed.astype(np.int64) / 1e6
+            except ValueError:
+                # Mixed or decorated ISO strings - fall back to per-string parsing
+                other_index.extend(iso_index)
+
+        for i in other_index:
+            epoch = parse_timestamp_epoch(self._timestamps[i])
+            if epoch is not None:
+                epochs[i] = epoch
+
+        self._epochs = epochs
+        return epochs
+
+    def timing_windows(self, window_seconds: int = DEFAULT_WINDOW_SECONDS) -> List[Dict[str, Any]]:
+        """
+        Sweep the sorted timeline and return clusters of two or more events
+
+        A cluster continues while each event is within window_seconds of the previous
+        one; events without a parseable timestamp never join a cluster.
+        """
+        if len(self) < 2:
+            return []
+
+        epochs = self.epochs()
+        timed = np.flatnonzero(~np.isnan(epochs))
+        if timed.size < 2:
+            return []
+
+        # Stable sort keeps input order for identical timestamps
+        order = timed[np.argsort(epochs[timed], kind='stable')]
+        sorted_epochs = epochs[order]
+
+        # A new window starts wherever the gap to the previous event exceeds the window
+        breaks = np.flatnonzero(np.diff(sorted_epochs) > window_seconds) + 1
+        starts = np.concatenate(([0], breaks))
+        ends = np.concatenate((breaks, [sorted_epochs.size]))
+        sizes = ends - starts
+        multi = sizes > 1
+        if not multi.any():
+            return []
+
+        # Window id per sorted event (singletons dropped), then distinct (window, source) / (window, severity) pairs
+        all_window_ids = np.repeat(np.arange(starts.size), sizes)
+        in_multi = multi[all_window_ids]
+        window_ids = (np.cumsum(multi) - 1)[all_window_ids[in_multi]]
+        members = order[in_multi]
+        starts, ends, sizes = starts[multi], ends[multi], sizes[multi]
+        sources = np.asarray(self._sources, dtype=np.int64)[members]
+        severities = np.asarray(self._severities, dtype=np.int64)[members]
+
+        source_pairs = np.unique(window_ids * len(self.source_codes) + sources)
+        severity_pairs = np.unique(window_ids * len(self.severity_codes) + severities)
+        window_sources = [[] for _ in range(starts.size)]
+        window_severities = [[] for _ in range(starts.size)]
+        for pair in source_pairs.tolist():
+            window, code = divmod(pair, len(self.source_codes))
+            window_sources[window].append(self.source_codes.values[code])
+        for pair in severity_pairs.tolist():
+            window, code = divmod(pair, len(self.severity_codes))
+            window_severities[window].append(self.severity_codes.values[code])
+
+        windows = []
+        for i, (start, end, size) in enumerate(zip(starts.tolist(), ends.tolist(), sizes.tolist())):
+            windows.append({
+                'timeframe': f"{self._timestamps[order[start]]} - {self._timestamps[order[end - 1]]}",
+                'event_count': size,
+                'sources': window_sources[i],
+                'severity_mix': window_severities[i],
+                'description': f"Correlated events across {len(window_sources[i])} components"
+            })
+        return windows
+
+    def component_cooccurrence(self) -> List[Dict[str, Any]]:
+        """Components reported by more than one source, counted with bincount matrices"""
+        if not self._components:
+            return []
+
+        n_components = len(self.component_codes)
+        n_sources = len(self.source_codes)
+        n_severities = len(self.severity_codes)
+        components = np.asarray(self._components, dtype=np.int64)
+        sources = np.asarray(self._sources, dtype=np.int64)
+        severities = np.asarray(self._severities, dtype=np.int64)
+
+        by_source = np.bincount(components * n_sources + sources, minlength=n_components * n_sources).reshape(n_components, n_sources)
+        by_severity = np.bincount(components * n_severities + severities, minlength=n_components * n_severities).reshape(n_components, n_severities)
+
+        source_presence = by_source > 0
+        shared = np.flatnonzero(source_presence.sum(axis=1) > 1)
+
+        correlations = []
+        for component in shared.tolist():
+            affected = [self.source_codes.values[s] for s in np.flatnonzero(source_presence[component]).tolist()]
+            name = self.component_codes.values[component]
+            correlations.append({
+                'component': name,
+                'affected_sources': affected,
+                'event_count': int(by_source[component].sum()),
+                'severity_levels': [self.severity_codes.values[s] for s in np.flatnonzero(by_severity[component]).tolist()],
+                'description': f"{name} issues detected across {len(affected)} different log sources"
+            })
+        return correlations
@@ -6,10 +6,143 @@ Extracted from analyzers.py lines 3725-4626 with safety enhancements
 
 from .shared_imports import *
 from .base.standardizer import AnalyzerOutputStandardizer
+from .package_index import DiagnosticPackageIndex
+import threading
+import functools
+import multiprocessing
+from typing import Optional
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+
+# Default ML/RAG context bytes per package member (sampled, not a prefix)
+LOG_CONTEXT_BUDGET = 10000
+SYSTEM_INFO_CONTEXT_BUDGET = 5000
+
+# Shared process pool for CPU-bound parsing branches (created lazily, reused across packages)
+_parsing_pool = None
+_parsing_pool_lock = threading.Lock()
+
+def get_parsing_pool() -> Optional[ProcessPoolExecutor]:
+    """Get the process-wide parsing pool (None when disabled or unavailable)"""
+    global _parsing_pool
+    
+    if _parsing_pool is None:
+        with _parsing_pool_lock:
+            if _parsing_pool is None:
+                try:
+                    from config import get_config
+                    workers = get_config().DIAGNOSTIC_PROCESS_WORKERS
+                    if workers <= 0:
+                        return None
+                    # spawn avoids forking a multi-threaded Flask worker
+                    _parsing_pool = ProcessPoolExecutor(
+                        max_workers=workers,
+                        mp_context=multiprocessing.get_context('spawn')
+                    )
+                except Exception as e:
+                    print(f"⚠️ Parsing process pool unavailable, parsing in threads: {e}")
+                    return None
+    
+    return _parsing_pool
+
+def _reset_parsing_pool():
+    """Drop a broken parsing pool so the next package gets a fresh one"""
+    global _parsing_pool
+    with _parsing_pool_lock:
+        if _parsing_pool is not None:
+            _parsing_pool.shutdown(wait=False)
+            _parsing_pool = None
+
+
+class AnalysisTaskGraph:
+    """
+    Minimal DAG executor for diagnostic package branches
+    
+    Each task runs as soon as all of its dependencies have finished and receives their
+    results as keyword arguments. 'process' tasks go to the shared parsing pool (module-level
+    callables with picklable arguments only), 'thread' tasks run in a local thread pool.
+    A failed task yields None so downstream tasks can still degrade gracefully.
+    """
+    
+    def __init__(self, thread_workers: int = 4, process_pool: Optional[ProcessPoolExecutor] = None, on_status=None):
+        self.thread_workers = max(1, thread_workers)
+        self.process_pool = process_pool
+        self.on_status = on_status
+        self.tasks = {}
+        self.errors = {}
+    
+    def add(self, name: str, func, args: tuple = (), deps: List[str] = None, kind: str = 'thread'):
+        """Register a task; dependencies must already be registered"""
+        deps = list(deps or [])
+        for dep in deps:
+            if dep not in self.tasks:
+                raise ValueError(f"Task '{name}' depends on unknown task '{dep}'")
+        self.tasks[name] = {'func': func, 'args': args, 'deps': deps, 'kind': kind}
+    
+    def _notify(self, name: str, status: str):
+        """Report a task state change"""
+        if self.on_status:
+            try:
+                self.on_status(name, status)
+            except Exception as e:
+                print(f"⚠️ Task status callback failed for {name}: {e}")
+    
+    def _submit(self, threads: ThreadPoolExecutor, name: str, kwargs: Dict[str, Any]):
+        """Submit a task to the pool matching its kind"""
+        task = self.tasks[name]
+        if task['kind'] == 'process' and self.process_pool is not None:
+            try:
+                return self.process_pool.submit(task['func'], *task['args'], **kwargs)
+            except Exception as e:
+                print(f"⚠️ Process submission failed for {name}, running in thread: {e}")
+                self.process_pool = None
+                _reset_parsing_pool()
+        return threads.submit(task['func'], *task['args'], **kwargs)
+    
+    def run(self) -> Dict[str, Any]:
+        """Execute all tasks and return their results keyed by task name"""
+        results = {}
+        pending = list(self.tasks)
+        running = {}
+        
+        with ThreadPoolExecutor(max_workers=self.thread_workers, thread_name_prefix='diag-branch') as threads:
+            while pending or running:
+                ready = [name for name in pending if all(dep in results for dep in self.tasks[name]['deps'])]
+                for name in ready:
+                    pending.remove(name)
+                    kwargs = {dep: results[dep] for dep in self.tasks[name]['deps']}
+                    running[self._submit(threads, name, kwargs)] = name
+                    self._notify(name, 'running')
+                
+                if not running:
+                    break
+                
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        results[name] = future.result()
+                        self._notify(name, 'completed')
+                    except BrokenProcessPool as e:
+                        # Worker died (e.g. OOM) - retry this task in-process
+                        print(f"⚠️ Parsing pool broke while running {name}, retrying in thread: {e}")
+                        self.process_pool = None
+                        _reset_parsing_pool()
+                        kwargs = {dep: results[dep] for dep in self.tasks[name]['deps']}
+                        running[threads.submit(self.tasks[name]['func'], *self.tasks[name]['args'], **kwargs)] = name
+                    except Exception as e:
+                        print(f"⚠️ Diagnostic branch {name} failed: {e}")
+                        results[name] = None
+                        self.errors[name] = str(e)
+                        self._notify(name, 'failed')
+        
+        return results
 
 class DiagnosticPackageAnalyzer(AnalyzerOutputStandardizer):
     """Deep Security Diagnostic Package Analyzer - Comprehensive analysis of diagnostic packages with multi-log correlation"""
     
+    ANALYZER_VERSION = '4'
+    
     def __init__(self, session_manager=None, session_id=None, rag_system=None, ml_analyzer=None):
         """Initialize the Diagnostic Package Analyzer with enhanced ML/RAG support"""
         self.session_manager = session_manager
@@ -22,6 +155,20 @@ class DiagnosticPackageAnalyzer(AnalyzerOutputStandardizer):
         
         # Package analysis patterns
         self._initialize_package_patterns()
+    
+    @classmethod
+    def analyzer_versions(cls) -> Dict[str, str]:
+        """Own version plus the versions of the sub-analyzers it runs"""
+        from .ds_agent_log_analyzer import DSAgentLogAnalyzer
+        from .amsp_analyzer import AMSPAnalyzer
+        from .conflict_analyzer import ConflictAnalyzer
+        from .resource_analyzer import ResourceAnalyzer
+        from .ds_agent_offline_analyzer import DSAgentOfflineAnalyzer
+        
+        versions = super().analyzer_versions()
+        for analyzer_class in (DSAgentLogAnalyzer, AMSPAnalyzer, ConflictAnalyzer, ResourceAnalyzer, DSAgentOfflineAnalyzer):
+            versions.update(analyzer_class.analyzer_versions())
+        return versions
 
     def _initialize_sub_analyzers(self):
         """Initialize sub-analyzers with safe imports to prevent circular dependencies"""
@@ -102,6 +249,14 @@ class DiagnosticPackageAnalyzer(AnalyzerOutputStandardizer):
                 r'SystemInfo\.txt$',
                 r'DiagnosticInfo\.xml$'
             ],
+            'manager_events': [
+                r'(^|/)[a-z_]*events\.csv$'     # DSM event exports (firewallevents.csv, ...)
+            ],
+            'xml_artifacts': [
+                r'msinfo\.nfo$',                   # msinfo32 export (UTF-16)
+                r'(^|/)config\.xml$',
+                r'(^|/)(application|system)-log\.xml$'
+            ],
             'configuration_files': [
                 r'.*\.xml$',
                 r'.*\.cfg$',
@@ -152,6 +307,10 @@ class DiagnosticPackageAnalyzer(AnalyzerOutputStandardizer):
             self._update_progress("Analysis", "Performing comprehensive diagnostic package analysis", 20)
             raw_results = self.analyze_diagnostic_package(zip_path)
             
+            # Sub-analyzers record their AI fallbacks on themselves
+            sub_analyzers = (self.ds_analyzer, self.amsp_analyzer, self.conflict_analyzer, self.resource_analyzer, self.offline_analyzer)
+            self.ai_degraded = self.ai_degraded or any(analyzer is not None and analyzer.ai_degraded for analyzer in sub_analyzers)
+            
             # Apply standardized output format
             self._update_progress("Standardization", "Converting to standardized format", 90)
             standardized_result = self._standardize_analyzer_output(raw_results, 'diagnostic_package')
@@ -236,105 +395,24 @@ class DiagnosticPackageAnalyzer(AnalyzerOutputStandardizer):
                 'file_count': 0
             }
 
+    def build_package_index(self, zip_path: str, extract_path: str) -> DiagnosticPackageIndex:
+        """Index diagnostic package members from the ZIP central directory without extracting them"""
+        try:
+            self._update_progress("Package Indexing", "Reading diagnostic package index", 5)
+            package_index = DiagnosticPackageIndex(zip_path, extract_path, self.package_patterns)
+            stats = package_index.stats
+            self._update_progress("Package Indexing", f"Indexed {stats['indexed_files']}/{stats['total_files']} package members", 25)
+            return package_index
+        except Exception as e:
+            raise SecurityError(f"Failed to index diagnostic package: {str(e)}")
+
     def extract_diagnostic_package(self, zip_path: str, extract_path: str) -> Dict[str, Any]:
-        """Extract and validate diagnostic package contents"""
-        import zipfile
-        import tempfile
-        import shutil
-        
+        """Extract and validate diagnostic package contents (eager - every indexed member)"""
         try:
-            self._update_progress("Package Extraction", "Extracting diagnostic package contents", 5)
-            
-            extracted_files = {
-                'ds_agent_logs': [],
-                'amsp_logs': [],
-                'system_info': [],
-                'configuration_files': [],
-                'other_files': []
-            }
-            
-            extraction_stats = {
-                'total_files': 0,
-                'processed_files': 0,
-                'skipped_files': 0,
-                'errors': []
-            }
-            
-            with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                file_list = zip_ref.namelist()
-                extraction_stats['total_files'] = len(file_list)
-                
-                for i, file_name in enumerate(file_list):
-                    # Update progress during extraction
-                    if i % 10 == 0:
-                        progress = 5 + int((i / len(file_list)) * 20)  # 5% to 25%
-                        self._update_progress("Package Extraction", f"Extracting files... ({i}/{len(file_list)})", progress)
-                    
-                    try:
-                        # Skip directories and very large files (>100MB)
-                        file_info = zip_ref.getinfo(file_name)
-                        if file_info.is_dir() or file_info.file_size > 100 * 1024 * 1024:
-                            extraction_stats['skipped_files'] += 1
-                            continue
-                        
-                        # Skip encrypted files - check if file is password protected
-                        try:
-                            # Try to read the file info to detect if it's encrypted
-                            with zip_ref.open(file_name) as test_file:
-                                # Try to read first few bytes to verify accessibility
-                                test_file.read(10)
-                        except RuntimeError as e:
-                            if "password" in str(e).lower() or "encrypted" in str(e).lower():
-                                print(f"⚠️  Skipping encrypted file: {file_name}")
-                                extraction_stats['skipped_files'] += 1
-                                extraction_stats['errors'].append(f"Skipped encrypted file: {file_name}")
-                                continue
-                            else:
-                                # Re-raise other RuntimeErrors
-                                raise e
-                        except Exception as e:
-                            # For other exceptions, try to continue
-                            print(f"⚠️  Warning: Could not verify file {file_name}: {e}")
-                        
-                        # Extract file
-                        extracted_path = zip_ref.extract(file_name, extract_path)
-                        extraction_stats['processed_files'] += 1
-                        
-                        # Categorize file based on patterns
-                        categorized = False
-                        for category, patterns in self.package_patterns.items():
-                            for pattern in patterns:
-                                if re.search(pattern, file_name, re.IGNORECASE):
-                                    extracted_files[category].append({
-                                        'file_name': file_name,
-                                        'file_path': extracted_path,
-                                        'file_size': file_info.file_size,
-                                        'category': category
-                                    })
-                                    categorized = True
-                                    break
-                            if categorized:
-                                break
-                        
-                        if not categorized:
-                            extracted_files['other_files'].append({
-                                'file_name': file_name,
-                                'file_path': extracted_path,
-                                'file_size': file_info.file_size,
-                                'category': 'other'
-                            })
-                            
-                    except Exception as e:
-                        extraction_stats['errors'].append(f"Failed to extract {file_name}: {str(e)}")
-                        continue
-            
+            package_index = self.build_package_index(zip_path, extract_path)
+            package_index.materialize_all()
             self._update_progress("Package Extraction", "Diagnostic package extraction completed", 25)
-            
-            return {
-                'extracted_files': extracted_files,
-                'extraction_stats': extraction_stats,
-                'extract_path': extract_path
-            }
+            return package_index.to_extraction_results()
             
         except Exception as e:
             raise SecurityError(f"Failed to extract diagnostic package: {str(e)}")
@@ -371,93 +449,33 @@ class DiagnosticPackageAnalyzer(AnalyzerOutputStandardizer):
         start_time = datetime.now()
         
         try:
-            # Extract diagnostic package
-            extraction_results = self.extract_diagnostic_package(zip_path, temp_dir)
-            comprehensive_results['extraction_results'] = extraction_results
-            
-            extracted_files = extraction_results['extracted_files']
-            total_files = sum(len(files) for files in extracted_files.values())
-            comprehensive_results['package_summary']['total_files_analyzed'] = total_files
-            
-            # Analyze each file category
-            self._update_progress("Individual Analysis", "Analyzing DS Agent logs", 30)
-            
-            # DS Agent Log Analysis
-            if extracted_files['ds_agent_logs'] and self.ds_analyzer:
-                ds_files = [f['file_path'] for f in extracted_files['ds_agent_logs']]
-                if len(ds_files) == 1:
-                    comprehensive_results['individual_analyses']['ds_agent'] = self.ds_analyzer.analyze_log_file(ds_files[0])
-                else:
-                    comprehensive_results['individual_analyses']['ds_agent'] = self.ds_analyzer.analyze_multiple_log_files(ds_files)
-            
-            self._update_progress("Individual Analysis", "Analyzing AMSP logs", 40)
-            
-            # AMSP Log Analysis
-            if extracted_files['amsp_logs'] and self.amsp_analyzer:
-                amsp_files = [f['file_path'] for f in extracted_files['amsp_logs']]
-                amsp_results = []
-                for amsp_file in amsp_files:
-                    try:
-                        result = self.amsp_analyzer.analyze_log_file(amsp_file)
-                        amsp_results.append(result)
-                    except Exception as e:
-                        print(f"⚠️  AMSP analysis failed for {amsp_file}: {e}")
-                        continue
-                comprehensive_results['individual_analyses']['amsp'] = amsp_results if len(amsp_results) > 1 else (amsp_results[0] if amsp_results else None)
-            
-            self._update_progress("Individual Analysis", "Analyzing system information", 50)
-            
-            # System Analysis (AV Conflicts and Resource Analysis)
-            running_process_files = [f for f in extracted_files['system_info'] if 'RunningProcesses.xml' in f['file_name']]
-            busy_process_files = [f for f in extracted_files['system_info'] if 'TopNBusyProcess.txt' in f['file_name']]
-            
-            if running_process_files:
-                # AV Conflict Analysis
-                if self.conflict_analyzer:
-                    try:
-                        processes = self.conflict_analyzer.extract_processes_from_xml(running_process_files[0]['file_path'])
-                        conflict_analysis = self.conflict_analyzer.analyze_conflicts(processes)
-                        comprehensive_results['individual_analyses']['av_conflicts'] = {
-                            'analysis_text': conflict_analysis,
-                            'process_count': len(processes)
-                        }
-                    except Exception as e:
-                        print(f"⚠️  AV conflict analysis failed: {e}")
-                        comprehensive_results['individual_analyses']['av_conflicts'] = {'error': str(e)}
-                
-                # Resource Analysis
-                if busy_process_files and self.resource_analyzer:
-                    try:
-                        busy_processes = self.resource_analyzer.parse_top_n_busy_process(busy_process_files[0]['file_path'])
-                        resource_analysis = self.resource_analyzer.analyze_resource_conflicts(processes, busy_processes)
-                        comprehensive_results['individual_analyses']['resource_analysis'] = resource_analysis
-                    except Exception as e:
-                        print(f"⚠️  Resource analysis failed: {e}")
-                        comprehensive_results['individual_analyses']['resource_analysis'] = {'error': str(e)}
-            
-            self._update_progress("Correlation Analysis", "Performing multi-log correlation", 60)
-            
-            # Multi-log correlation analysis
-            comprehensive_results['correlation_analysis'] = self._perform_correlation_analysis(
-                comprehensive_results['individual_analyses']
-            )
-            
-            self._update_progress("ML Enhancement", "Running ML-enhanced analysis", 70)
-            
-            # ML Enhancement for comprehensive analysis
-            if self.ml_analyzer and ML_AVAILABLE:
-                try:
-                    # Combine all log data for ML analysis
-                    combined_log_data = self._prepare_combined_log_data(extracted_files, temp_dir)
-                    
-                    from ml_analyzer import enhance_analysis_with_ml
-                    ml_insights = enhance_analysis_with_ml(combined_log_data, 'diagnostic_package')
-                    
-                    comprehensive_results['ml_insights'] = ml_insights
-                    print(f"✅ ML diagnostic package analysis completed with {len(ml_insights.get('patterns', []))} patterns detected")
-                except Exception as e:
-                    print(f"⚠️  ML analysis failed: {e}")
-                    comprehensive_results['ml_insights'] = None
+            # Index the package; members are extracted only when a branch needs them
+            package_index = self.build_package_index(zip_path, temp_dir)
+            extracted_files = package_index.entries
+            comprehensive_results['package_summary']['total_files_analyzed'] = package_index.stats['indexed_files']
+            
+            # Run independent sub-analyses concurrently; correlation waits on their results
+            self._update_progress("Individual Analysis", "Running sub-analyzers in parallel", 30)
+            graph = self._build_analysis_graph(package_index, temp_dir)
+            graph_results = graph.run()
+            comprehensive_results['extraction_results'] = package_index.to_extraction_results()
+            
+            for branch in ('ds_agent', 'amsp', 'av_conflicts', 'resource_analysis'):
+                if branch in graph.tasks:
+                    comprehensive_results['individual_analyses'][branch] = graph_results.get(branch)
+            
+            comprehensive_results['correlation_analysis'] = graph_results.get('correlation') or {}
+            comprehensive_results['ml_insights'] = graph_results.get('ml_insights')
+            # Structured XML artifacts (event records only feed correlation)
+            comprehensive_results['system_artifacts'] = {
+                artifact_name: {key: value for key, value in artifact.items() if key != 'events'}
+                for artifact_name, artifact in (graph_results.get('xml_artifacts') or {}).items()
+            }
+            comprehensive_results['manager_events'] = {
+                event_type: event_data.get('stats', {})
+                for event_type, event_data in (graph_results.get('manager_events') or {}).items()
+            }
+            comprehensive_results['package_summary']['branch_errors'] = graph.errors
             
             self._update_progress("Dynamic RAG Analysis", "Applying AI-enhanced analysis", 80)
             
@@ -465,12 +483,13 @@ class DiagnosticPackageAnalyzer(AnalyzerOutputStandardizer):
             if DYNAMIC_RAG_AVAILABLE:
                 try:
                     # Prepare comprehensive context for Dynamic RAG
-                    combined_context = self._prepare_comprehensive_rag_context(comprehensive_results, extracted_files, temp_dir)
+                    combined_context = self._prepare_comprehensive_rag_context(comprehensive_results, package_index, temp_dir)
                     
                     from dynamic_rag_system import apply_dynamic_rag_to_analysis
                     comprehensive_results = apply_dynamic_rag_to_analysis(
                         comprehensive_results, 
-                        combined_context
+                        combined_context,
+                        analyzer='diagnostic_package'
                     )
                     
                     dynamic_rag = comprehensive_results.get('dynamic_rag_analysis', {})
@@ -513,7 +532,184 @@ class DiagnosticPackageAnalyzer(AnalyzerOutputStandardizer):
         # Standardize return structure for frontend compatibility
         return comprehensive_results
 
-    def _perform_correlation_analysis(self, individual_analyses: Dict[str, Any]) -> Dict[str, Any]:
+    def _build_analysis_graph(self, package_index: DiagnosticPackageIndex, temp_dir: str) -> AnalysisTaskGraph:
+        """Build the branch DAG for one indexed package"""
+        from config import get_config
+        config = get_config()
+        
+        branch_status = {}
+        status_lock = threading.Lock()
+        
+        def on_status(name, status):
+            with status_lock:
+                branch_status[name] = status
+                snapshot = dict(branch_status)
+            finished = sum(1 for state in snapshot.values() if state in ('completed', 'failed'))
+            total = len(graph.tasks)
+            if self.session_manager and self.session_id:
+                try:
+                    self.session_manager.update_session(self.session_id, {'branch_progress': snapshot})
+                except Exception as e:
+                    print(f"⚠️  Branch progress update failed: {e}")
+            self._update_progress("Individual Analysis", f"{name} {status} ({finished}/{total} branches done)", 30 + int(40 * finished / total))
+        
+        graph = AnalysisTaskGraph(
+            thread_workers=config.DIAGNOSTIC_THREAD_WORKERS,
+            process_pool=get_parsing_pool(),
+            on_status=on_status
+        )
+        
+        individual_branches = []
+        extracted_files = package_index.entries
+        
+        # DS Agent Log Analysis
+        if extracted_files['ds_agent_logs'] and self.ds_analyzer:
+            graph.add('ds_agent', self._run_ds_agent_branch, args=(package_index, extracted_files['ds_agent_logs']))
+            individual_branches.append('ds_agent')
+        
+        # AMSP Log Analysis
+        if extracted_files['amsp_logs'] and self.amsp_analyzer:
+            graph.add('amsp', self._run_amsp_branch, args=(package_index, extracted_files['amsp_logs']))
+            individual_branches.append('amsp')
+        
+        # System Analysis (AV Conflicts and Resource Analysis)
+        running_process_files = package_index.find('system_info', 'RunningProcesses.xml')
+        busy_process_files = package_index.find('system_info', 'TopNBusyProcess.txt')
+        
+        if running_process_files and (self.conflict_analyzer or (busy_process_files and self.resource_analyzer)):
+            # Materialize on a thread, then parse once in the parsing pool for both branches
+            graph.add('xml_path', package_index.materialize, args=(running_process_files[0],))
+            graph.add('running_processes', extract_running_processes, deps=['xml_path'], kind='process')
+            
+            if self.conflict_analyzer:
+                graph.add('av_conflicts', self._run_conflict_branch, deps=['xml_path', 'running_processes'])
+                individual_branches.append('av_conflicts')
+            
+            if busy_process_files and self.resource_analyzer:
+                graph.add('txt_path', package_index.materialize, args=(busy_process_files[0],))
+                resource_deps = ['xml_path', 'txt_path', 'running_processes']
+                from .busy_process_table import PANDAS_AVAILABLE, parse_busy_process_snapshots
+                if PANDAS_AVAILABLE:
+                    graph.add('busy_table', parse_busy_process_snapshots, deps=['txt_path'], kind='process')
+                    resource_deps.append('busy_table')
+                graph.add('resource_analysis', self._run_resource_branch, deps=resource_deps)
+                individual_branches.append('resource_analysis')
+        
+        # Manager event exports: materialize, then stream into compact per-type tables in the parsing pool
+        correlation_deps = list(individual_branches)
+        from .dsm_event_tables import PANDAS_AVAILABLE as EVENT_TABLES_AVAILABLE, load_manager_event_tables
+        if extracted_files.get('manager_events') and EVENT_TABLES_AVAILABLE:
+            graph.add('manager_event_paths', self._materialize_entries, args=(package_index, extracted_files['manager_events']))
+            graph.add(
+                'manager_events',
+                functools.partial(
+                    load_manager_event_tables,
+                    chunk_rows=config.DIAGNOSTIC_EVENT_CSV_CHUNK_ROWS,
+                    max_rows=config.DIAGNOSTIC_EVENT_CSV_MAX_ROWS
+                ),
+                deps=['manager_event_paths'],
+                kind='process'
+            )
+            correlation_deps.append('manager_events')
+        
+        # Auxiliary XML artifacts: single streaming pass per file in the parsing pool
+        if extracted_files.get('xml_artifacts'):
+            from .xml_artifacts import extract_xml_artifacts
+            graph.add('xml_artifact_paths', self._materialize_entries, args=(package_index, extracted_files['xml_artifacts']))
+            graph.add('xml_artifacts', extract_xml_artifacts, deps=['xml_artifact_paths'], kind='process')
+            correlation_deps.append('xml_artifacts')
+        
+        # Multi-log correlation once every individual analysis is available
+        graph.add('correlation', self._run_correlation_branch, deps=correlation_deps)
+        
+        # ML only depends on extracted files, so it overlaps with the sub-analyzers
+        if self.ml_analyzer and ML_AVAILABLE:
+            graph.add('ml_insights', self._run_ml_branch, args=(package_index, temp_dir))
+        
+        return graph
+
+    def _materialize_entries(self, package_index: DiagnosticPackageIndex, entries: List[Dict[str, Any]]) -> List[str]:
+        """Extract several members, skipping any that fail"""
+        paths = []
+        for entry in entries:
+            try:
+                paths.append(package_index.materialize(entry))
+            except SecurityError as e:
+                print(f"⚠️  {e}")
+        return paths
+
+    def _run_ds_agent_branch(self, package_index: DiagnosticPackageIndex, entries: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """DS Agent log analysis branch"""
+        ds_files = [package_index.materialize(entry) for entry in entries]
+        if len(ds_files) == 1:
+            return self.ds_analyzer.analyze_log_file(ds_files[0])
+        return self.ds_analyzer.analyze_multiple_log_files(ds_files)
+
+    def _run_amsp_branch(self, package_index: DiagnosticPackageIndex, entries: List[Dict[str, Any]]):
+        """AMSP log analysis branch"""
+        amsp_results = []
+        for entry in entries:
+            amsp_file = entry['file_name']
+            try:
+                result = self.amsp_analyzer.analyze_log_file(package_index.materialize(entry))
+                amsp_results.append(result)
+            except Exception as e:
+                print(f"⚠️  AMSP analysis failed for {amsp_file}: {e}")
+                continue
+        return amsp_results if len(amsp_results) > 1 else (amsp_results[0] if amsp_results else None)
+
+    def _run_conflict_branch(self, xml_path: Optional[str] = None, running_processes: Optional[List[str]] = None) -> Dict[str, Any]:
+        """AV conflict analysis branch"""
+        try:
+            processes = running_processes
+            if processes is None:
+                processes = self.conflict_analyzer.extract_processes_from_xml(xml_path)
+            conflict_analysis = self.conflict_analyzer.analyze_conflicts(processes)
+            return {
+                'analysis_text': conflict_analysis,
+                'process_count': len(processes)
+            }
+        except Exception as e:
+            print(f"⚠️  AV conflict analysis failed: {e}")
+            return {'error': str(e)}
+
+    def _run_resource_branch(self, xml_path: Optional[str] = None, txt_path: Optional[str] = None, running_processes: Optional[List[str]] = None, busy_table=None) -> Dict[str, Any]:
+        """Resource analysis branch"""
+        try:
+            processes = running_processes
+            if processes is None:
+                processes = self.resource_analyzer.extract_processes_from_xml(xml_path)
+            if busy_table is not None:
+                busy_processes = self.resource_analyzer.rank_busy_processes([busy_table])
+            else:
+                busy_processes = self.resource_analyzer.parse_top_n_busy_process(txt_path)
+            return self.resource_analyzer.analyze_resource_conflicts(processes, busy_processes)
+        except Exception as e:
+            print(f"⚠️  Resource analysis failed: {e}")
+            return {'error': str(e)}
+
+    def _run_correlation_branch(self, manager_events: Optional[Dict[str, Any]] = None, xml_artifacts: Optional[Dict[str, Any]] = None,
+                                **individual_analyses) -> Dict[str, Any]:
+        """Multi-log correlation branch, fed with the finished individual analyses, Manager event tables and XML artifacts"""
+        return self._perform_correlation_analysis(individual_analyses, manager_events, xml_artifacts)
+
+    def _run_ml_branch(self, package_index: DiagnosticPackageIndex, temp_dir: str) -> Optional[Dict[str, Any]]:
+        """ML enhancement branch for the combined package logs"""
+        try:
+            # Combine all log data for ML analysis
+            combined_log_data = self._prepare_combined_log_data(package_index, temp_dir)
+            
+            from ml_analyzer import enhance_analysis_with_ml
+            ml_insights = enhance_analysis_with_ml(combined_log_data, 'diagnostic_package')
+            
+            print(f"✅ ML diagnostic package analysis completed with {len(ml_insights.get('patterns', []))} patterns detected")
+            return ml_insights
+        except Exception as e:
+            print(f"⚠️  ML analysis failed: {e}")
+            return None
+
+    def _perform_correlation_analysis(self, individual_analyses: Dict[str, Any], manager_events: Optional[Dict[str, Any]] = None,
+                                      xml_artifacts: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Perform correlation analysis across multiple log sources"""
         correlation_results = {
             'timing_correlations': [],
@@ -524,30 +720,16 @@ class DiagnosticPackageAnalyzer(AnalyzerOutputStandardizer):
         }
         
         try:
-            # Extract events from all analyses for correlation
-            all_events = []
+            from .correlation_engine import CorrelationTimeline
+            
+            # Normalize every event once into the shared timeline
+            timeline = CorrelationTimeline()
             
             # Extract DS Agent events
             if 'ds_agent' in individual_analyses and individual_analyses['ds_agent']:
                 ds_analysis = individual_analyses['ds_agent']
-                for error in ds_analysis.get('errors', []):
-                    all_events.append({
-                        'source': 'ds_agent',
-                        'type': 'error',
-                        'timestamp': error.get('timestamp', ''),
-                        'component': error.get('component', ''),
-                        'message': error.get('message', ''),
-                        'severity': 'error'
-                    })
-                for warning in ds_analysis.get('warnings', []):
-                    all_events.append({
-                        'source': 'ds_agent',
-                        'type': 'warning',
-                        'timestamp': warning.get('timestamp', ''),
-                        'component': warning.get('component', ''),
-                        'message': warning.get('message', ''),
-                        'severity': 'warning'
-                    })
+                timeline.add_events('ds_agent', ds_analysis.get('errors', []), 'error')
+                timeline.add_events('ds_agent', ds_analysis.get('warnings', []), 'warning')
             
             # Extract AMSP events
             if 'amsp' in individual_analyses and individual_analyses['amsp']:
@@ -555,71 +737,43 @@ class DiagnosticPackageAnalyzer(AnalyzerOutputStandardizer):
                 if isinstance(amsp_analysis, list):
                     amsp_analysis = amsp_analysis[0]  # Take first analysis if multiple
                 
-                for error in amsp_analysis.get('errors', []):
-                    all_events.append({
-                        'source': 'amsp',
-                        'type': 'error',
-                        'timestamp': error.get('timestamp', ''),
-                        'operation': error.get('operation', ''),
-                        'message': error.get('message', ''),
-                        'severity': 'error'
-                    })
-            
-            # Timing correlation analysis
-            if len(all_events) > 1:
-                # Sort events by timestamp for timeline analysis
-                sorted_events = sorted(all_events, key=lambda x: x.get('timestamp', ''))
-                
-                # Look for events within 5-minute windows
-                correlation_windows = []
-                current_window = []
-                
-                for i, event in enumerate(sorted_events):
-                    if not current_window:
-                        current_window.append(event)
-                    else:
-                        # Check if event is within 5 minutes of the last event in current window
-                        if self._events_within_timeframe(current_window[-1], event, minutes=5):
-                            current_window.append(event)
-                        else:
-                            if len(current_window) > 1:
-                                correlation_windows.append(current_window)
-                            current_window = [event]
-                
-                # Add final window if it has multiple events
-                if len(current_window) > 1:
-                    correlation_windows.append(current_window)
-                
-                # Analyze correlation windows
-                for window in correlation_windows:
-                    if len(window) > 1:
-                        correlation_results['timing_correlations'].append({
-                            'timeframe': f"{window[0]['timestamp']} - {window[-1]['timestamp']}",
-                            'event_count': len(window),
-                            'sources': list(set(event['source'] for event in window)),
-                            'severity_mix': list(set(event['severity'] for event in window)),
-                            'description': f"Correlated events across {len(set(event['source'] for event in window))} components"
-                        })
-            
-            # Component correlation analysis
-            component_issues = {}
-            for event in all_events:
-                component = event.get('component', event.get('operation', 'unknown'))
-                if component not in component_issues:
-                    component_issues[component] = []
-                component_issues[component].append(event)
-            
-            # Look for components with issues across multiple sources
-            for component, events in component_issues.items():
-                sources = set(event['source'] for event in events)
-                if len(sources) > 1:
-                    correlation_results['component_correlations'].append({
-                        'component': component,
-                        'affected_sources': list(sources),
-                        'event_count': len(events),
-                        'severity_levels': list(set(event['severity'] for event in events)),
-                        'description': f"{component} issues detected across {len(sources)} different log sources"
-                    })
+                timeline.add_events('amsp', amsp_analysis.get('errors', []), 'error', component_field='operation')
+            
+            # Manager-side events from the DSM CSV exports, appended column-wise
+            if manager_events:
+                from .dsm_event_tables import timeline_columns
+                for event_type, event_data in manager_events.items():
+                    if not event_data or event_data.get('table') is None:
+                        continue
+                    columns = timeline_columns(event_data['table'])
+                    timeline.add_event_table(
+                        f"dsm_{event_type}",
+                        columns['timestamps'],
+                        event_data.get('component', event_type),
+                        columns['severities']
+                    )
+                correlation_results['manager_event_sources'] = sorted(
+                    event_type for event_type, event_data in manager_events.items()
+                    if event_data and event_data.get('table') is not None
+                )
+            
+            # Windows event log warnings/errors, component = event source
+            for artifact_name, artifact in (xml_artifacts or {}).items():
+                events = artifact.get('events') if artifact.get('artifact_type') == 'windows_event_log' else None
+                if events:
+                    timeline.add_event_table(
+                        f"windows_{artifact_name}",
+                        [event['timestamp'] for event in events],
+                        [event['source'] for event in events],
+                        [event['severity'] for event in events]
+                    )
+            
+            # Timing correlation: sweep-line over events sorted by epoch (5-minute gaps)
+            correlation_results['timing_correlations'] = timeline.timing_windows(window_seconds=5 * 60)
+            
+            # Component correlation: components with issues across multiple sources
+            correlation_results['component_correlations'] = timeline.component_cooccurrence()
+            correlation_results['events_correlated'] = len(timeline)
             
             # Calculate overall correlation score
             correlation_score = 0
@@ -635,93 +789,60 @@ class DiagnosticPackageAnalyzer(AnalyzerOutputStandardizer):
         
         return correlation_results
 
-    def _events_within_timeframe(self, event1: Dict[str, Any], event2: Dict[str, Any], minutes: int = 5) -> bool:
-        """Check if two events occurred within the specified timeframe"""
-        try:
-            from datetime import datetime, timedelta
-            
-            # Parse timestamps (handle different formats)
-            time1_str = event1.get('timestamp', '')
-            time2_str = event2.get('timestamp', '')
-            
-            if not time1_str or not time2_str:
-                return False
-            
-            # Try different timestamp formats
-            formats = [
-                '%Y-%m-%d %H:%M:%S.%f',
-                '%Y-%m-%d %H:%M:%S',
-                '%m/%d/%Y %I:%M:%S %p',
-                '%d/%m/%Y %H:%M:%S'
-            ]
-            
-            time1 = None
-            time2 = None
-            
-            for fmt in formats:
-                try:
-                    time1 = datetime.strptime(time1_str, fmt)
-                    break
-                except ValueError:
-                    continue
-            
-            for fmt in formats:
-                try:
-                    time2 = datetime.strptime(time2_str, fmt)
-                    break
-                except ValueError:
-                    continue
-            
-            if time1 and time2:
-                time_diff = abs((time2 - time1).total_seconds())
-                return time_diff <= (minutes * 60)
-            
-        except Exception as e:
-            print(f"⚠️  Timestamp comparison failed: {e}")
-        
-        return False
+    def _prepare_combined_log_data(self, package_index: DiagnosticPackageIndex, temp_dir: str, budget_bytes: Optional[int] = None) -> str:
+        """
+        Prepare combined log data for ML/RAG analysis
 
-    def _prepare_combined_log_data(self, extracted_files: Dict[str, List], temp_dir: str) -> str:
-        """Prepare combined log data for ML analysis"""
+        Each member is streamed once and importance-sampled (severity, template rarity,
+        recency, every error template covered) into its share of the byte budget; the
+        samplers are kept on the package index so later calls only re-render.
+        Without budget_bytes each log gets LOG_CONTEXT_BUDGET and each system file
+        SYSTEM_INFO_CONTEXT_BUDGET.
+        """
+        from .context_sampler import build_sampler, split_budget
+        
         combined_data = []
+        extracted_files = package_index.entries
+        
+        sources = []
+        for ds_file in extracted_files.get('ds_agent_logs', []):
+            sources.append(('DS AGENT LOG', ds_file, LOG_CONTEXT_BUDGET))
+        for amsp_file in extracted_files.get('amsp_logs', []):
+            sources.append(('AMSP LOG', amsp_file, LOG_CONTEXT_BUDGET))
+        for sys_file in extracted_files.get('system_info', []):
+            if sys_file['file_name'].endswith('.txt'):  # Only text files for ML
+                sources.append(('SYSTEM INFO', sys_file, SYSTEM_INFO_CONTEXT_BUDGET))
+        
+        budgets = {entry['file_name']: default for _, entry, default in sources}
+        if budget_bytes is not None:
+            budgets = split_budget(budget_bytes, [(entry['file_name'], default) for _, entry, default in sources])
         
         try:
-            # Combine DS Agent logs
-            for ds_file in extracted_files.get('ds_agent_logs', []):
-                try:
-                    with open(ds_file['file_path'], 'r', encoding='utf-8', errors='ignore') as f:
-                        content = f.read()[:10000]  # Limit to first 10KB per file
-                        combined_data.append(f"=== DS AGENT LOG: {ds_file['file_name']} ===\n{content}\n")
-                except Exception as e:
-                    print(f"⚠️  Failed to read DS Agent log {ds_file['file_name']}: {e}")
-            
-            # Combine AMSP logs
-            for amsp_file in extracted_files.get('amsp_logs', []):
+            for label, entry, default in sources:
+                header = f"=== {label}: {entry['file_name']} ==="
+                budget = budgets.get(entry['file_name'], 0) - len(header.encode('utf-8')) - 2
+                if budget <= 0:
+                    continue
                 try:
-                    with open(amsp_file['file_path'], 'r', encoding='utf-8', errors='ignore') as f:
-                        content = f.read()[:10000]  # Limit to first 10KB per file
-                        combined_data.append(f"=== AMSP LOG: {amsp_file['file_name']} ===\n{content}\n")
+                    sampler = package_index.context_samplers.get(entry['file_name'])
+                    if sampler is None:
+                        sampler = build_sampler(package_index.iter_lines(entry), total_size=entry['file_size'],
+                                                seed=entry['file_name'], budget_bytes=max(budget, default))
+                        package_index.context_samplers[entry['file_name']] = sampler
+                    content = sampler.render(budget)
+                    combined_data.append(f"{header}\n{content}\n")
                 except Exception as e:
-                    print(f"⚠️  Failed to read AMSP log {amsp_file['file_name']}: {e}")
-            
-            # Combine system info files
-            for sys_file in extracted_files.get('system_info', []):
-                if sys_file['file_name'].endswith('.txt'):  # Only text files for ML
-                    try:
-                        with open(sys_file['file_path'], 'r', encoding='utf-8', errors='ignore') as f:
-                            content = f.read()[:5000]  # Limit to first 5KB per file
-                            combined_data.append(f"=== SYSTEM INFO: {sys_file['file_name']} ===\n{content}\n")
-                    except Exception as e:
-                        print(f"⚠️  Failed to read system info {sys_file['file_name']}: {e}")
+                    print(f"⚠️  Failed to sample {label.lower()} {entry['file_name']}: {e}")
             
         except Exception as e:
             print(f"⚠️  Failed to prepare combined log data: {e}")
         
         return '\n'.join(combined_data)
 
-    def _prepare_comprehensive_rag_context(self, comprehensive_results: Dict[str, Any], extracted_files: Dict[str, List], temp_dir: str) -> str:
+    def _prepare_comprehensive_rag_context(self, comprehensive_results: Dict[str, Any], package_index: DiagnosticPackageIndex, temp_dir: str) -> str:
         """Prepare comprehensive context for RAG analysis"""
         context_parts = []
+        extracted_files = package_index.entries
         
         context_parts.append("DEEP SECURITY DIAGNOSTIC PACKAGE ANALYSIS CONTEXT:")
         context_parts.append(f"Package: {comprehensive_results['package_summary']['package_path']}")
@@ -734,6 +855,29 @@ class DiagnosticPackageAnalyzer(AnalyzerOutputStandardizer):
             if files:
                 context_parts.append(f"- {category}: {len(files)} files")
         
+        # Add system artifact summaries (msinfo / config.xml / Windows event logs)
+        artifacts = comprehensive_results.get('system_artifacts') or {}
+        if artifacts:
+            context_parts.append("\nSYSTEM ARTIFACTS:")
+            for artifact_name, artifact in artifacts.items():
+                artifact_type = artifact.get('artifact_type')
+                if artifact_type == 'msinfo':
+                    context_parts.append(f"- OS: {artifact.get('os_name')} (build {artifact.get('os_build')}), {artifact.get('running_driver_count', 0)} running drivers")
+                    if artifact.get('filter_drivers'):
+                        context_parts.append(f"- File system filter drivers: {', '.join(artifact['filter_drivers'][:20])}")
+                elif artifact_type == 'config':
+                    context_parts.append(f"- {artifact_name}: {artifact.get('total_rules', 0)} rules, {len(artifact.get('policies', []))} policies")
+                elif artifact_type == 'windows_event_log':
+                    top_sources = ', '.join(f"{source} ({count})" for source, count in list(artifact.get('top_sources', {}).items())[:5])
+                    context_parts.append(f"- {artifact_name}: {artifact.get('total_events', 0)} events, levels {artifact.get('by_level', {})}; top sources: {top_sources}")
+        
+        # Add Manager event export summaries
+        if comprehensive_results.get('manager_events'):
+            context_parts.append("\nMANAGER EVENT EXPORTS:")
+            for event_type, stats in comprehensive_results['manager_events'].items():
+                top_events = ', '.join(item['event'] for item in stats.get('top_events', [])[:3])
+                context_parts.append(f"- {event_type}: {stats.get('rows_read', 0)} events ({stats.get('first_event')} - {stats.get('last_event')}); top: {top_events}")
+        
         # Add individual analysis summaries
         context_parts.append("\nINDIVIDUAL ANALYSIS RESULTS:")
         
@@ -763,7 +907,7 @@ class DiagnosticPackageAnalyzer(AnalyzerOutputStandardizer):
         # Add sample log entries for context
         context_parts.append("\nSAMPLE LOG CONTENT:")
         try:
-            sample_content = self._prepare_combined_log_data(extracted_files, temp_dir)[:2000]  # First 2KB for context
+            sample_content = self._prepare_combined_log_data(package_index, temp_dir, budget_bytes=2000)  # 2KB sampled across all logs
             context_parts.append(sample_content)
         except Exception as e:
             context_parts.append(f"Sample content unavailable: {e}")
@@ -6,6 +6,8 @@ Extracted from analyzers.py lines 303-1030 with safety enhancements
 
 from .shared_imports import *
 from .base.standardizer import AnalyzerOutputStandardizer
+from .rate_anomaly import RateAnomalyDetector
+from .log_aggregates import LogAggregateTable
 from datetime import datetime
 
 class DSAgentLogAnalyzer(AnalyzerOutputStandardizer):
@@ -14,6 +16,8 @@ class DSAgentLogAnalyzer(AnalyzerOutputStandardizer):
     Now includes real-time progress tracking for better UX
     """
     
+    ANALYZER_VERSION = '4'
+    
     def __init__(self, session_manager=None, session_id=None, rag_system=None, ml_analyzer=None):
         """Initialize with optional progress tracking, RAG system, and ML analyzer"""
         self.session_manager = session_manager
@@ -410,11 +414,18 @@ class DSAgentLogAnalyzer(AnalyzerOutputStandardizer):
         except:
             return 2.0  # Default moderate entropy
     
-    def _calculate_component_health_scores(self, analysis: Dict[str, Any], log_entries: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def _calculate_component_health_scores(self, analysis: Dict[str, Any], log_entries: List[Dict[str, Any]],
+                                           rate_anomalies: Dict[str, Any] = None,
+                                           aggregates: LogAggregateTable = None) -> Dict[str, Any]:
         """Calculate ML-based health scores for each DS component"""
         try:
             component_health = {}
             component_analysis = analysis.get('component_analysis', {})
+            rate_anomalies = rate_anomalies or {}
+            aggregates = aggregates or LogAggregateTable(log_entries)
+            
+            # Time-based analysis (recent activity of the whole log, the same for every component)
+            time_modifier = self._calculate_time_based_health_modifier(aggregates)
             
             for component, stats in component_analysis.items():
                 # Base health calculation
@@ -428,14 +439,17 @@ class DSAgentLogAnalyzer(AnalyzerOutputStandardizer):
                 base_score = max(100 - error_penalty - warning_penalty, 0)
                 
                 # ML Enhancement: Pattern analysis
-                component_patterns = self._analyze_component_patterns(component, log_entries)
+                component_patterns = self._analyze_component_patterns(component, aggregates)
                 pattern_modifier = self._calculate_pattern_health_modifier(component_patterns)
                 
-                # Time-based analysis
-                time_modifier = self._calculate_time_based_health_modifier(component, log_entries)
+                # Error bursts and silences of this component (untruncated totals)
+                rate_stats = rate_anomalies.get('per_component', {}).get(component, {})
+                bursts = rate_stats.get('bursts', [])
+                silences = rate_stats.get('silences', [])
+                rate_modifier = self._calculate_rate_health_modifier(rate_stats)
                 
                 # Final health score
-                final_score = max(min(base_score + pattern_modifier + time_modifier, 100), 0)
+                final_score = max(min(base_score + pattern_modifier + time_modifier + rate_modifier, 100), 0)
                 
                 # Health status classification
                 if final_score >= 90:
@@ -459,13 +473,25 @@ class DSAgentLogAnalyzer(AnalyzerOutputStandardizer):
                     'error_count': errors,
                     'warning_count': warnings,
                     'patterns': component_patterns,
+                    'error_bursts': bursts,
+                    'error_burst_count': rate_stats.get('burst_count', 0),
+                    'silences': silences,
+                    'silence_count': rate_stats.get('silence_count', 0),
                     'recommendations': self._generate_component_health_recommendations(component, final_score, component_patterns)
                 }
+                for burst in bursts[:2]:
+                    component_health[component]['recommendations'].append(
+                        f"📈 Error burst at {burst['start']}: {burst['error_count']} errors in {burst['minutes']} min "
+                        f"(baseline {burst['baseline_errors_per_minute']}/min)")
+                for silence in silences[:2]:
+                    state = "still silent at end of log" if silence['ongoing_at_end'] else f"for {silence['minutes']} min"
+                    component_health[component]['recommendations'].append(
+                        f"🔇 {component} stopped logging at {silence['start']} ({state}) - check the service is running")
             
             return {
                 'individual_scores': component_health,
                 'overall_health': self._calculate_overall_system_health(component_health),
-                'health_trend': self._analyze_health_trends(log_entries),
+                'health_trend': self._analyze_health_trends(aggregates),
                 'analysis_timestamp': datetime.now().isoformat()
             }
             
@@ -473,35 +499,9 @@ class DSAgentLogAnalyzer(AnalyzerOutputStandardizer):
             print(f"⚠️ Component health scoring failed: {e}")
             return {}
     
-    def _analyze_component_patterns(self, component: str, log_entries: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def _analyze_component_patterns(self, component: str, aggregates: LogAggregateTable) -> Dict[str, Any]:
         """Analyze patterns specific to each component"""
-        patterns = {
-            'startup_success': 0,
-            'connection_issues': 0,
-            'performance_issues': 0,
-            'recovery_success': 0,
-            'configuration_changes': 0
-        }
-        
-        component_entries = [entry for entry in log_entries 
-                           if entry.get('component', '').lower() == component.lower()]
-        
-        for entry in component_entries:
-            message = entry.get('message', '').lower()
-            
-            # Pattern detection
-            if any(word in message for word in ['start', 'load', 'init', 'activate']):
-                patterns['startup_success'] += 1
-            elif any(word in message for word in ['timeout', 'connection', 'fail']):
-                patterns['connection_issues'] += 1
-            elif any(word in message for word in ['slow', 'memory', 'cpu', 'performance']):
-                patterns['performance_issues'] += 1
-            elif any(word in message for word in ['recover', 'reconnect', 'success']):
-                patterns['recovery_success'] += 1
-            elif any(word in message for word in ['config', 'setting', 'update']):
-                patterns['configuration_changes'] += 1
-        
-        return patterns
+        return aggregates.component_patterns(component)
     
     def _calculate_pattern_health_modifier(self, patterns: Dict[str, Any]) -> float:
         """Calculate health modifier based on detected patterns"""
@@ -517,32 +517,24 @@ class DSAgentLogAnalyzer(AnalyzerOutputStandardizer):
         
         return max(min(modifier, 10), -20)  # Cap between -20 and +10
     
-    def _calculate_time_based_health_modifier(self, component: str, log_entries: List[Dict[str, Any]]) -> float:
+    def _calculate_rate_health_modifier(self, rate_stats: Dict[str, Any]) -> float:
+        """Calculate health modifier from a component's error burst and silence totals"""
+        ongoing = rate_stats.get('ongoing_silences', 0)
+        modifier = -5 * rate_stats.get('burst_count', 0)
+        # A component that never resumed logging is worse than a gap
+        modifier -= 10 * ongoing + 5 * (rate_stats.get('silence_count', 0) - ongoing)
+        return max(modifier, -25)
+    
+    def _calculate_time_based_health_modifier(self, aggregates: LogAggregateTable) -> float:
         """Calculate health modifier based on time patterns"""
         try:
-            from datetime import datetime, timedelta
-            
-            recent_entries = []
-            now = datetime.now()
-            
-            for entry in log_entries:
-                try:
-                    timestamp_str = entry.get('timestamp', '')
-                    if timestamp_str:
-                        entry_time = datetime.strptime(timestamp_str[:19], '%Y-%m-%d %H:%M:%S')
-                        if (now - entry_time).total_seconds() < 3600:  # Last hour
-                            recent_entries.append(entry)
-                except:
-                    continue
+            recent_entries, recent_errors = aggregates.recent_activity(3600)  # Last hour
             
             if not recent_entries:
                 return 0
             
             # Recent activity analysis
-            recent_errors = sum(1 for entry in recent_entries 
-                              if 'error' in entry.get('message', '').lower())
-            
-            if recent_errors > len(recent_entries) * 0.3:  # >30% recent errors
+            if recent_errors > recent_entries * 0.3:  # >30% recent errors
                 return -5
             elif recent_errors == 0:  # No recent errors
                 return 2
@@ -621,28 +613,14 @@ class DSAgentLogAnalyzer(AnalyzerOutputStandardizer):
             'component_count': len(component_health)
         }
     
-    def _analyze_health_trends(self, log_entries: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def _analyze_health_trends(self, aggregates: LogAggregateTable) -> Dict[str, Any]:
         """Analyze health trends over time"""
         try:
-            from datetime import datetime, timedelta
-            
-            if len(log_entries) < 10:
+            if aggregates.entry_count < 10:
                 return {'trend': 'insufficient_data', 'direction': 'stable'}
             
-            # Split entries into time periods
-            sorted_entries = sorted(log_entries, key=lambda x: x.get('timestamp', ''))
-            
-            first_half = sorted_entries[:len(sorted_entries)//2]
-            second_half = sorted_entries[len(sorted_entries)//2:]
-            
-            # Calculate error rates for each half
-            first_half_errors = sum(1 for entry in first_half 
-                                  if 'error' in entry.get('message', '').lower())
-            second_half_errors = sum(1 for entry in second_half 
-                                   if 'error' in entry.get('message', '').lower())
-            
-            first_rate = first_half_errors / len(first_half) if first_half else 0
-            second_rate = second_half_errors / len(second_half) if second_half else 0
+            # Error rates of the earlier and later half of the entries (by timestamp)
+            first_rate, second_rate = aggregates.error_rate_halves()
             
             # Determine trend
             if second_rate > first_rate * 1.2:  # >20% increase
@@ -666,7 +644,9 @@ class DSAgentLogAnalyzer(AnalyzerOutputStandardizer):
             print(f"⚠️ Health trend analysis failed: {e}")
             return {'trend': 'unknown', 'direction': '❓'}
     
-    def _analyze_smart_log_patterns(self, log_entries: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def _analyze_smart_log_patterns(self, log_entries: List[Dict[str, Any]],
+                                    rate_anomalies: Dict[str, Any] = None,
+                                    aggregates: LogAggregateTable = None) -> Dict[str, Any]:
         """Use ML clustering to identify smart log patterns and anomalies"""
         try:
             if not log_entries or len(log_entries) < 5:
@@ -679,6 +659,10 @@ class DSAgentLogAnalyzer(AnalyzerOutputStandardizer):
                 'temporal_patterns': {},
                 'component_interaction_patterns': {},
                 'similarity_groups': [],
+                'error_bursts': (rate_anomalies or {}).get('bursts', []),
+                'silences': (rate_anomalies or {}).get('silences', []),
+                'error_burst_count': (rate_anomalies or {}).get('burst_count', 0),
+                'silence_count': (rate_anomalies or {}).get('silence_count', 0),
                 'anomaly_score': 0.0,
                 'pattern_insights': []
             }
@@ -706,10 +690,11 @@ class DSAgentLogAnalyzer(AnalyzerOutputStandardizer):
             pattern_analysis['recurring_sequences'] = self._find_recurring_sequences(log_entries)
             
             # Analyze temporal patterns
-            pattern_analysis['temporal_patterns'] = self._analyze_temporal_patterns(log_entries)
+            aggregates = aggregates or LogAggregateTable(log_entries)
+            pattern_analysis['temporal_patterns'] = self._analyze_temporal_patterns(aggregates)
             
             # Component interaction analysis
-            pattern_analysis['component_interaction_patterns'] = self._analyze_component_interactions(log_entries)
+            pattern_analysis['component_interaction_patterns'] = self._analyze_component_interactions(aggregates)
             
             # Generate pattern insights
             pattern_analysis['pattern_insights'] = self._generate_pattern_insights(pattern_analysis)
@@ -794,6 +779,17 @@ class DSAgentLogAnalyzer(AnalyzerOutputStandardizer):
                 # Simple rule-based clustering fallback
                 return self._simple_clustering_fallback(feature_vectors)
             
+            pretrained = self._get_pretrained_clustering()
+            if pretrained is not None:
+                # Offline-trained scaler and centroids - assign only, stable across uploads
+                scaler, kmeans = pretrained
+                cluster_labels = kmeans.predict(scaler.transform(feature_vectors))
+                
+                clusters = {}
+                for i, label in enumerate(cluster_labels):
+                    clusters.setdefault(label, []).append(i)
+                return clusters, cluster_labels
+            
             from sklearn.cluster import KMeans
             from sklearn.preprocessing import StandardScaler
             import numpy as np
@@ -824,6 +820,17 @@ class DSAgentLogAnalyzer(AnalyzerOutputStandardizer):
             print(f"⚠️ ML clustering failed: {e}")
             return self._simple_clustering_fallback(feature_vectors)
     
+    def _get_pretrained_clustering(self):
+        """(scaler, KMeans) trained offline by `ml_analyzer.py --train`, None when not available"""
+        try:
+            from ml_analyzer import get_model_registry
+            models = get_model_registry().get_models()
+            if models.get('pattern_scaler') is not None and models.get('pattern_clusterer') is not None:
+                return models['pattern_scaler'], models['pattern_clusterer']
+        except Exception as e:
+            print(f"⚠️ Pre-trained pattern clustering unavailable: {e}")
+        return None
+    
     def _simple_clustering_fallback(self, feature_vectors: List[List[float]]) -> tuple:
         """Simple rule-based clustering when ML is not available"""
         clusters = {0: [], 1: [], 2: []}  # Error, Warning, Normal clusters
@@ -951,23 +958,11 @@ class DSAgentLogAnalyzer(AnalyzerOutputStandardizer):
             print(f"⚠️ Sequence analysis failed: {e}")
             return []
     
-    def _analyze_temporal_patterns(self, log_entries: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def _analyze_temporal_patterns(self, aggregates: LogAggregateTable) -> Dict[str, Any]:
         """Analyze temporal patterns in log entries"""
         try:
-            hourly_distribution = {}
-            component_timing = {}
-            
-            for entry in log_entries:
-                hour = self._extract_hour_from_timestamp(entry.get('timestamp', ''))
-                component = entry.get('component', 'unknown')
-                
-                # Hourly distribution
-                hourly_distribution[hour] = hourly_distribution.get(hour, 0) + 1
-                
-                # Component timing patterns
-                if component not in component_timing:
-                    component_timing[component] = {}
-                component_timing[component][hour] = component_timing[component].get(hour, 0) + 1
+            hourly_distribution = aggregates.hourly_distribution()
+            component_timing = aggregates.component_timing()
             
             # Find peak hours
             peak_hour = max(hourly_distribution.items(), key=lambda x: x[1])[0] if hourly_distribution else 12
@@ -983,35 +978,21 @@ class DSAgentLogAnalyzer(AnalyzerOutputStandardizer):
             print(f"⚠️ Temporal analysis failed: {e}")
             return {}
     
-    def _analyze_component_interactions(self, log_entries: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def _analyze_component_interactions(self, aggregates: LogAggregateTable) -> Dict[str, Any]:
         """Analyze interactions between different components"""
         try:
-            component_sequences = []
-            component_counts = {}
-            
-            # Track component transitions
-            for i in range(len(log_entries) - 1):
-                current_comp = log_entries[i].get('component', 'unknown')
-                next_comp = log_entries[i + 1].get('component', 'unknown')
-                
-                component_counts[current_comp] = component_counts.get(current_comp, 0) + 1
-                
-                if current_comp != next_comp:
-                    transition = f"{current_comp} -> {next_comp}"
-                    component_sequences.append(transition)
-            
-            # Count transition frequencies
-            transition_counts = {}
-            for transition in component_sequences:
-                transition_counts[transition] = transition_counts.get(transition, 0) + 1
+            component_counts = aggregates.outgoing_component_counts()
             
             # Find most common transitions
-            common_transitions = sorted(transition_counts.items(), key=lambda x: x[1], reverse=True)[:5]
+            transition_counts = aggregates.component_transitions()
+            common_transitions = sorted(transition_counts, key=lambda x: x[1], reverse=True)[:5]
+            
+            total_transitions = aggregates.transition_count()
             
             return {
                 'component_counts': component_counts,
                 'common_transitions': common_transitions,
-                'total_transitions': len(component_sequences),
+                'total_transitions': total_transitions,
                 'unique_components': len(component_counts)
             }
             
@@ -1091,6 +1072,16 @@ class DSAgentLogAnalyzer(AnalyzerOutputStandardizer):
         if len(sequences) > 0:
             insights.append(f"🔄 {len(sequences)} recurring sequences found - potential automated processes")
         
+        bursts = pattern_analysis.get('error_bursts', [])
+        if bursts:
+            components = sorted({burst['component'] for burst in bursts})
+            insights.append(f"📈 {pattern_analysis.get('error_burst_count', len(bursts))} error bursts detected ({', '.join(components[:3])})")
+        
+        silences = pattern_analysis.get('silences', [])
+        if silences:
+            components = sorted({silence['component'] for silence in silences})
+            insights.append(f"🔇 {pattern_analysis.get('silence_count', len(silences))} unexpected silences detected ({', '.join(components[:3])}) - components stopped logging")
+        
         # Error cluster analysis
         error_clusters = [c for c in clusters if c.get('error_ratio', 0) > 0.5]
         if error_clusters:
@@ -1119,6 +1110,11 @@ class DSAgentLogAnalyzer(AnalyzerOutputStandardizer):
             if len(sequences) == 0 and len(clusters) > 3:
                 score += 0.2
             
+            # Error bursts and silences are direct rate anomalies
+            rate_events = pattern_analysis.get('error_burst_count', 0) + pattern_analysis.get('silence_count', 0)
+            if rate_events:
+                score += min(rate_events * 0.1, 0.3)
+            
             return min(score, 1.0)
             
         except Exception as e:
@@ -1180,7 +1176,7 @@ class DSAgentLogAnalyzer(AnalyzerOutputStandardizer):
             if not DYNAMIC_RAG_AVAILABLE:
                 return None
                 
-            from dynamic_rag_system import DynamicRAGSystem
+            from dynamic_rag_system import get_dynamic_rag_system
             
             # Create AI prompt for issue analysis
             issue_prompt = f"""
@@ -1203,11 +1199,13 @@ class DSAgentLogAnalyzer(AnalyzerOutputStandardizer):
             """
             
             # Use RAG system for intelligent analysis
-            rag_system = DynamicRAGSystem()
+            rag_system = get_dynamic_rag_system()
             
             # Create context for RAG analysis
-            rag_results = rag_system.process_log_with_dynamic_rag(issue_prompt)
+            rag_results = rag_system.process_log_with_dynamic_rag(issue_prompt, analyzer='ds_logs')
             ai_response = rag_results.get('ai_response', '')
+            if rag_results['analysis_metadata'].get('ai_degraded'):
+                self.ai_degraded = True
             
             if ai_response:
                 # Parse AI response into structured format
@@ -1362,6 +1360,9 @@ class DSAgentLogAnalyzer(AnalyzerOutputStandardizer):
                 # Progress: 15% - Extracting log entries
                 self._update_progress('File Parsing & Initial Analysis', 'Extracting log entries and timestamps...', 15)
                 
+                # Per-component, per-minute counters for burst/silence detection, filled in this pass
+                rate_detector = RateAnomalyDetector()
+                
                 for line_num, line in enumerate(f, 1):
                     results['summary']['total_lines'] += 1
                     line = line.strip()
@@ -1431,6 +1432,8 @@ class DSAgentLogAnalyzer(AnalyzerOutputStandardizer):
                         elif severity == 'warning':
                             results['component_analysis'][component]['warnings'] += 1
                         
+                        rate_detector.add(component, log_entry['timestamp'], severity in ['critical', 'error'])
+                        
                         known_issue = self.analyze_known_issues(log_entry)
                         if known_issue:
                             known_issue['line'] = line_num
@@ -1464,8 +1467,18 @@ class DSAgentLogAnalyzer(AnalyzerOutputStandardizer):
                         log_entry['line'] = line_num
                         all_log_entries.append(log_entry)
             
+            # NEW: Per-component error bursts and silences (e.g. heartbeats stopping)
+            try:
+                rate_anomalies = rate_detector.result()
+            except Exception as e:
+                print(f"⚠️ Rate anomaly detection failed: {e}")
+                rate_anomalies = {}
+            results['rate_anomalies'] = rate_anomalies
+            
             # NEW: Component Health Scoring with ML
-            component_health_scores = self._calculate_component_health_scores(results, all_log_entries)
+            # One aggregation pass shared by health scoring and pattern analysis
+            aggregates = LogAggregateTable(all_log_entries)
+            component_health_scores = self._calculate_component_health_scores(results, all_log_entries, rate_anomalies, aggregates)
             results['component_health'] = component_health_scores
             
             # Merge health scores into component analysis for enhanced display
@@ -1477,7 +1490,7 @@ class DSAgentLogAnalyzer(AnalyzerOutputStandardizer):
                         results['component_analysis'][component]['status_icon'] = health_data['status_icon']
             
             # NEW: Smart Log Pattern Recognition with ML Clustering
-            pattern_analysis = self._analyze_smart_log_patterns(all_log_entries)
+            pattern_analysis = self._analyze_smart_log_patterns(all_log_entries, rate_anomalies, aggregates)
             results['pattern_analysis'] = pattern_analysis
             
             # NEW: Cross-Component Relationship Analysis
@@ -1494,11 +1507,9 @@ class DSAgentLogAnalyzer(AnalyzerOutputStandardizer):
             ml_insights = None
             if ML_AVAILABLE and all_log_entries:
                 try:
-                    # Generate ML insights for Dynamic RAG enhancement
-                    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                        log_content = f.read()
-                    from ml_analyzer import enhance_analysis_with_ml
-                    ml_insights = enhance_analysis_with_ml(log_content, 'ds_logs')
+                    # Generate ML insights for Dynamic RAG enhancement from the entries parsed above
+                    from ml_analyzer import enhance_analysis_with_ml_entries
+                    ml_insights = enhance_analysis_with_ml_entries(all_log_entries, 'ds_logs')
                     print(f"✅ ML insights generated for Dynamic RAG enhancement")
                 except Exception as e:
                     print(f"⚠️  ML enhancement failed: {e}")
@@ -1519,7 +1530,7 @@ class DSAgentLogAnalyzer(AnalyzerOutputStandardizer):
                         
                         from dynamic_rag_system import apply_dynamic_rag_to_analysis
                         self._update_progress('Dynamic RAG & AI Intelligence', 'Processing with Claude AI...', 65)
-                        results = apply_dynamic_rag_to_analysis(results, log_content)
+                        results = apply_dynamic_rag_to_analysis(results, log_content, analyzer='ds_logs')
                         self._update_progress('Dynamic RAG & AI Intelligence', 'Dynamic RAG analysis completed', 70)
                         
                         dynamic_rag = results.get('dynamic_rag_analysis', {})
@@ -1951,10 +1962,9 @@ class DSAgentLogAnalyzer(AnalyzerOutputStandardizer):
             # ML Enhancement for Dynamic RAG (Consolidated Analysis)
             if ML_AVAILABLE and len(all_log_entries) > 0:
                 try:
-                    # Combine log content from all files for ML analysis
-                    combined_content = "\n".join([f"{entry.get('timestamp', '')} {entry.get('message', '')}" for entry in all_log_entries])
-                    from ml_analyzer import enhance_analysis_with_ml
-                    ml_insights = enhance_analysis_with_ml(combined_content, 'ds_logs')
+                    # ML analysis over the entries already parsed from all files
+                    from ml_analyzer import enhance_analysis_with_ml_entries
+                    ml_insights = enhance_analysis_with_ml_entries(all_log_entries, 'ds_logs')
                     consolidated_results['ml_insights'] = ml_insights
                     print(f"✅ Consolidated ML Analysis completed: {len(all_log_entries)} entries from {len(file_paths)} files")
                 except Exception as e:
@@ -1979,7 +1989,7 @@ class DSAgentLogAnalyzer(AnalyzerOutputStandardizer):
                         except Exception as e:
                             print(f"⚠  Could not read {file_path} for RAG: {e}")
                     
-                    consolidated_results = apply_dynamic_rag_to_analysis(consolidated_results, combined_log_content)
+                    consolidated_results = apply_dynamic_rag_to_analysis(consolidated_results, combined_log_content, analyzer='ds_logs')
                     
                     dynamic_rag = consolidated_results.get('dynamic_rag_analysis', {})
                     if dynamic_rag and 'error' not in dynamic_rag:
@@ -2162,7 +2172,7 @@ class DSAgentLogAnalyzer(AnalyzerOutputStandardizer):
             if not DYNAMIC_RAG_AVAILABLE:
                 return []
                 
-            from dynamic_rag_system import DynamicRAGSystem
+            from dynamic_rag_system import get_dynamic_rag_system
             
             critical_issues = analysis.get('critical_issues', [])
             if not critical_issues:
@@ -2181,11 +2191,13 @@ class DSAgentLogAnalyzer(AnalyzerOutputStandardizer):
             Focus on immediate resolution actions.
             """
             
-            rag_system = DynamicRAGSystem()
+            rag_system = get_dynamic_rag_system()
             
             # Create context for RAG analysis
-            rag_results = rag_system.process_log_with_dynamic_rag(prompt)
+            rag_results = rag_system.process_log_with_dynamic_rag(prompt, analyzer='ds_logs')
             ai_response = rag_results.get('ai_response', '')
+            if rag_results['analysis_metadata'].get('ai_degraded'):
+                self.ai_degraded = True
             
             if ai_response:
                 # Extract actionable steps from AI response
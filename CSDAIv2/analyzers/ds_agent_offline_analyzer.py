@@ -38,6 +38,8 @@ class DSAgentOfflineAnalyzer(AnalyzerOutputStandardizer):
     - Real-time threat intelligence integration
     """
     
+    ANALYZER_VERSION = '2'
+    
     def __init__(self, session_manager=None, session_id=None, rag_system=None, ml_analyzer=None):
         """Initialize the Enhanced DS Agent Offline Analyzer"""
         self.session_manager = session_manager
@@ -2176,7 +2178,7 @@ class DSAgentOfflineAnalyzer(AnalyzerOutputStandardizer):
                 try:
                     from dynamic_rag_system import apply_dynamic_rag_to_analysis
                     self._update_progress("AI Knowledge Enhancement", "Enhancing with Deep Security knowledge base...", 90)
-                    results = apply_dynamic_rag_to_analysis(results, log_content)
+                    results = apply_dynamic_rag_to_analysis(results, log_content, analyzer='ds_agent_offline')
                     
                     dynamic_rag = results.get('dynamic_rag_analysis', {})
                     if dynamic_rag and 'error' not in dynamic_rag:
@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+"""
+DSM Event Tables - Streaming reader for Deep Security Manager event CSV exports
+Reads hostevents.csv / firewallevents.csv / antimalwareevents.csv / ... in column-pruned
+chunks and keeps one compact, bounded table per event type (split exports are combined) for package correlation
+"""
+
+from .shared_imports import *
+import warnings
+from typing import Optional
+
+try:
+    import numpy as np
+    import pandas as pd
+    PANDAS_AVAILABLE = True
+except ImportError:
+    PANDAS_AVAILABLE = False
+    print("⚠️ pandas/numpy not available - Manager event CSV ingestion disabled")
+
+# "<prefix>events.csv" - the prefix names the protection module
+MANAGER_EVENT_FILE_PATTERN = re.compile(r'(?:^|/)([a-z_]*)events\.csv$', re.IGNORECASE)
+
+# Export prefix -> (timeline component, default severity); components follow the agent log analyzer's names
+MANAGER_EVENT_TYPES = {
+    'host': ('agent_core', 'info'),
+    'system': ('agent_core', 'info'),
+    'firewall': ('firewall', 'warning'),
+    'dpi': ('intrusion_prevention', 'warning'),
+    'intrusionprevention': ('intrusion_prevention', 'warning'),
+    'antimalware': ('anti_malware', 'error'),
+    'integrity': ('integrity_monitoring', 'warning'),
+    'integritymonitoring': ('integrity_monitoring', 'warning'),
+    'loginspection': ('log_inspection', 'warning'),
+    'webreputation': ('web_reputation', 'warning'),
+    'applicationcontrol': ('application_control', 'warning'),
+    'devicecontrol': ('device_control', 'warning'),
+}
+
+# Candidate headers per canonical column, first match wins (compared lowercased)
+COLUMN_CANDIDATES = {
+    'time': ['time', 'event time', 'detection time', 'log date', 'date/time', 'generated'],
+    'event': ['event', 'reason', 'malware', 'change', 'description', 'url', 'event id'],
+    'severity': ['severity', 'level', 'risk'],
+    'computer': ['computer', 'host', 'hostname', 'target'],
+}
+
+# Manager severity / level values mapped onto the agent log severities
+SEVERITY_MAP = {
+    'critical': 'error',
+    'high': 'error',
+    'error': 'error',
+    'suspicious': 'warning',
+    'medium': 'warning',
+    'warning': 'warning',
+    'low': 'info',
+    'info': 'info',
+    'informational': 'info',
+}
+
+# Only these severities enter the correlation timeline - routine info events (host and system
+# exports) would otherwise bridge every gap and merge the timing windows; they still count in the stats
+TIMELINE_SEVERITIES = ('error', 'warning')
+
+DEFAULT_CHUNK_ROWS = 50000
+DEFAULT_MAX_ROWS = 50000   # per event type; the most recent events are kept
+TOP_EVENT_LIMIT = 5
+
+
+def manager_event_type(file_name: str) -> Optional[str]:
+    """Event type for an export file name ('firewall' for firewallevents.csv), None if not an export"""
+    match = MANAGER_EVENT_FILE_PATTERN.search(file_name.replace('\\', '/'))
+    if not match:
+        return None
+    return match.group(1).lower().replace('_', '') or None
+
+
+def _resolve_columns(csv_path: str) -> Dict[str, str]:
+    """Map canonical columns to the header names present in one export"""
+    header = pd.read_csv(csv_path, nrows=0, encoding='utf-8-sig', encoding_errors='ignore')
+    by_lower = {str(column).strip().lower(): column for column in header.columns}
+
+    resolved = {}
+    for canonical, candidates in COLUMN_CANDIDATES.items():
+        for candidate in candidates:
+            if candidate in by_lower:
+                resolved[canonical] = by_lower[candidate]
+                break
+    return resolved
+
+
+def read_manager_event_csv(csv_paths: Union[str, List[str]], chunk_rows: int = DEFAULT_CHUNK_ROWS,
+                           max_rows: int = DEFAULT_MAX_ROWS) -> Dict[str, Any]:
+    """
+    Stream the Manager exports of one event type into a compact event table
+
+    Several paths (split or rotated exports of the same type) feed one table. Only the
+    time / event / severity / computer columns are read, as categoricals, chunk by chunk;
+    at most max_rows of the most recent events are kept. Returns
+    {'event_type', 'component', 'table', 'stats'} where table has columns
+    timestamp (datetime64), event, severity and computer.
+    """
+    if isinstance(csv_paths, str):
+        csv_paths = [csv_paths]
+    event_type = manager_event_type(os.path.basename(csv_paths[0])) or 'unknown'
+    component, default_severity = MANAGER_EVENT_TYPES.get(event_type, (event_type, 'info'))
+
+    stats = {
+        'file_name': ', '.join(os.path.basename(path) for path in csv_paths),
+        'files': len(csv_paths),
+        'rows_read': 0,
+        'rows_kept': 0,
+        'rows_without_time': 0,
+        'first_event': None,
+        'last_event': None,
+        'severity_counts': {},
+        'top_events': [],
+        'computers': 0
+    }
+
+    kept = None
+    severity_counts = None
+    event_counts = None
+    computers = set()
+    file_errors = []
+
+    for csv_path in csv_paths:
+        columns = _resolve_columns(csv_path)
+        if 'time' not in columns:
+            file_errors.append(f"{os.path.basename(csv_path)}: No time column found")
+            continue
+
+        rename = {actual: canonical for canonical, actual in columns.items()}
+        dtypes = {actual: 'category' for canonical, actual in columns.items() if canonical != 'time'}
+        dtypes[columns['time']] = str
+
+        reader = pd.read_csv(
+            csv_path,
+            usecols=list(columns.values()),
+            dtype=dtypes,
+            chunksize=chunk_rows,
+            encoding='utf-8-sig',
+            encoding_errors='ignore',
+            on_bad_lines='skip'
+        )
+
+        for chunk in reader:
+            chunk = chunk.rename(columns=rename)
+            stats['rows_read'] += len(chunk)
+
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore')
+                timestamps = pd.to_datetime(chunk['time'], errors='coerce', format='mixed')
+            if getattr(timestamps.dt, 'tz', None) is not None:
+                timestamps = timestamps.dt.tz_convert('UTC').dt.tz_localize(None)
+
+            if 'severity' in chunk:
+                # Normalize each distinct value once, then index by category code (-1 = missing)
+                categories = chunk['severity'].cat.categories
+                normalized = np.array(
+                    [SEVERITY_MAP.get(str(value).strip().lower(), default_severity) for value in categories] + [default_severity]
+                )
+                severity = pd.Series(normalized[chunk['severity'].cat.codes.to_numpy()], index=chunk.index)
+            else:
+                severity = pd.Series(default_severity, index=chunk.index)
+
+            table = pd.DataFrame({
+                'timestamp': timestamps,
+                'event': chunk['event'] if 'event' in chunk else component,
+                'severity': severity.astype('category'),
+                'computer': chunk['computer'] if 'computer' in chunk else ''
+            })
+
+            missing_time = table['timestamp'].isna()
+            stats['rows_without_time'] += int(missing_time.sum())
+            table = table[~missing_time]
+
+            # Running aggregates cover every row, not only the kept window
+            chunk_severity = table['severity'].value_counts()
+            severity_counts = chunk_severity if severity_counts is None else severity_counts.add(chunk_severity, fill_value=0)
+            chunk_events = table['event'].value_counts()
+            event_counts = chunk_events if event_counts is None else event_counts.add(chunk_events, fill_value=0)
+            if 'computer' in chunk:
+                computers.update(table['computer'].dropna().unique().tolist())
+
+            table = table.astype({'event': 'category', 'computer': 'category'})
+            kept = table if kept is None else pd.concat([kept, table], ignore_index=True)
+            if len(kept) > max_rows:
+                kept = kept.nlargest(max_rows, 'timestamp').reset_index(drop=True)
+
+    if file_errors:
+        stats['error'] = '; '.join(file_errors)
+
+    if kept is None or kept.empty:
+        return {'event_type': event_type, 'component': component, 'table': None, 'stats': stats}
+
+    kept = kept.sort_values('timestamp', kind='stable').reset_index(drop=True)
+    for column in ('event', 'severity', 'computer'):
+        kept[column] = kept[column].astype('category')
+
+    stats['rows_kept'] = len(kept)
+    stats['first_event'] = str(kept['timestamp'].iloc[0])
+    stats['last_event'] = str(kept['timestamp'].iloc[-1])
+    stats['severity_counts'] = {str(k): int(v) for k, v in severity_counts.items()}
+    stats['top_events'] = [
+        {'event': str(event), 'count': int(count)}
+        for event, count in event_counts.sort_values(ascending=False).head(TOP_EVENT_LIMIT).items()
+    ]
+    stats['computers'] = len(computers)
+
+    return {'event_type': event_type, 'component': component, 'table': kept, 'stats': stats}
+
+
+def load_manager_event_tables(manager_event_paths: List[str], chunk_rows: int = DEFAULT_CHUNK_ROWS,
+                              max_rows: int = DEFAULT_MAX_ROWS) -> Dict[str, Dict[str, Any]]:
+    """Read every Manager export in a package into one table per event type (failed types are reported, not raised)"""
+    paths_by_type = {}
+    for csv_path in manager_event_paths or []:
+        event_type = manager_event_type(os.path.basename(csv_path)) or os.path.basename(csv_path)
+        paths_by_type.setdefault(event_type, []).append(csv_path)
+
+    tables = {}
+    for event_type, csv_paths in paths_by_type.items():
+        try:
+            tables[event_type] = read_manager_event_csv(csv_paths, chunk_rows, max_rows)
+            print(f"✅ Manager {event_type} events: {tables[event_type]['stats']['rows_read']} rows read from {len(csv_paths)} file(s)")
+        except Exception as e:
+            print(f"⚠️  Manager event export {', '.join(os.path.basename(path) for path in csv_paths)} failed: {e}")
+            tables[event_type] = {'event_type': event_type, 'table': None, 'stats': {'error': str(e)}}
+    return tables
+
+
+def timeline_columns(event_table: 'pd.DataFrame') -> Dict[str, List[str]]:
+    """ISO timestamp and severity columns of the warning and error rows, for CorrelationTimeline.add_event_table"""
+    issues = event_table[event_table['severity'].isin(TIMELINE_SEVERITIES)]
+    timestamps = np.datetime_as_string(issues['timestamp'].to_numpy().astype('datetime64[s]'))
+    return {
+        'timestamps': timestamps.tolist(),
+        'severities': issues['severity'].astype(str).tolist()
+    }
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+"""
+Log Aggregate Table - One pass over parsed DS Agent entries into per-component NumPy aggregates
+Component health and smart pattern analysis read pattern counts, hourly histograms, the
+component transition matrix and recent-window statistics from here instead of rescanning
+the entry list once per component
+"""
+
+import numpy as np
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+# Component health message patterns, first match wins
+PATTERN_CATEGORIES = [
+    ('startup_success', ('start', 'load', 'init', 'activate')),
+    ('connection_issues', ('timeout', 'connection', 'fail')),
+    ('performance_issues', ('slow', 'memory', 'cpu', 'performance')),
+    ('recovery_success', ('recover', 'reconnect', 'success')),
+    ('configuration_changes', ('config', 'setting', 'update')),
+]
+NO_PATTERN = len(PATTERN_CATEGORIES)
+
+# Hour reported for entries whose timestamp cannot be parsed
+DEFAULT_HOUR = 12
+HOURS_PER_DAY = 24
+
+
+def _pattern_category(message: str) -> int:
+    """Index of the first pattern category the (lowercased) message matches"""
+    for index, (_, words) in enumerate(PATTERN_CATEGORIES):
+        if any(word in message for word in words):
+            return index
+    return NO_PATTERN
+
+
+def _ordered_counts(values: np.ndarray) -> List[Tuple[int, int]]:
+    """(value, count) pairs in order of first appearance"""
+    if not len(values):
+        return []
+    unique, first_index, counts = np.unique(values, return_index=True, return_counts=True)
+    order = np.argsort(first_index, kind='stable')
+    return [(int(unique[i]), int(counts[i])) for i in order]
+
+
+class LogAggregateTable:
+    """
+    Per-entry codes and flags as NumPy arrays, built in a single pass
+
+    Components are keyed like the analyses that read them: `component` (default 'unknown')
+    for temporal and interaction patterns, lowercased `component` for health patterns.
+    """
+
+    def __init__(self, log_entries: List[Dict[str, Any]]):
+        count = len(log_entries)
+        self.entry_count = count
+
+        self.components = {}
+        self.lower_components = {}
+        self.codes = np.empty(count, dtype=np.int64)
+        self.lower_codes = np.empty(count, dtype=np.int64)
+        self.categories = np.empty(count, dtype=np.int64)
+        self.is_error = np.zeros(count, dtype=bool)
+        timestamps = []
+
+        for i, entry in enumerate(log_entries):
+            name = entry.get('component', 'unknown')
+            code = self.components.get(name)
+            if code is None:
+                code = self.components[name] = len(self.components)
+            self.codes[i] = code
+
+            lower_name = entry.get('component', '').lower()
+            lower_code = self.lower_components.get(lower_name)
+            if lower_code is None:
+                lower_code = self.lower_components[lower_name] = len(self.lower_components)
+            self.lower_codes[i] = lower_code
+
+            message = entry.get('message', '').lower()
+            self.is_error[i] = 'error' in message
+            self.categories[i] = _pattern_category(message)
+            timestamps.append(entry.get('timestamp', ''))
+
+        self.component_names = list(self.components)
+        self.sort_keys = np.array([t if isinstance(t, str) else '' for t in timestamps], dtype=str)
+        self.seconds = self._parse_seconds(timestamps)
+        self.has_time = ~np.isnat(self.seconds)
+        self.hours = np.full(count, DEFAULT_HOUR, dtype=np.int64)
+        self.hours[self.has_time] = (self.seconds[self.has_time].astype(np.int64) // 3600) % HOURS_PER_DAY
+
+        # (lowercased component x pattern category) counts
+        self.pattern_counts = np.bincount(
+            self.lower_codes * (NO_PATTERN + 1) + self.categories,
+            minlength=len(self.lower_components) * (NO_PATTERN + 1)
+        ).reshape(len(self.lower_components), NO_PATTERN + 1)
+
+        # Consecutive-entry component transitions (from x to)
+        size = len(self.components)
+        self.transition_matrix = np.bincount(
+            self.codes[:-1] * size + self.codes[1:], minlength=size * size
+        ).reshape(size, size) if count > 1 else np.zeros((size, size), dtype=np.int64)
+
+    @staticmethod
+    def _parse_seconds(timestamps: List[Any]) -> np.ndarray:
+        """'YYYY-MM-DD HH:MM:SS' prefixes as datetime64[s], NaT where missing or malformed"""
+        prefixes = [t[:19] if isinstance(t, str) and len(t) >= 19 and t[10] == ' ' else '' for t in timestamps]
+        try:
+            return np.array(prefixes, dtype='datetime64[s]')
+        except ValueError:
+            seconds = np.full(len(prefixes), np.datetime64('NaT'), dtype='datetime64[s]')
+            for i, prefix in enumerate(prefixes):
+                try:
+                    seconds[i] = np.datetime64(prefix, 's')
+                except ValueError:
+                    continue
+            return seconds
+
+    def component_patterns(self, component: str) -> Dict[str, int]:
+        """Health pattern counts for a component (matched case-insensitively)"""
+        row = self.lower_components.get(component.lower())
+        counts = self.pattern_counts[row] if row is not None else np.zeros(NO_PATTERN + 1, dtype=np.int64)
+        return {name: int(counts[index]) for index, (name, _) in enumerate(PATTERN_CATEGORIES)}
+
+    def recent_activity(self, window_seconds: int = 3600, now: Optional[datetime] = None) -> Tuple[int, int]:
+        """(entries, entries mentioning 'error') timestamped less than window_seconds before now"""
+        now = np.datetime64(now or datetime.now(), 's')
+        recent = self.has_time.copy()
+        recent[self.has_time] = (now - self.seconds[self.has_time]).astype(np.int64) < window_seconds
+        return int(recent.sum()), int((recent & self.is_error).sum())
+
+    def error_rate_halves(self) -> Tuple[float, float]:
+        """Share of 'error' entries in the earlier and later half of the log, by timestamp"""
+        errors = self.is_error[np.argsort(self.sort_keys, kind='stable')]
+        middle = self.entry_count // 2
+        first, second = errors[:middle], errors[middle:]
+        return (float(first.mean()) if len(first) else 0, float(second.mean()) if len(second) else 0)
+
+    def hourly_distribution(self) -> Dict[int, int]:
+        """Entries per hour of day, hours in order of first appearance"""
+        return dict(_ordered_counts(self.hours))
+
+    def component_timing(self) -> Dict[str, Dict[int, int]]:
+        """Entries per hour of day for each component"""
+        timing = {}
+        for cell, count in _ordered_counts(self.codes * HOURS_PER_DAY + self.hours):
+            component = self.component_names[cell // HOURS_PER_DAY]
+            timing.setdefault(component, {})[cell % HOURS_PER_DAY] = count
+        return timing
+
+    def outgoing_component_counts(self) -> Dict[str, int]:
+        """Entries per component, excluding the last entry (the ones a transition starts from)"""
+        return {self.component_names[code]: count for code, count in _ordered_counts(self.codes[:-1])}
+
+    def component_transitions(self) -> List[Tuple[str, int]]:
+        """'from -> to' changes of component between consecutive entries, in order of first appearance"""
+        current, following = self.codes[:-1], self.codes[1:]
+        changed = current != following
+        size = len(self.components)
+        return [
+            (f"{self.component_names[cell // size]} -> {self.component_names[cell % size]}", count)
+            for cell, count in _ordered_counts(current[changed] * size + following[changed])
+        ]
+
+    def transition_count(self) -> int:
+        """Changes of component between consecutive entries (the transition matrix off its diagonal)"""
+        return int(self.transition_matrix.sum() - np.trace(self.transition_matrix))
@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""
+Diagnostic Package Index - Central-directory index with lazy member extraction
+Categorizes ZIP members from the central directory only and materializes a member
+on disk the first time a sub-analyzer asks for it
+"""
+
+from .shared_imports import *
+import io
+import threading
+
+# Skip members larger than this (matches the previous eager extractor)
+MAX_MEMBER_SIZE = 100 * 1024 * 1024
+
+
+class DiagnosticPackageIndex:
+    """Index of a diagnostic package ZIP with on-demand, per-member extraction"""
+
+    def __init__(self, zip_path: str, extract_path: str, package_patterns: Dict[str, List[str]]):
+        self.zip_path = zip_path
+        self.extract_path = extract_path
+        self.package_patterns = package_patterns
+
+        self.entries = {category: [] for category in package_patterns}
+        self.entries['other_files'] = []
+
+        self.stats = {
+            'total_files': 0,
+            'indexed_files': 0,
+            'processed_files': 0,
+            'skipped_files': 0,
+            'bytes_extracted': 0,
+            'errors': []
+        }
+
+        self._lock = threading.Lock()
+        self._member_locks = {}
+        
+        # Per-member context samplers, built once and rendered at different budgets
+        self.context_samplers = {}
+
+        self._compiled_patterns = [
+            (category, [re.compile(pattern, re.IGNORECASE) for pattern in patterns])
+            for category, patterns in package_patterns.items()
+        ]
+
+        self._build()
+
+    def _categorize(self, file_name: str) -> str:
+        """Return the first category whose patterns match the member name"""
+        for category, patterns in self._compiled_patterns:
+            if any(pattern.search(file_name) for pattern in patterns):
+                return category
+        return 'other'
+
+    def _build(self):
+        """Read the central directory once; no member data is decompressed here"""
+        with zipfile.ZipFile(self.zip_path, 'r') as zip_ref:
+            infos = zip_ref.infolist()
+
+        self.stats['total_files'] = len(infos)
+
+        for info in infos:
+            # Skip directories and very large files
+            if info.is_dir() or info.file_size > MAX_MEMBER_SIZE:
+                self.stats['skipped_files'] += 1
+                continue
+
+            # Encrypted members are flagged in the central directory
+            if info.flag_bits & 0x1:
+                print(f"⚠️  Skipping encrypted file: {info.filename}")
+                self.stats['skipped_files'] += 1
+                self.stats['errors'].append(f"Skipped encrypted file: {info.filename}")
+                continue
+
+            category = self._categorize(info.filename)
+            entry = {
+                'file_name': info.filename,
+                # Set by materialize() to the path ZipFile.extract sanitized and wrote
+                'file_path': None,
+                'file_size': info.file_size,
+                'compressed_size': info.compress_size,
+                'crc': f"{info.CRC:08x}",
+                'category': category,
+                'materialized': False
+            }
+            self.entries['other_files' if category == 'other' else category].append(entry)
+            self.stats['indexed_files'] += 1
+
+    def find(self, category: str, name_contains: str) -> List[Dict[str, Any]]:
+        """Entries in a category whose member name contains the given text"""
+        return [entry for entry in self.entries.get(category, []) if name_contains in entry['file_name']]
+
+    def _member_lock(self, file_name: str) -> threading.Lock:
+        """Per-member lock so concurrent requests for one member extract it once"""
+        with self._lock:
+            if file_name not in self._member_locks:
+                self._member_locks[file_name] = threading.Lock()
+            return self._member_locks[file_name]
+
+    def materialize(self, entry: Dict[str, Any]) -> str:
+        """
+        Extract a single member to disk (once) and return its path
+
+        Each call uses its own ZipFile handle, so extracting one member never
+        waits on another member's decompression.
+        """
+        with self._member_lock(entry['file_name']):
+            if entry['materialized']:
+                return entry['file_path']
+
+            try:
+                with zipfile.ZipFile(self.zip_path, 'r') as zip_ref:
+                    extracted_path = zip_ref.extract(entry['file_name'], self.extract_path)
+            except Exception as e:
+                with self._lock:
+                    self.stats['errors'].append(f"Failed to extract {entry['file_name']}: {str(e)}")
+                raise SecurityError(f"Failed to extract {entry['file_name']}: {str(e)}")
+
+            entry['file_path'] = extracted_path
+            entry['materialized'] = True
+            with self._lock:
+                self.stats['processed_files'] += 1
+                self.stats['bytes_extracted'] += entry['file_size']
+            return extracted_path
+
+    def materialize_all(self, categories: List[str] = None) -> None:
+        """Eagerly extract every indexed member (optionally limited to some categories)"""
+        for category, entries in self.entries.items():
+            if categories and category not in categories:
+                continue
+            for entry in entries:
+                try:
+                    self.materialize(entry)
+                except SecurityError:
+                    continue
+
+    def read_text(self, entry: Dict[str, Any], max_chars: int) -> str:
+        """Read the first max_chars of a member without extracting it to disk"""
+        if entry['materialized']:
+            with open(entry['file_path'], 'r', encoding='utf-8', errors='ignore') as f:
+                return f.read(max_chars)
+
+        with zipfile.ZipFile(self.zip_path, 'r') as zip_ref:
+            with zip_ref.open(entry['file_name']) as member:
+                # UTF-8 never needs more than 4 bytes per character
+                data = member.read(max_chars * 4)
+        return data.decode('utf-8', errors='ignore')[:max_chars]
+
+    def iter_lines(self, entry: Dict[str, Any]):
+        """Stream a member's text lines, from disk if materialized, otherwise straight from the archive"""
+        if entry['materialized']:
+            with open(entry['file_path'], 'r', encoding='utf-8', errors='ignore') as f:
+                yield from f
+            return
+
+        with zipfile.ZipFile(self.zip_path, 'r') as zip_ref:
+            with zip_ref.open(entry['file_name']) as member:
+                yield from io.TextIOWrapper(member, encoding='utf-8', errors='ignore')
+
+    def to_extraction_results(self) -> Dict[str, Any]:
+        """JSON-safe summary in the shape returned by extract_diagnostic_package"""
+        with self._lock:
+            stats = dict(self.stats, errors=list(self.stats['errors']))
+        return {
+            'extracted_files': {category: [dict(entry) for entry in entries] for category, entries in self.entries.items()},
+            'extraction_stats': stats,
+            'extract_path': self.extract_path
+        }
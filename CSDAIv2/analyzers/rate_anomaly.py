@@ -0,0 +1,245 @@
+# -*- coding: utf-8 -*-
+"""
+Rate Anomaly Detector - Per-component error bursts and silences from per-minute counts
+Entries stream through once; only a (components x minutes) count matrix is kept, filled
+with bincount in chunks. Error counts are compared with an EWMA baseline (Poisson bursts);
+silences compare quiet runs with the EWMA share of minutes a component normally logs in.
+"""
+
+import math
+import numpy as np
+from typing import Any, Dict, List
+
+# Entries buffered before they are folded into the count matrix
+CHUNK_ENTRIES = 65536
+# Minutes tracked from the earliest timestamp seen (31 days); later entries are counted as out of window
+MAX_WINDOW_MINUTES = 31 * 24 * 60
+
+# EWMA smoothing of the per-minute baseline
+EWMA_ALPHA = 0.1
+
+# Burst: errors in a minute at least MIN_BURST_ERRORS and baseline + BURST_SIGMA x sqrt(baseline)
+MIN_BURST_ERRORS = 5
+BURST_SIGMA = 4.0
+
+# Silence: after at least SILENCE_MIN_HISTORY active minutes, a component that logs in at least
+# SILENCE_MIN_OCCUPANCY of its minutes goes quiet for SILENCE_MIN_MINUTES or more, long enough
+# that the Poisson chance of no entries is below SILENCE_P_VALUE
+SILENCE_MIN_HISTORY = 30
+SILENCE_MIN_OCCUPANCY = 0.1
+SILENCE_MIN_MINUTES = 10
+SILENCE_P_VALUE = 1e-3
+# Occupancy is capped below 1 so the implied Poisson rate stays finite
+MAX_OCCUPANCY = 0.99
+
+MAX_REPORTED_EVENTS = 50
+# Largest events kept per component in the untruncated per-component summary
+MAX_COMPONENT_EVENTS = 2
+
+
+class RateAnomalyDetector:
+    """One-pass per-component, per-minute counter with burst and silence detection"""
+
+    def __init__(self):
+        self.components = {}
+        self.start_minute = None
+        self.width = 0
+        self.counts = np.zeros((0, 0), dtype=np.int32)
+        self.error_counts = np.zeros((0, 0), dtype=np.int32)
+        self.entries_out_of_window = 0
+        self.entries_without_time = 0
+
+        self._rows = []
+        self._timestamps = []
+        self._errors = []
+
+    def add(self, component: str, timestamp: str, is_error: bool) -> None:
+        """Count one entry; timestamp is 'YYYY-MM-DD HH:MM...' (seconds and beyond are ignored)"""
+        row = self.components.get(component)
+        if row is None:
+            row = self.components[component] = len(self.components)
+        self._rows.append(row)
+        self._timestamps.append(timestamp[:16])
+        self._errors.append(is_error)
+        if len(self._rows) >= CHUNK_ENTRIES:
+            self._flush()
+
+    @staticmethod
+    def _epoch_minutes(timestamps: List[str]) -> np.ndarray:
+        """Epoch minutes per timestamp, -1 where it cannot be parsed"""
+        try:
+            return np.array(timestamps, dtype='datetime64[m]').astype(np.int64)
+        except ValueError:
+            minutes = np.full(len(timestamps), -1, dtype=np.int64)
+            for i, timestamp in enumerate(timestamps):
+                try:
+                    minutes[i] = np.datetime64(timestamp, 'm').astype(np.int64)
+                except ValueError:
+                    continue
+            return minutes
+
+    def _flush(self) -> None:
+        """Fold the buffered entries into the count matrices"""
+        if not self._rows:
+            return
+        rows = np.asarray(self._rows, dtype=np.int64)
+        errors = np.asarray(self._errors, dtype=bool)
+        minutes = self._epoch_minutes(self._timestamps)
+        self._rows, self._timestamps, self._errors = [], [], []
+
+        valid = minutes >= 0
+        self.entries_without_time += int((~valid).sum())
+        rows, errors, minutes = rows[valid], errors[valid], minutes[valid]
+        if not len(minutes):
+            return
+
+        earliest = int(minutes.min())
+        if self.start_minute is None:
+            self.start_minute = earliest
+        elif earliest < self.start_minute:
+            self._move_start(earliest)
+        offsets = minutes - self.start_minute
+        in_window = (offsets >= 0) & (offsets < MAX_WINDOW_MINUTES)
+        self.entries_out_of_window += int((~in_window).sum())
+        rows, errors, offsets = rows[in_window], errors[in_window], offsets[in_window]
+        if not len(offsets):
+            return
+
+        # Grow the matrices to the components and minutes seen so far
+        height = len(self.components)
+        width = max(self.width, int(offsets.max()) + 1)
+        if (height, width) != self.counts.shape:
+            grown_counts = np.zeros((height, width), dtype=np.int32)
+            grown_errors = np.zeros((height, width), dtype=np.int32)
+            grown_counts[:self.counts.shape[0], :self.counts.shape[1]] = self.counts
+            grown_errors[:self.error_counts.shape[0], :self.error_counts.shape[1]] = self.error_counts
+            self.counts, self.error_counts, self.width = grown_counts, grown_errors, width
+
+        cells = rows * width + offsets
+        self.counts += np.bincount(cells, minlength=height * width).reshape(height, width).astype(np.int32)
+        self.error_counts += np.bincount(cells[errors], minlength=height * width).reshape(height, width).astype(np.int32)
+
+    def _move_start(self, start_minute: int) -> None:
+        """Re-anchor the window at an earlier minute (rotated or clock-skewed logs); minutes pushed past the window end are dropped"""
+        shift = self.start_minute - start_minute
+        self.start_minute = start_minute
+        if not self.width:
+            return
+        width = min(self.width + shift, MAX_WINDOW_MINUTES)
+        kept = max(width - shift, 0)
+        self.entries_out_of_window += int(self.counts[:, kept:].sum())
+        moved_counts = np.zeros((self.counts.shape[0], width), dtype=np.int32)
+        moved_errors = np.zeros((self.counts.shape[0], width), dtype=np.int32)
+        moved_counts[:, shift:shift + kept] = self.counts[:, :kept]
+        moved_errors[:, shift:shift + kept] = self.error_counts[:, :kept]
+        self.counts, self.error_counts, self.width = moved_counts, moved_errors, width
+
+    @staticmethod
+    def _prior_ewma(series: np.ndarray, seed: np.ndarray) -> np.ndarray:
+        """Baseline for each minute from the minutes before it (all components at once)"""
+        baseline = np.empty(series.shape, dtype=float)
+        level = seed.astype(float)
+        for minute in range(series.shape[1]):
+            baseline[:, minute] = level
+            level = EWMA_ALPHA * series[:, minute] + (1 - EWMA_ALPHA) * level
+        return baseline
+
+    def _minute_label(self, offset: int) -> str:
+        return str(np.datetime64(self.start_minute + int(offset), 'm')).replace('T', ' ')
+
+    @staticmethod
+    def _runs(mask: np.ndarray) -> List[tuple]:
+        """(start, end) index pairs of consecutive True values, end exclusive"""
+        edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+        return list(zip(np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)))
+
+    def result(self) -> Dict[str, Any]:
+        """Bursts and silences per component over the whole window"""
+        self._flush()
+        names = sorted(self.components, key=self.components.get)
+        bursts, silences = [], []
+
+        if self.width:
+            error_baseline = self._prior_ewma(self.error_counts, np.median(self.error_counts, axis=1))
+            burst_threshold = np.maximum(MIN_BURST_ERRORS, error_baseline + BURST_SIGMA * np.sqrt(error_baseline))
+            burst_mask = self.error_counts >= burst_threshold
+
+            # Share of minutes with any entry - a burst of lines still counts as one minute
+            logged = self.counts > 0
+            first_active = np.where(logged.any(axis=1), logged.argmax(axis=1), self.width)
+            last_active = self.width - 1 - logged[:, ::-1].argmax(axis=1)
+            span = np.maximum(last_active - first_active + 1, 1)
+            occupancy = self._prior_ewma(logged, logged.sum(axis=1) / span)
+            silence_score = -math.log(SILENCE_P_VALUE)
+
+            for row, component in enumerate(names):
+                for start, end in self._runs(burst_mask[row]):
+                    errors = self.error_counts[row, start:end]
+                    bursts.append({
+                        'component': component,
+                        'start': self._minute_label(start),
+                        'end': self._minute_label(end - 1),
+                        'minutes': int(end - start),
+                        'error_count': int(errors.sum()),
+                        'peak_errors_per_minute': int(errors.max()),
+                        'baseline_errors_per_minute': round(float(error_baseline[row, start]), 2)
+                    })
+
+                # Silences only count once the component has logged in SILENCE_MIN_HISTORY minutes
+                quiet = ~logged[row]
+                quiet[np.cumsum(logged[row]) < SILENCE_MIN_HISTORY] = False
+                for start, end in self._runs(quiet):
+                    share = min(float(occupancy[row, start]), MAX_OCCUPANCY)
+                    length = int(end - start)
+                    if share < SILENCE_MIN_OCCUPANCY or length < SILENCE_MIN_MINUTES:
+                        continue
+                    # Poisson rate behind that share; no entries for the run must be unlikely
+                    rate = -math.log(1 - share)
+                    if rate * length < silence_score:
+                        continue
+                    silences.append({
+                        'component': component,
+                        'start': self._minute_label(start),
+                        'end': self._minute_label(end - 1),
+                        'minutes': length,
+                        'expected_active_minutes': round(share * length, 1),
+                        'baseline_active_share': round(share, 2),
+                        'ongoing_at_end': bool(end == self.width)
+                    })
+
+        bursts.sort(key=lambda event: event['error_count'], reverse=True)
+        silences.sort(key=lambda event: event['expected_active_minutes'], reverse=True)
+
+        # Totals for every component, independent of the MAX_REPORTED_EVENTS cut
+        per_component = {
+            name: {'burst_count': 0, 'burst_errors': 0, 'silence_count': 0, 'ongoing_silences': 0, 'bursts': [], 'silences': []}
+            for name in names
+        }
+        for event in bursts:
+            summary = per_component[event['component']]
+            summary['burst_count'] += 1
+            summary['burst_errors'] += event['error_count']
+            if len(summary['bursts']) < MAX_COMPONENT_EVENTS:
+                summary['bursts'].append(event)
+        for event in silences:
+            summary = per_component[event['component']]
+            summary['silence_count'] += 1
+            summary['ongoing_silences'] += int(event['ongoing_at_end'])
+            if len(summary['silences']) < MAX_COMPONENT_EVENTS:
+                summary['silences'].append(event)
+
+        return {
+            'bucket_minutes': 1,
+            'window_start': self._minute_label(0) if self.width else None,
+            'window_end': self._minute_label(self.width - 1) if self.width else None,
+            'window_minutes': self.width,
+            'components_tracked': len(names),
+            'bursts': bursts[:MAX_REPORTED_EVENTS],
+            'silences': silences[:MAX_REPORTED_EVENTS],
+            'burst_count': len(bursts),
+            'silence_count': len(silences),
+            'per_component': per_component,
+            'entries_out_of_window': self.entries_out_of_window,
+            'entries_without_time': self.entries_without_time
+        }
+
@@ -6,10 +6,17 @@ Extracted from analyzers.py lines 2216-2964 with safety enhancements
 
 from .shared_imports import *
 from .base.standardizer import AnalyzerOutputStandardizer
+from .busy_process_table import (
+    PANDAS_AVAILABLE, parse_busy_process_snapshots, combine_snapshot_tables,
+    summarize_process_trends, busy_process_records
+)
+from cache_store import get_llm_response_cache
 
 class ResourceAnalyzer(AnalyzerOutputStandardizer):
     """Resource Analyzer for exclusion recommendations with progress tracking"""
     
+    ANALYZER_VERSION = '2'
+    
     def __init__(self, session_manager=None, session_id=None, rag_system=None, ml_analyzer=None):
         """Initialize with optional progress tracking, RAG system, and ML analyzer"""
         self.session_manager = session_manager
@@ -53,26 +60,8 @@ class ResourceAnalyzer(AnalyzerOutputStandardizer):
     def extract_processes_from_xml(self, xml_path: str) -> List[str]:
         """Extract process names from RunningProcesses.xml"""
         try:
-            validate_xml_content(xml_path)
-            
-            with open(xml_path, 'rb') as f:
-                content = f.read()
-            
-            root = ET.fromstring(content)
-            processes = []
-            
-            host_metadata_elements = root.findall(".//HostMetaData")
-            
-            for host in host_metadata_elements:
-                for attr in host.findall(".//Attribute"):
-                    if attr.attrib.get("name") == "process":
-                        proc_name = attr.attrib.get("value")
-                        if proc_name:
-                            sanitized_name = sanitize_process_name(proc_name)
-                            if sanitized_name:
-                                processes.append(sanitized_name)
-            
-            return processes
+            # Single streaming validate+extract pass, shared with other analyzers on the same file
+            return extract_running_processes(xml_path)
             
         except SecurityError as e:
             raise SecurityError(f"XML processing failed: {str(e)}")
@@ -80,7 +69,26 @@ class ResourceAnalyzer(AnalyzerOutputStandardizer):
             raise SecurityError(f"Unexpected error processing XML: {str(e)}")
 
     def parse_top_n_busy_process(self, txt_path: str) -> List[Dict]:
-        """Parse TopNBusyProcess.txt"""
+        """Parse TopNBusyProcess.txt into one ranked record per process"""
+        if not PANDAS_AVAILABLE:
+            return self._parse_top_n_busy_process_legacy(txt_path)
+        
+        return self.rank_busy_processes([self.parse_top_n_busy_process_table(txt_path)])
+
+    def parse_top_n_busy_process_table(self, txt_path: str):
+        """Parse TopNBusyProcess.txt snapshots into a columnar table"""
+        try:
+            return parse_busy_process_snapshots(txt_path)
+        except Exception as e:
+            raise SecurityError(f"Error parsing TopNBusyProcess.txt: {str(e)}")
+
+    def rank_busy_processes(self, tables: List) -> List[Dict]:
+        """Aggregate snapshot tables into exclusion-ranked per-process records with trend statistics"""
+        summary = summarize_process_trends(combine_snapshot_tables(tables))
+        return busy_process_records(summary)
+
+    def _parse_top_n_busy_process_legacy(self, txt_path: str) -> List[Dict]:
+        """Parse TopNBusyProcess.txt without pandas (one dict per snapshot entry)"""
         try:
             busy_processes = []
             with open(txt_path, 'r', encoding='utf-8', errors='ignore') as f:
@@ -221,6 +229,7 @@ class ResourceAnalyzer(AnalyzerOutputStandardizer):
             # Enhanced AI Analysis with Deep Security context
             analysis_text = self._perform_ai_analysis(process_list, busy_processes, candidates, total_scan_count, analysis_result['performance_metrics'])
             analysis_result['analysis_text'] = analysis_text
+            analysis_result['ai_degraded'] = self.ai_degraded
             
             # Set status based on analysis (preserve partial analysis status)
             if candidates:
@@ -466,6 +475,7 @@ class ResourceAnalyzer(AnalyzerOutputStandardizer):
                     timeout=120.0  # Increase timeout for ResourceAnalyzer
                 )
             except Exception as e:
+                self.ai_degraded = True
                 return f"Failed to initialize OpenAI client: {str(e)}\n\n{self._generate_fallback_analysis(candidates, performance_metrics)}"
             
             # Enhanced AI prompt with Deep Security expertise
@@ -502,21 +512,38 @@ class ResourceAnalyzer(AnalyzerOutputStandardizer):
                 prompt += "\nNo high-impact non-Trend Micro processes detected.\n"
                 prompt += "PROVIDE ASSESSMENT OF CURRENT PERFORMANCE STATE:\n"
 
+            # PERFORMANCE OPTIMIZATION: Reuse the model response to an identical prompt
+            max_tokens = 4000
+            temperature = 0.3
+            response_cache = get_llm_response_cache()
+            response_key = None
+            if response_cache:
+                response_key = response_cache.key_for(config.OPENAI_MODEL, prompt, temperature, max_tokens)
+                cached_text = response_cache.get_response('resource', response_key)
+                if cached_text is not None:
+                    print(f"⚡ LLM response cache hit for resource analysis ({len(cached_text)} characters)")
+                    return cached_text
+            
             try:
                 response = client.chat.completions.create(
                     model=config.OPENAI_MODEL,
                     messages=[{"role": "user", "content": prompt}],
-                    max_tokens=4000,
-                    temperature=0.3,
+                    max_tokens=max_tokens,
+                    temperature=temperature,
                     timeout=120  # Extended timeout for resource analysis with large datasets
                 )
                 
-                return response.choices[0].message.content
+                text = response.choices[0].message.content
+                if response_cache and response_key and text:
+                    response_cache.set_response('resource', response_key, text, config.OPENAI_MODEL)
+                return text
                 
             except Exception as api_error:
+                self.ai_degraded = True
                 return f"AI analysis temporarily unavailable: {str(api_error)}\n\n{self._generate_fallback_analysis(candidates, performance_metrics)}"
                 
         except Exception as e:
+            self.ai_degraded = True
             return f"Analysis error: {str(e)}\n\n{self._generate_fallback_analysis(candidates, performance_metrics)}"
 
     def _generate_fallback_analysis(self, candidates: List[Dict], performance_metrics: Dict) -> str:
@@ -807,12 +834,20 @@ To implement exclusions:
             self._update_progress("Data Processing", "Extracting busy process data", 50)
             
             # Process TXT files (TopNBusyProcess.txt)
+            busy_tables = []
             for txt_file in txt_files:
                 try:
-                    busy_processes.extend(self.parse_top_n_busy_process(txt_file))
+                    if PANDAS_AVAILABLE:
+                        busy_tables.append(self.parse_top_n_busy_process_table(txt_file))
+                    else:
+                        busy_processes.extend(self.parse_top_n_busy_process(txt_file))
                 except Exception as e:
                     print(f"Warning: Failed to process TXT file {txt_file}: {e}")
             
+            # Rank across all captures together so multi-file uploads share one trend view
+            if busy_tables:
+                busy_processes = self.rank_busy_processes(busy_tables)
+            
             self._update_progress("Analysis", "Analyzing resource conflicts", 70)
             
             # Perform resource conflict analysis
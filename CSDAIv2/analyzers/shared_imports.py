@@ -11,7 +11,7 @@ import zipfile
 import tempfile
 from datetime import datetime
 from typing import List, Dict, Any, Union
-from security import SecurityError, validate_xml_content, sanitize_process_name
+from security import SecurityError, validate_xml_content, sanitize_process_name, extract_running_processes, iter_xml_events
 
 # Import OpenAI for analysis
 try:
@@ -41,7 +41,7 @@ except ImportError as e:
 # Export all shared dependencies
 __all__ = [
     'os', 're', 'ET', 'datetime', 'List', 'Dict', 'Any', 'Union', 'zipfile', 'tempfile',
-    'SecurityError', 'validate_xml_content', 'sanitize_process_name',
+    'SecurityError', 'validate_xml_content', 'sanitize_process_name', 'extract_running_processes', 'iter_xml_events',
     'OpenAI', 'OPENAI_AVAILABLE', 'enhance_analysis_with_ml', 'ML_AVAILABLE',
     'DynamicRAGSystem', 'apply_dynamic_rag_to_analysis', 'DYNAMIC_RAG_AVAILABLE'
 ]
@@ -0,0 +1,301 @@
+# -*- coding: utf-8 -*-
+"""
+XML Artifacts - Streaming extractors for large auxiliary XML files in diagnostic packages
+Each artifact (msinfo.nfo, config.xml, Windows event log exports) has a handler that pulls
+only the fields we need from the secure pull parser; finished subtrees are discarded as
+they complete, so peak memory stays flat regardless of file size
+"""
+
+from .shared_imports import *
+from typing import Optional
+from collections import Counter
+
+# Bound on retained per-event records (counts always cover the whole file)
+MAX_EVENT_RECORDS = 20000
+MAX_LISTED_ITEMS = 50
+TOP_COUNT_LIMIT = 10
+
+# msinfo "System Summary" items worth keeping
+MSINFO_SUMMARY_FIELDS = {
+    'OS Name', 'Version', 'System Name', 'System Manufacturer', 'System Model', 'System Type',
+    'Processor', 'BIOS Version/Date', 'Installed Physical Memory (RAM)', 'Total Physical Memory',
+    'Available Physical Memory', 'Time Zone', 'Boot Device', 'Virtualization-based security'
+}
+
+# Windows event Level values
+WINDOWS_EVENT_LEVELS = {'1': 'critical', '2': 'error', '3': 'warning', '4': 'info', '0': 'info', '5': 'verbose'}
+
+
+def local_name(tag: str) -> str:
+    """Tag without its '{namespace}' prefix"""
+    return tag.rsplit('}', 1)[-1] if '}' in tag else tag
+
+
+class XMLArtifactHandler:
+    """
+    Base handler driven by extract_xml_artifact
+
+    start() sees each element with its attributes, end() sees it complete. Elements whose
+    local name is in record_tags are kept intact (with children) until their end() call;
+    everything else is dropped as soon as it ends.
+    """
+
+    record_tags = frozenset()
+
+    def start(self, tag: str, elem) -> None:
+        pass
+
+    def end(self, tag: str, elem) -> None:
+        pass
+
+    def result(self) -> Dict[str, Any]:
+        raise NotImplementedError
+
+
+class MsInfoHandler(XMLArtifactHandler):
+    """msinfo32 export: system summary, OS build and the driver inventory"""
+
+    record_tags = frozenset({'Data'})
+
+    def __init__(self):
+        self.categories = []
+        self.summary = {}
+        self.drivers = []
+
+    def start(self, tag, elem):
+        if tag == 'Category':
+            self.categories.append(elem.attrib.get('name', ''))
+
+    def end(self, tag, elem):
+        if tag == 'Category':
+            self.categories.pop()
+            return
+        if tag != 'Data' or not self.categories:
+            return
+
+        fields = {local_name(child.tag): (child.text or '').strip() for child in elem}
+        category = self.categories[-1]
+        if category == 'System Summary':
+            item = fields.get('Item')
+            if item in MSINFO_SUMMARY_FIELDS:
+                self.summary[item] = fields.get('Value', '')
+        elif category == 'System Drivers' and fields.get('Name'):
+            self.drivers.append({
+                'name': fields['Name'],
+                'type': fields.get('Type', ''),
+                'state': fields.get('State', ''),
+                'start_mode': fields.get('Start_Mode', ''),
+                'file': fields.get('File', '')
+            })
+
+    def result(self):
+        build_match = re.search(r'Build\s+(\d+)', self.summary.get('Version', ''))
+        running = [d for d in self.drivers if d['state'].lower() == 'running']
+        # File system drivers are where minifilters (AV, backup, encryption) live
+        filter_drivers = [d['name'] for d in running if 'file system' in d['type'].lower()]
+        return {
+            'artifact_type': 'msinfo',
+            'os_name': self.summary.get('OS Name'),
+            'os_version': self.summary.get('Version'),
+            'os_build': build_match.group(1) if build_match else None,
+            'system_summary': self.summary,
+            'driver_count': len(self.drivers),
+            'running_driver_count': len(running),
+            'filter_drivers': filter_drivers,
+            'drivers': self.drivers
+        }
+
+
+class ConfigXmlHandler(XMLArtifactHandler):
+    """Agent/Manager config.xml: element inventory, rule counts and policy names"""
+
+    def __init__(self):
+        self.depth = 0
+        self.max_depth = 0
+        self.tag_counts = Counter()
+        self.rule_counts = Counter()
+        self.policies = []
+        self.enabled_flags = Counter()
+
+    def start(self, tag, elem):
+        self.depth += 1
+        self.max_depth = max(self.max_depth, self.depth)
+        self.tag_counts[tag] += 1
+
+        lowered = tag.lower()
+        if lowered.endswith('rule'):
+            self.rule_counts[tag] += 1
+        if ('policy' in lowered or 'profile' in lowered) and len(self.policies) < MAX_LISTED_ITEMS:
+            name = elem.attrib.get('name') or elem.attrib.get('Name')
+            if name:
+                self.policies.append({'tag': tag, 'name': name})
+
+        enabled = elem.attrib.get('enabled') or elem.attrib.get('Enabled')
+        if enabled is not None:
+            self.enabled_flags['enabled' if enabled.lower() in ('true', '1', 'yes', 'on') else 'disabled'] += 1
+
+    def end(self, tag, elem):
+        self.depth -= 1
+
+    def result(self):
+        return {
+            'artifact_type': 'config',
+            'element_count': sum(self.tag_counts.values()),
+            'max_depth': self.max_depth,
+            'top_elements': dict(self.tag_counts.most_common(TOP_COUNT_LIMIT)),
+            'rule_counts': dict(self.rule_counts),
+            'total_rules': sum(self.rule_counts.values()),
+            'policies': self.policies,
+            'enabled_flags': dict(self.enabled_flags)
+        }
+
+
+class WindowsEventLogHandler(XMLArtifactHandler):
+    """Windows event log XML export: counts by source / event ID and the warning+ events"""
+
+    record_tags = frozenset({'Event'})
+
+    def __init__(self):
+        self.total_events = 0
+        self.by_level = Counter()
+        self.by_source = Counter()
+        self.by_source_and_id = Counter()
+        self.events = []
+        self.truncated = False
+        self._names = {}
+
+    def end(self, tag, elem):
+        if tag != 'Event':
+            return
+
+        source = event_id = level = timestamp = computer = ''
+        message = ''
+        event_data = []
+        for node in elem.iter():
+            name = self._names.get(node.tag)
+            if name is None:
+                name = self._names[node.tag] = local_name(node.tag)
+            if name == 'Provider':
+                source = node.attrib.get('Name', '') or node.attrib.get('EventSourceName', '')
+            elif name == 'EventID':
+                event_id = (node.text or '').strip()
+            elif name == 'Level':
+                level = (node.text or '').strip()
+            elif name == 'TimeCreated':
+                timestamp = node.attrib.get('SystemTime', '')
+            elif name == 'Computer':
+                computer = (node.text or '').strip()
+            elif name == 'Message':
+                message = (node.text or '').strip()
+            elif name == 'Data' and node.text:
+                event_data.append(node.text.strip())
+
+        severity = WINDOWS_EVENT_LEVELS.get(level, 'info')
+        self.total_events += 1
+        self.by_level[severity] += 1
+        self.by_source[source] += 1
+        self.by_source_and_id[f"{source}:{event_id}"] += 1
+
+        if severity in ('critical', 'error', 'warning'):
+            if len(self.events) < MAX_EVENT_RECORDS:
+                self.events.append({
+                    # SystemTime is ISO UTC with 7 fractional digits - keep the second resolution part
+                    'timestamp': timestamp[:19].replace('T', ' '),
+                    'source': source,
+                    'event_id': event_id,
+                    'severity': 'error' if severity == 'critical' else severity,
+                    'computer': computer,
+                    'message': (message or ' | '.join(event_data))[:300]
+                })
+            else:
+                self.truncated = True
+
+    def result(self):
+        return {
+            'artifact_type': 'windows_event_log',
+            'total_events': self.total_events,
+            'by_level': dict(self.by_level),
+            'top_sources': dict(self.by_source.most_common(TOP_COUNT_LIMIT)),
+            'top_source_event_ids': dict(self.by_source_and_id.most_common(TOP_COUNT_LIMIT)),
+            'events_truncated': self.truncated,
+            'events': self.events
+        }
+
+
+# (file name pattern, artifact name, handler class) - the first match wins
+XML_ARTIFACT_HANDLERS = [
+    (re.compile(r'msinfo\.nfo$', re.IGNORECASE), 'msinfo', MsInfoHandler),
+    (re.compile(r'(?:^|/)config\.xml$', re.IGNORECASE), 'config', ConfigXmlHandler),
+    (re.compile(r'(?:^|/)application-log\.xml$', re.IGNORECASE), 'application_log', WindowsEventLogHandler),
+    (re.compile(r'(?:^|/)system-log\.xml$', re.IGNORECASE), 'system_log', WindowsEventLogHandler),
+]
+
+
+def find_artifact_handler(file_name: str) -> Optional[tuple]:
+    """(artifact name, handler class) for a package member, None when no extractor applies"""
+    normalized = file_name.replace('\\', '/')
+    for pattern, artifact_name, handler_class in XML_ARTIFACT_HANDLERS:
+        if pattern.search(normalized):
+            return artifact_name, handler_class
+    return None
+
+
+def extract_xml_artifact(xml_path: str, handler: XMLArtifactHandler) -> Dict[str, Any]:
+    """
+    Drive one handler over an XML file in a single secure streaming pass
+
+    Raises:
+        SecurityError: If XML contains security issues or is malformed
+    """
+    element_stack = []
+    record_depth = 0
+    # Namespaced tags repeat endlessly - strip each distinct one once
+    tag_names = {}
+
+    for event, elem in iter_xml_events(xml_path):
+        tag = tag_names.get(elem.tag)
+        if tag is None:
+            tag = tag_names[elem.tag] = local_name(elem.tag)
+        if event == 'start':
+            if tag in handler.record_tags:
+                record_depth += 1
+            handler.start(tag, elem)
+            element_stack.append(elem)
+            continue
+
+        element_stack.pop()
+        handler.end(tag, elem)
+        if tag in handler.record_tags:
+            record_depth -= 1
+
+        # Outside a record nothing is needed once it has ended
+        if record_depth == 0 and element_stack:
+            element_stack[-1].remove(elem)
+
+    return handler.result()
+
+
+def extract_xml_artifacts(xml_artifact_paths: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Run the matching extractor for every artifact path, keyed by artifact name"""
+    artifacts = {}
+    for xml_path in xml_artifact_paths or []:
+        match = find_artifact_handler(xml_path)
+        if not match:
+            continue
+        artifact_name, handler_class = match
+
+        # Several hosts' artifacts in one package - keep each under its own key
+        key = artifact_name
+        suffix = 2
+        while key in artifacts:
+            key = f"{artifact_name}_{suffix}"
+            suffix += 1
+
+        try:
+            artifacts[key] = extract_xml_artifact(xml_path, handler_class())
+            artifacts[key]['file_name'] = os.path.basename(xml_path)
+            print(f"✅ Extracted {key} from {os.path.basename(xml_path)}")
+        except SecurityError as e:
+            print(f"⚠️  XML artifact {os.path.basename(xml_path)} rejected: {e}")
+            artifacts[key] = {'error': str(e), 'file_name': os.path.basename(xml_path)}
+    return artifacts
@@ -9,6 +9,8 @@ import os
 import uuid
 import re
 import json
+import zipfile
+import sqlite3
 import numpy as np
 from datetime import datetime
 from flask import request, jsonify, send_file
@@ -184,6 +186,8 @@ def safe_jsonify(data, **kwargs):
 from analyzers import DSAgentLogAnalyzer, AMSPAnalyzer, ConflictAnalyzer, ResourceAnalyzer, DSAgentOfflineAnalyzer, DiagnosticPackageAnalyzer
 from analyzers.modern_api_format import ModernAMSPAnalysisResponse
 from security import SecurityError, validate_file, create_secure_temp_file, cleanup_temp_file
+from cache_store import get_analysis_result_cache
+from package_search import PackageSearchIndex, TRIGRAM_AVAILABLE
 
 # Import session manager for admin interface synchronization  
 from ui_components import session_manager, wizard, guidance
@@ -207,6 +211,134 @@ def register_api_routes(app, config):
     # In-memory session storage (in production, use Redis or database)
     api_sessions = {}
     
+    # Analyzer behind each analysis type, used to version cached results
+    result_cache_analyzers = {
+        'ds_logs': DSAgentLogAnalyzer,
+        'ds_agent': DSAgentLogAnalyzer,
+        'ds_agent_offline': DSAgentOfflineAnalyzer,
+        'av_conflicts': ConflictAnalyzer,
+        'conflict': ConflictAnalyzer,
+        'resource_analysis': ResourceAnalyzer,
+        'resource': ResourceAnalyzer,
+        'amsp': AMSPAnalyzer,
+        'amsp_logs': AMSPAnalyzer,
+        'diagnostic_package': DiagnosticPackageAnalyzer
+    }
+    
+    # Full-text indexes over each session's diagnostic package, keyed by session id
+    package_search_indexes = {}
+    
+    def start_package_search_index(session_id, zip_path):
+        """Index the package's text members in the background for /search"""
+        if not config.PACKAGE_SEARCH_ENABLED or not TRIGRAM_AVAILABLE or not zip_path or not zipfile.is_zipfile(zip_path):
+            return
+        try:
+            index = PackageSearchIndex(
+                os.path.join(config.TEMP_DIR, f"package_search_{session_id}.db"),
+                max_total_bytes=config.PACKAGE_SEARCH_MAX_BYTES
+            )
+            package_search_indexes[session_id] = index
+            index.start_build(zip_path)
+        except Exception as e:
+            print(f"⚠️ Package search index unavailable for session {session_id}: {e}")
+    
+    def drop_package_search_index(session_id):
+        """Stop and delete a session's search index, if it has one"""
+        index = package_search_indexes.pop(session_id, None)
+        if index is not None:
+            index.drop()
+    
+    def cleanup_session_temp_files(session_id, temp_paths):
+        """Delete a session's temp files; a package ZIP still being indexed is removed by its index"""
+        index = package_search_indexes.get(session_id)
+        for temp_path in temp_paths:
+            if index is not None and index.defer_zip_cleanup(temp_path):
+                continue
+            cleanup_temp_file(temp_path)
+    
+    def get_result_data_versions():
+        """Versions of the trained ML models and the knowledge base that analyzer output is built from"""
+        versions = {'ml_models': None, 'knowledge': None}
+        try:
+            from ml_analyzer import get_model_registry
+            versions['ml_models'] = get_model_registry().fingerprint()
+        except ImportError:
+            pass
+        try:
+            from dynamic_rag_system import get_dynamic_rag_system
+            versions['knowledge'] = get_dynamic_rag_system().knowledge_version()
+        except ImportError:
+            pass
+        return versions
+    
+    def get_result_cache_key(analysis_type, uploaded_files):
+        """Content-addressed result key for an upload, or None when it cannot be cached"""
+        try:
+            cache = get_analysis_result_cache()
+            analyzer_class = result_cache_analyzers.get(analysis_type)
+            if cache is None or analyzer_class is None:
+                return None
+            if not uploaded_files or any(not f.get('sha256') for f in uploaded_files):
+                return None
+            return cache.key_for(uploaded_files, analysis_type, analyzer_class.analyzer_versions(), config,
+                                 get_result_data_versions())
+        except Exception as e:
+            print(f"⚠️ Result cache key unavailable: {e}")
+            return None
+    
+    def load_cached_result(session_data):
+        """Fill a session from the result cache; returns True on a hit"""
+        cache_key = session_data.get('result_cache_key')
+        cache = get_analysis_result_cache() if cache_key else None
+        if cache is None:
+            return False
+        
+        cached = cache.get_result(cache_key)
+        if not cached:
+            return False
+        
+        session_data['results'] = cached.get('results')
+        session_data['raw_results'] = cached.get('raw_results')
+        session_data['standardized_results'] = cached.get('standardized_results')
+        session_data['status'] = 'completed'
+        session_data['analysis_complete'] = True
+        session_data['cache_hit'] = True
+        session_data['progress_percentage'] = 100
+        session_data['progress_message'] = 'Analysis completed (cached result)'
+        session_data['analysis_stage'] = 'Completed'
+        session_data['completed_at'] = datetime.now().isoformat()
+        print(f"⚡ Result cache hit for session: {session_data['session_id']}")
+        return True
+    
+    def store_cached_result(session_data):
+        """Store a completed session's results under its content-addressed key"""
+        cache_key = session_data.get('result_cache_key')
+        cache = get_analysis_result_cache() if cache_key else None
+        if cache is None or session_data.get('status') != 'completed':
+            return
+        
+        # Never cache failed analyses or ones where the AI call failed and a fallback was used
+        standardized = session_data.get('standardized_results')
+        if isinstance(standardized, dict) and (
+                standardized.get('error') or standardized.get('status') == 'error' or standardized.get('success') is False
+                or standardized.get('ai_degraded')):
+            print(f"⚠️ Result not cached for session {session_data['session_id']}: analysis failed or AI was unavailable")
+            return
+        
+        cache.set_result(
+            cache_key,
+            {
+                'results': session_data.get('results'),
+                'raw_results': session_data.get('raw_results'),
+                'standardized_results': session_data.get('standardized_results')
+            },
+            metadata={
+                'analysis_type': session_data['analysis_type'],
+                'files': [f.get('name') or f.get('original_name') for f in session_data.get('uploaded_files', [])]
+            },
+            encoder=SafeJSONEncoder
+        )
+    
     @app.route('/api/health', methods=['GET'])
     def api_health():
         """Health check endpoint"""
@@ -292,8 +424,8 @@ def register_api_routes(app, config):
             
             print(f"📦 Processing ZIP file: {uploaded_zip.filename}")
             
-            # Create secure temp file for ZIP
-            zip_temp_path = create_secure_temp_file(uploaded_zip, config.TEMP_DIR)
+            # Create secure temp file for ZIP (hashed while streaming to disk)
+            zip_temp_path, zip_digest = create_secure_temp_file(uploaded_zip, config.TEMP_DIR, return_digest=True)
             temp_files.append(zip_temp_path)
             
             # Extract ZIP contents
@@ -400,9 +532,13 @@ def register_api_routes(app, config):
                     'session_id': session_id,
                     'analysis_type': analyzer_type,
                     'uploaded_files': matched_files,
-                    'temp_files': [extract_dir],  # Track extract directory for cleanup
+                    'temp_files': [extract_dir, zip_temp_path],  # Track extract directory (and the ZIP being indexed) for cleanup
                     'status': 'extracted',
                     'created_at': datetime.now().isoformat(),
+                    # Whole-package analysis is keyed on the package ZIP itself
+                    'result_cache_key': get_result_cache_key(
+                        analyzer_type, [{'name': uploaded_zip.filename, 'sha256': zip_digest}]
+                    ) if analyzer_type == 'diagnostic_package' else None,
                     'extraction_info': {
                         'original_zip': uploaded_zip.filename,
                         'total_files_in_zip': len(file_list),
@@ -413,6 +549,8 @@ def register_api_routes(app, config):
                     }
                 }
                 
+                start_package_search_index(session_id, zip_temp_path)
+                
                 return safe_jsonify({
                     'success': True,
                     'session_id': session_id,
@@ -458,6 +596,30 @@ def register_api_routes(app, config):
             if session_data['status'] != 'extracted':
                 return safe_jsonify({'success': False, 'error': f'Session status is {session_data["status"]}, expected "extracted"'}), 400
             
+            # Same package already analyzed with the same analyzer and config - skip the analysis
+            if load_cached_result(session_data):
+                try:
+                    if session_id in session_manager.sessions:
+                        session_manager.update_session(session_id, {
+                            'status': 'completed',
+                            'results': session_data['results'],
+                            'raw_results': session_data['raw_results'],
+                            'completed_at': session_data['completed_at'],
+                            'analysis_complete': True,
+                            'progress': 100
+                        })
+                except Exception as sync_error:
+                    print(f"⚠️ Failed to sync cached result with admin: {sync_error}")
+                
+                return safe_jsonify({
+                    'success': True,
+                    'session_id': session_id,
+                    'status': session_data['status'],
+                    'analysis_type': session_data['analysis_type'],
+                    'files_processed': len(session_data['uploaded_files']),
+                    'cache_hit': True
+                })
+            
             # Update session status to processing
             session_data['status'] = 'processing'
             session_data['analysis_started'] = datetime.now().isoformat()
@@ -966,6 +1128,7 @@ Status: Analysis completed successfully"""
                 session_data['results'] = result
                 session_data['raw_results'] = raw_result
                 session_data['completed_at'] = datetime.now().isoformat()
+                store_cached_result(session_data)
                 
                 # SYNC COMPLETION WITH ADMIN SESSION MANAGER
                 try:
@@ -1098,15 +1261,16 @@ Status: Analysis completed successfully"""
                         # Validate file using CSDAIv2 security
                         file_type = validate_file(file)
                         
-                        # Create secure temp file
-                        temp_file_path = create_secure_temp_file(file, config.TEMP_DIR)
+                        # Create secure temp file (hashed while streaming to disk)
+                        temp_file_path, file_digest = create_secure_temp_file(file, config.TEMP_DIR, return_digest=True)
                         temp_files.append(temp_file_path)
                         uploaded_files.append({
                             'name': file.filename,
                             'original_name': secure_filename(file.filename),
                             'temp_path': temp_file_path,
                             'size': os.path.getsize(temp_file_path),
-                            'type': file_type
+                            'type': file_type,
+                            'sha256': file_digest
                         })
                         print(f"✅ File saved to: {temp_file_path}")
                     except SecurityError as e:
@@ -1140,6 +1304,7 @@ Status: Analysis completed successfully"""
                 'analysis_complete': False,
                 'results': None,
                 'raw_results': None,
+                'result_cache_key': get_result_cache_key(analysis_type, uploaded_files),
                 'current_step': 4,
                 'configuration': {
                     'analysis_depth': 'expert',
@@ -1152,6 +1317,10 @@ Status: Analysis completed successfully"""
             
             print(f"💾 Session stored. Total sessions: {len(api_sessions)}")
             
+            # Diagnostic packages become searchable while the analysis runs
+            package_zip = next((f['temp_path'] for f in uploaded_files if f['type'] == 'zip'), None)
+            start_package_search_index(session_id, package_zip)
+            
             # SYNC WITH ADMIN SESSION MANAGER - This ensures files show up in admin dashboard
             try:
                 # Create or update session in admin session manager
@@ -1234,6 +1403,22 @@ Status: Analysis completed successfully"""
                 
                 return safe_jsonify(progress_response)
             
+            # Identical files already analyzed with the same analyzer and config - skip the analysis
+            if session_data['status'] == 'uploaded' and load_cached_result(session_data):
+                cleanup_session_temp_files(session_id, session_data.get('temp_files', []))
+                try:
+                    if session_id in session_manager.sessions:
+                        session_manager.update_session(session_id, {
+                            'status': 'completed',
+                            'results': session_data['results'],
+                            'raw_results': session_data['raw_results'],
+                            'completed_at': session_data['completed_at'],
+                            'analysis_complete': True,
+                            'progress_percentage': 100
+                        })
+                except Exception as sync_error:
+                    print(f"⚠️ Failed to sync cached result with admin: {sync_error}")
+            
             # If analysis hasn't started, start it using CSDAIv2 logic
             if session_data['status'] == 'uploaded':
                 print(f"🚀 Starting analysis for session: {session_id}")
@@ -1622,6 +1807,7 @@ Status: {health_data.get('status_message', 'Analysis completed')}
                     session_data['progress_message'] = 'Analysis completed successfully'
                     session_data['analysis_stage'] = 'Completed'
                     session_data['completed_at'] = datetime.now().isoformat()
+                    store_cached_result(session_data)
                     
                     # SYNC COMPLETION WITH ADMIN SESSION MANAGER
                     try:
@@ -1650,9 +1836,8 @@ Status: {health_data.get('status_message', 'Analysis completed')}
                     session_data['progress_message'] = f'Analysis failed: {str(e)}'
                     session_data['analysis_stage'] = 'Error'
                 finally:
-                    # Clean up temp files
-                    for temp_path in temp_paths:
-                        cleanup_temp_file(temp_path)
+                    # Clean up temp files (the package ZIP once its search index no longer reads it)
+                    cleanup_session_temp_files(session_id, temp_paths)
             
             # Always return the current status with comprehensive progress information
             return safe_jsonify({
@@ -1666,7 +1851,8 @@ Status: {health_data.get('status_message', 'Analysis completed')}
                 'analysis_type': session_data['analysis_type'],
                 'error': session_data.get('error', None),
                 'error_message': session_data.get('error_message', None),
-                'completed_at': session_data.get('completed_at', None)
+                'completed_at': session_data.get('completed_at', None),
+                'cache_hit': session_data.get('cache_hit', False)
             })
             
         except Exception as e:
@@ -1689,8 +1875,13 @@ Status: {health_data.get('status_message', 'Analysis completed')}
             session_data = api_sessions[session_id]
             print(f"📊 API Session status: {session_data['status']}, Complete: {session_data.get('analysis_complete', False)}")
             
+            # Serve a cached result for identical files even before /status has run the analysis
+            if session_data['status'] == 'uploaded' and load_cached_result(session_data):
+                cleanup_session_temp_files(session_id, session_data.get('temp_files', []))
+            
             # Check for results in ui_components session manager (newer approach)
-            ui_sessions = session_manager.get_all_sessions()
+            # Cached results belong to this session only, so skip the cross-session lookup
+            ui_sessions = {} if session_data.get('cache_hit') else session_manager.get_all_sessions()
             ui_session_data = None
             ui_session_id = None
             
@@ -1900,12 +2091,63 @@ Trend Micro Deep Security Analysis Tool
         except Exception as e:
             return safe_jsonify({'success': False, 'error': str(e)}), 500
     
+    @app.route('/search/<session_id>', methods=['GET'])
+    def api_search_package(session_id):
+        """Grep the session's diagnostic package: matching lines with file, line number and context"""
+        try:
+            if session_id not in api_sessions:
+                return safe_jsonify({'success': False, 'error': 'Session not found'}), 404
+            
+            index = package_search_indexes.get(session_id)
+            if index is None and not TRIGRAM_AVAILABLE:
+                return safe_jsonify({
+                    'success': False,
+                    'error': f'Package search unavailable: SQLite {sqlite3.sqlite_version} has no FTS5 trigram tokenizer (3.34 or newer required)'
+                }), 503
+            if index is None:
+                return safe_jsonify({'success': False, 'error': 'No searchable diagnostic package for this session'}), 404
+            if index.status in ('pending', 'building'):
+                return safe_jsonify({
+                    'success': False,
+                    'status': index.status,
+                    'message': 'Search index is still being built',
+                    'index_stats': index.stats
+                }), 202
+            if index.status != 'ready':
+                return safe_jsonify({'success': False, 'status': index.status, 'error': index.error or 'Search index unavailable'}), 500
+            
+            query = request.args.get('q', '')
+            if not query.strip():
+                # No query - list what can be searched
+                return safe_jsonify({'success': True, 'status': index.status, 'files': index.list_files(), 'index_stats': index.stats})
+            
+            try:
+                results = index.search(
+                    query,
+                    file_filter=request.args.get('file') or None,
+                    context_lines=int(request.args.get('context', 2)),
+                    page=int(request.args.get('page', 1)),
+                    page_size=int(request.args.get('page_size', config.PACKAGE_SEARCH_PAGE_SIZE))
+                )
+            except ValueError as e:
+                return safe_jsonify({'success': False, 'error': f"Invalid search parameters: {e}"}), 400
+            
+            results['success'] = True
+            results['session_id'] = session_id
+            return safe_jsonify(results)
+            
+        except Exception as e:
+            print(f"❌ Package search error: {str(e)}")
+            return safe_jsonify({'success': False, 'error': str(e)}), 500
+    
     @app.route('/api/sessions/cleanup', methods=['POST'])
     def api_cleanup():
         """Cleanup old sessions and temp files"""
         try:
             cleaned_sessions = 0
             for session_id, session_data in list(api_sessions.items()):
+                drop_package_search_index(session_id)
+                
                 # Clean up temp files
                 for temp_file in session_data.get('temp_files', []):
                     cleanup_temp_file(temp_file)
@@ -1928,6 +2170,7 @@ Trend Micro Deep Security Analysis Tool
         try:
             if session_id in api_sessions:
                 session_data = api_sessions[session_id]
+                drop_package_search_index(session_id)
                 
                 # Clean up temp files for this session
                 for temp_file in session_data.get('temp_files', []):
@@ -1956,6 +2199,8 @@ Trend Micro Deep Security Analysis Tool
         try:
             cleaned_sessions = 0
             for session_id, session_data in list(api_sessions.items()):
+                drop_package_search_index(session_id)
+                
                 # Clean up temp files
                 for temp_file in session_data.get('temp_files', []):
                     cleanup_temp_file(temp_file)
@@ -0,0 +1,454 @@
+# -*- coding: utf-8 -*-
+"""
+Local SQLite Cache Store
+Content-addressed key/value cache with TTL and LRU eviction for expensive analysis results
+"""
+
+import os
+import json
+import time
+import zlib
+import hashlib
+import sqlite3
+import threading
+from typing import Dict, List, Any, Optional
+
+class SQLiteTTLCache:
+    """SQLite-backed key/value cache with TTL expiry and LRU eviction"""
+
+    def __init__(self, db_path: str, namespace: str, ttl_seconds: int = 86400, max_entries: int = 1000, max_bytes: int = 0):
+        self.db_path = db_path
+        self.namespace = namespace
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+        # Ensure cache directory exists
+        cache_dir = os.path.dirname(db_path)
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+        self._init_cache_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection with settings suited to concurrent request threads"""
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    def _init_cache_db(self):
+        """Initialize cache table for this namespace"""
+        try:
+            conn = self._connect()
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS cache_entries (
+                    namespace TEXT NOT NULL,
+                    cache_key TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    metadata TEXT,
+                    created_at REAL NOT NULL,
+                    last_accessed REAL NOT NULL,
+                    hit_count INTEGER DEFAULT 0,
+                    PRIMARY KEY (namespace, cache_key)
+                )
+            ''')
+            conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_cache_lru
+                ON cache_entries (namespace, last_accessed)
+            ''')
+            conn.commit()
+            conn.close()
+        except Exception as e:
+            print(f"⚠️ Cache DB initialization failed ({self.namespace}): {e}")
+
+    @staticmethod
+    def make_key(payload: Any) -> str:
+        """Build a content-addressed key from any JSON-serializable payload"""
+        canonical = json.dumps(payload, sort_keys=True, separators=(',', ':'), default=str)
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+    def get(self, cache_key: str) -> Optional[Any]:
+        """Return cached value or None on miss/expiry"""
+        now = time.time()
+        try:
+            conn = self._connect()
+            row = conn.execute(
+                'SELECT value, created_at FROM cache_entries WHERE namespace = ? AND cache_key = ?',
+                (self.namespace, cache_key)
+            ).fetchone()
+
+            if row is None:
+                conn.close()
+                self._record(hit=False)
+                return None
+
+            value, created_at = row
+            if self.ttl_seconds and now - created_at > self.ttl_seconds:
+                conn.execute(
+                    'DELETE FROM cache_entries WHERE namespace = ? AND cache_key = ?',
+                    (self.namespace, cache_key)
+                )
+                conn.commit()
+                conn.close()
+                self._record(hit=False)
+                return None
+
+            conn.execute(
+                'UPDATE cache_entries SET last_accessed = ?, hit_count = hit_count + 1 WHERE namespace = ? AND cache_key = ?',
+                (now, self.namespace, cache_key)
+            )
+            conn.commit()
+            conn.close()
+            self._record(hit=True)
+            return value
+
+        except Exception as e:
+            print(f"⚠️ Cache read failed ({self.namespace}): {e}")
+            self._record(hit=False)
+            return None
+
+    def set(self, cache_key: str, value: Any, metadata: Optional[Dict[str, Any]] = None) -> bool:
+        """Store value and evict expired / least recently used entries"""
+        now = time.time()
+        try:
+            conn = self._connect()
+            conn.execute('''
+                INSERT OR REPLACE INTO cache_entries
+                (namespace, cache_key, value, metadata, created_at, last_accessed, hit_count)
+                VALUES (?, ?, ?, ?, ?, ?, 0)
+            ''', (self.namespace, cache_key, value, json.dumps(metadata or {}, default=str), now, now))
+
+            self._evict(conn, now)
+            conn.commit()
+            conn.close()
+            return True
+
+        except Exception as e:
+            print(f"⚠️ Cache write failed ({self.namespace}): {e}")
+            return False
+
+    def _evict(self, conn: sqlite3.Connection, now: float):
+        """Drop expired entries, then trim to max_entries / max_bytes by least recent access"""
+        evicted = 0
+        if self.ttl_seconds:
+            cursor = conn.execute(
+                'DELETE FROM cache_entries WHERE namespace = ? AND created_at < ?',
+                (self.namespace, now - self.ttl_seconds)
+            )
+            evicted += max(cursor.rowcount, 0)
+
+        if self.max_entries:
+            cursor = conn.execute('''
+                DELETE FROM cache_entries
+                WHERE namespace = ? AND cache_key IN (
+                    SELECT cache_key FROM cache_entries
+                    WHERE namespace = ?
+                    ORDER BY last_accessed DESC
+                    LIMIT -1 OFFSET ?
+                )
+            ''', (self.namespace, self.namespace, self.max_entries))
+            evicted += max(cursor.rowcount, 0)
+
+        if self.max_bytes:
+            # Keep the most recently used entries whose cumulative size fits the budget
+            cursor = conn.execute('''
+                DELETE FROM cache_entries
+                WHERE namespace = ? AND cache_key IN (
+                    SELECT cache_key FROM (
+                        SELECT cache_key,
+                               SUM(length(value)) OVER (ORDER BY last_accessed DESC, cache_key) AS running_bytes
+                        FROM cache_entries
+                        WHERE namespace = ?
+                    )
+                    WHERE running_bytes > ?
+                )
+            ''', (self.namespace, self.namespace, self.max_bytes))
+            evicted += max(cursor.rowcount, 0)
+
+        if evicted:
+            with self._lock:
+                self._evictions += evicted
+
+    def invalidate(self, cache_key: Optional[str] = None) -> int:
+        """Remove one entry, or every entry in this namespace when no key is given"""
+        try:
+            conn = self._connect()
+            if cache_key:
+                cursor = conn.execute(
+                    'DELETE FROM cache_entries WHERE namespace = ? AND cache_key = ?',
+                    (self.namespace, cache_key)
+                )
+            else:
+                cursor = conn.execute('DELETE FROM cache_entries WHERE namespace = ?', (self.namespace,))
+            removed = max(cursor.rowcount, 0)
+            conn.commit()
+            conn.close()
+            return removed
+        except Exception as e:
+            print(f"⚠️ Cache invalidation failed ({self.namespace}): {e}")
+            return 0
+
+    def _record(self, hit: bool):
+        """Update in-process hit/miss counters"""
+        with self._lock:
+            if hit:
+                self._hits += 1
+            else:
+                self._misses += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics for admin reporting"""
+        with self._lock:
+            hits, misses, evictions = self._hits, self._misses, self._evictions
+
+        stats = {
+            'namespace': self.namespace,
+            'hits': hits,
+            'misses': misses,
+            'evictions': evictions,
+            'hit_rate': round(hits / (hits + misses) * 100, 2) if (hits + misses) else 0.0,
+            'ttl_seconds': self.ttl_seconds,
+            'max_entries': self.max_entries,
+            'max_bytes': self.max_bytes,
+            'database_path': self.db_path
+        }
+
+        try:
+            conn = self._connect()
+            row = conn.execute(
+                'SELECT COUNT(*), COALESCE(SUM(hit_count), 0), MIN(created_at), COALESCE(SUM(length(value)), 0) FROM cache_entries WHERE namespace = ?',
+                (self.namespace,)
+            ).fetchone()
+            conn.close()
+            stats['entries'] = row[0]
+            stats['lifetime_hits'] = row[1]
+            stats['oldest_entry_age_seconds'] = round(time.time() - row[2], 1) if row[2] else 0
+            stats['total_bytes'] = row[3]
+        except Exception as e:
+            stats['error'] = str(e)
+
+        return stats
+
+
+# Conflict analysis verdict cache
+CONFLICT_PROMPT_VERSION = 'av-conflict-v1'
+
+class ConflictVerdictCache(SQLiteTTLCache):
+    """Caches AI conflict verdicts keyed on the normalized AV process set"""
+
+    def __init__(self, db_path: str, ttl_seconds: int, max_entries: int):
+        super().__init__(db_path, 'conflict_verdicts', ttl_seconds, max_entries)
+
+    @staticmethod
+    def normalize_process_set(processes: List[str]) -> List[str]:
+        """Lowercase, strip paths and dedupe so equivalent hosts share one key"""
+        normalized = set()
+        for process in processes:
+            if not process:
+                continue
+            name = process.strip().replace('\\', '/').rsplit('/', 1)[-1].lower()
+            if name:
+                normalized.add(name)
+        return sorted(normalized)
+
+    def key_for(self, processes: List[str], model: str) -> str:
+        """Build the verdict key from prompt version, model and process set"""
+        return self.make_key({
+            'prompt_version': CONFLICT_PROMPT_VERSION,
+            'model': model,
+            'processes': self.normalize_process_set(processes)
+        })
+
+
+_conflict_verdict_cache = None
+_conflict_verdict_cache_lock = threading.Lock()
+
+def get_conflict_verdict_cache() -> Optional[ConflictVerdictCache]:
+    """Get the process-wide conflict verdict cache (None when disabled)"""
+    global _conflict_verdict_cache
+
+    if _conflict_verdict_cache is None:
+        with _conflict_verdict_cache_lock:
+            if _conflict_verdict_cache is None:
+                try:
+                    from config import get_config
+                    config = get_config()
+                    if not config.CONFLICT_VERDICT_CACHE_ENABLED:
+                        return None
+                    _conflict_verdict_cache = ConflictVerdictCache(
+                        db_path=os.path.join(config.CACHE_DIR, 'conflict_verdicts.db'),
+                        ttl_seconds=config.CONFLICT_VERDICT_CACHE_TTL,
+                        max_entries=config.CONFLICT_VERDICT_CACHE_MAX_ENTRIES
+                    )
+                except Exception as e:
+                    print(f"⚠️ Conflict verdict cache unavailable: {e}")
+                    return None
+
+    return _conflict_verdict_cache
+
+
+# Standardized analysis result cache
+class AnalysisResultCache(SQLiteTTLCache):
+    """Caches standardized analyzer results keyed on uploaded file content, analyzer version and config"""
+
+    def __init__(self, db_path: str, ttl_seconds: int, max_entries: int, max_bytes: int):
+        super().__init__(db_path, 'analysis_results', ttl_seconds, max_entries, max_bytes)
+
+    @staticmethod
+    def config_fingerprint(config) -> Dict[str, Any]:
+        """Config values that change analyzer output"""
+        return {
+            'model': config.OPENAI_MODEL,
+            'base_url': config.OPENAI_BASE_URL,
+            'ai_enabled': bool(config.OPENAI_API_KEY),
+            'rag_enable_ai_responses': config.RAG_ENABLE_AI_RESPONSES,
+            'rag_max_knowledge_sources': config.RAG_MAX_KNOWLEDGE_SOURCES,
+            'rag_max_dynamic_queries': config.RAG_MAX_DYNAMIC_QUERIES,
+            'rag_prompt_max_length': config.RAG_PROMPT_MAX_LENGTH
+        }
+
+    def key_for(self, files: List[Dict[str, str]], analysis_type: str, analyzer_versions: Dict[str, str], config,
+                data_versions: Optional[Dict[str, Any]] = None) -> str:
+        """Build the result key from each file's content hash plus analyzer versions, config and data versions"""
+        return self.make_key({
+            'files': sorted(f['sha256'] for f in files),
+            'analysis_type': analysis_type,
+            'analyzer_versions': analyzer_versions,
+            'config': self.config_fingerprint(config),
+            'data_versions': data_versions
+        })
+
+    def get_result(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """Return the decompressed result payload or None"""
+        value = self.get(cache_key)
+        if value is None:
+            return None
+        try:
+            return json.loads(zlib.decompress(value).decode('utf-8'))
+        except Exception as e:
+            print(f"⚠️ Cached result unreadable, dropping entry: {e}")
+            self.invalidate(cache_key)
+            return None
+
+    def set_result(self, cache_key: str, payload: Dict[str, Any], metadata: Optional[Dict[str, Any]] = None,
+                   encoder: Optional[type] = None) -> bool:
+        """Serialize (optionally with a custom JSON encoder), compress and store a result payload"""
+        try:
+            serialized = json.dumps(payload, cls=encoder, ensure_ascii=False).encode('utf-8')
+        except Exception as e:
+            print(f"⚠️ Result not cacheable: {e}")
+            return False
+        return self.set(cache_key, zlib.compress(serialized, 6), metadata)
+
+
+_analysis_result_cache = None
+_analysis_result_cache_lock = threading.Lock()
+
+def get_analysis_result_cache() -> Optional[AnalysisResultCache]:
+    """Get the process-wide analysis result cache (None when disabled)"""
+    global _analysis_result_cache
+
+    if _analysis_result_cache is None:
+        with _analysis_result_cache_lock:
+            if _analysis_result_cache is None:
+                try:
+                    from config import get_config
+                    config = get_config()
+                    if not config.RESULT_CACHE_ENABLED:
+                        return None
+                    _analysis_result_cache = AnalysisResultCache(
+                        db_path=os.path.join(config.CACHE_DIR, 'analysis_results.db'),
+                        ttl_seconds=config.RESULT_CACHE_TTL,
+                        max_entries=config.RESULT_CACHE_MAX_ENTRIES,
+                        max_bytes=config.RESULT_CACHE_MAX_BYTES
+                    )
+                except Exception as e:
+                    print(f"⚠️ Analysis result cache unavailable: {e}")
+                    return None
+
+    return _analysis_result_cache
+
+
+# Model response cache
+class LLMResponseCache(SQLiteTTLCache):
+    """Caches model completions keyed on model, normalized prompt and sampling settings"""
+
+    def __init__(self, db_path: str, ttl_seconds: int, max_entries: int, max_bytes: int):
+        super().__init__(db_path, 'llm_responses', ttl_seconds, max_entries, max_bytes)
+        self._analyzer_counts = {}
+
+    @staticmethod
+    def normalize_prompt(prompt: str) -> str:
+        """Collapse whitespace runs so prompts differing only in layout share one key"""
+        return ' '.join(prompt.split())
+
+    def key_for(self, model: str, prompt: str, temperature: float, max_tokens: int) -> str:
+        """Build the response key from model, normalized prompt and sampling settings"""
+        return self.make_key({
+            'model': model,
+            'prompt': hashlib.sha256(self.normalize_prompt(prompt).encode('utf-8')).hexdigest(),
+            'temperature': float(temperature),
+            'max_tokens': int(max_tokens)
+        })
+
+    def get_response(self, analyzer: str, cache_key: str) -> Optional[str]:
+        """Return the cached response text or None, counting the lookup against the analyzer"""
+        value = self.get(cache_key)
+        with self._lock:
+            counts = self._analyzer_counts.setdefault(analyzer, [0, 0])
+            counts[0 if value is not None else 1] += 1
+        return value
+
+    def set_response(self, analyzer: str, cache_key: str, response: str, model: str) -> bool:
+        """Store a model response"""
+        return self.set(cache_key, response, {'analyzer': analyzer, 'model': model, 'response_chars': len(response)})
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Cache statistics plus hit rates per analyzer"""
+        stats = super().get_stats()
+        with self._lock:
+            counts = {analyzer: tuple(c) for analyzer, c in self._analyzer_counts.items()}
+
+        stats['analyzers'] = {
+            analyzer: {
+                'hits': hits,
+                'misses': misses,
+                'hit_rate': round(hits / (hits + misses) * 100, 2) if (hits + misses) else 0.0
+            }
+            for analyzer, (hits, misses) in counts.items()
+        }
+        return stats
+
+
+_llm_response_cache = None
+_llm_response_cache_lock = threading.Lock()
+
+def get_llm_response_cache() -> Optional[LLMResponseCache]:
+    """Get the process-wide model response cache (None when RAG_CACHE_RESULTS is off)"""
+    global _llm_response_cache
+
+    if _llm_response_cache is None:
+        with _llm_response_cache_lock:
+            if _llm_response_cache is None:
+                try:
+                    from config import get_config
+                    config = get_config()
+                    if not config.RAG_CACHE_RESULTS:
+                        return None
+                    _llm_response_cache = LLMResponseCache(
+                        db_path=os.path.join(config.CACHE_DIR, 'llm_responses.db'),
+                        ttl_seconds=config.LLM_RESPONSE_CACHE_TTL,
+                        max_entries=config.LLM_RESPONSE_CACHE_MAX_ENTRIES,
+                        max_bytes=config.LLM_RESPONSE_CACHE_MAX_BYTES
+                    )
+                except Exception as e:
+                    print(f"⚠️ LLM response cache unavailable: {e}")
+                    return None
+
+    return _llm_response_cache
@@ -28,11 +28,41 @@ class Config:
     RAG_MAX_DYNAMIC_QUERIES = int(os.environ.get('RAG_MAX_DYNAMIC_QUERIES', '8'))
     RAG_PROMPT_MAX_LENGTH = int(os.environ.get('RAG_PROMPT_MAX_LENGTH', '8000'))
     RAG_ENABLE_AI_RESPONSES = os.environ.get('RAG_ENABLE_AI_RESPONSES', 'True').lower() in ('true', '1', 'yes')
+    RAG_KNOWLEDGE_POOL_SIZE = int(os.environ.get('RAG_KNOWLEDGE_POOL_SIZE', '4'))  # idle read-only knowledge DB connections kept open
     
     # Performance settings
     RAG_ANALYSIS_TIMEOUT = int(os.environ.get('RAG_ANALYSIS_TIMEOUT', '30'))  # seconds
-    RAG_CACHE_RESULTS = os.environ.get('RAG_CACHE_RESULTS', 'True').lower() in ('true', '1', 'yes')
-    
+    RAG_CACHE_RESULTS = os.environ.get('RAG_CACHE_RESULTS', 'True').lower() in ('true', '1', 'yes')  # enables the LLM response cache
+
+    # Local cache settings
+    CACHE_DIR = os.environ.get('CACHE_DIR', 'cache')
+    CONFLICT_VERDICT_CACHE_ENABLED = os.environ.get('CONFLICT_VERDICT_CACHE_ENABLED', 'True').lower() in ('true', '1', 'yes')
+    CONFLICT_VERDICT_CACHE_TTL = int(os.environ.get('CONFLICT_VERDICT_CACHE_TTL', str(7 * 24 * 3600)))  # seconds
+    CONFLICT_VERDICT_CACHE_MAX_ENTRIES = int(os.environ.get('CONFLICT_VERDICT_CACHE_MAX_ENTRIES', '2000'))
+    RESULT_CACHE_ENABLED = os.environ.get('RESULT_CACHE_ENABLED', 'True').lower() in ('true', '1', 'yes')
+    RESULT_CACHE_TTL = int(os.environ.get('RESULT_CACHE_TTL', str(3 * 24 * 3600)))  # seconds
+    RESULT_CACHE_MAX_ENTRIES = int(os.environ.get('RESULT_CACHE_MAX_ENTRIES', '500'))
+    RESULT_CACHE_MAX_BYTES = int(os.environ.get('RESULT_CACHE_MAX_BYTES', str(256 * 1024 * 1024)))  # compressed bytes
+    LLM_RESPONSE_CACHE_TTL = int(os.environ.get('LLM_RESPONSE_CACHE_TTL', str(7 * 24 * 3600)))  # seconds
+    LLM_RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get('LLM_RESPONSE_CACHE_MAX_ENTRIES', '5000'))
+    LLM_RESPONSE_CACHE_MAX_BYTES = int(os.environ.get('LLM_RESPONSE_CACHE_MAX_BYTES', str(64 * 1024 * 1024)))  # response text bytes
+
+    # Diagnostic package parallelism
+    DIAGNOSTIC_THREAD_WORKERS = int(os.environ.get('DIAGNOSTIC_THREAD_WORKERS', '4'))
+    DIAGNOSTIC_PROCESS_WORKERS = int(os.environ.get('DIAGNOSTIC_PROCESS_WORKERS', '2'))  # 0 = parse in threads
+    DIAGNOSTIC_EVENT_CSV_CHUNK_ROWS = int(os.environ.get('DIAGNOSTIC_EVENT_CSV_CHUNK_ROWS', '50000'))
+    DIAGNOSTIC_EVENT_CSV_MAX_ROWS = int(os.environ.get('DIAGNOSTIC_EVENT_CSV_MAX_ROWS', '50000'))  # kept per event type
+
+    # Dedicated ML worker processes (BLAS/OpenMP threads are set per worker, not in the web process)
+    ML_WORKER_PROCESSES = int(os.environ.get('ML_WORKER_PROCESSES', '1'))  # 0 = run ML in-process, thread-free
+    ML_WORKER_THREADS = int(os.environ.get('ML_WORKER_THREADS', '0'))  # 0 = CPU count / worker processes
+    ML_WORKER_TIMEOUT = int(os.environ.get('ML_WORKER_TIMEOUT', '300'))  # seconds
+
+    # Per-session full-text search over diagnostic package members
+    PACKAGE_SEARCH_ENABLED = os.environ.get('PACKAGE_SEARCH_ENABLED', 'True').lower() in ('true', '1', 'yes')
+    PACKAGE_SEARCH_MAX_BYTES = int(os.environ.get('PACKAGE_SEARCH_MAX_BYTES', str(1024 * 1024 * 1024)))  # uncompressed text indexed per package
+    PACKAGE_SEARCH_PAGE_SIZE = int(os.environ.get('PACKAGE_SEARCH_PAGE_SIZE', '50'))
+
     # File handling
     TEMP_DIR = os.environ.get('TEMP_DIR', 'temp')
     ALLOWED_HOSTS = os.environ.get('ALLOWED_HOSTS', 'localhost,127.0.0.1').split(',')
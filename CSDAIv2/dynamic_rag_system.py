@@ -8,14 +8,21 @@ import os
 import re
 import json
 import requests
+import threading
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 from pathlib import Path
 
+from cache_store import get_llm_response_cache
+
 class DynamicRAGSystem:
-    """Dynamic RAG system that creates intelligent prompts based on log content"""
+    """
+    Dynamic RAG system that creates intelligent prompts based on log content
+    
+    Holds no per-analysis state, so one instance (see get_dynamic_rag_system) serves every request thread.
+    """
     
-    def __init__(self, pdf_dir: str = "pdf", config_file: str = "config.py"):
+    def __init__(self, pdf_dir: str = "pdf", config_file: str = "config.py", knowledge_pool_size: int = 4):
         self.pdf_dir = pdf_dir
         self.config_file = config_file
         self.load_config()
@@ -23,7 +30,7 @@ class DynamicRAGSystem:
         # Initialize PDF Knowledge Integration
         try:
             from pdf_knowledge_integrator import PDFKnowledgeIntegrator
-            self.pdf_integrator = PDFKnowledgeIntegrator(pdf_dir=pdf_dir)
+            self.pdf_integrator = PDFKnowledgeIntegrator(pdf_dir=pdf_dir, read_pool_size=knowledge_pool_size)
             self.pdf_knowledge_available = True
             print("✅ Dynamic RAG system initialized with proprietary PDF knowledge base")
         except Exception as e:
@@ -66,6 +73,12 @@ class DynamicRAGSystem:
             print(f"⚠️ Config loading failed: {e}")
             self.ai_available = False
     
+    def knowledge_version(self) -> Optional[Dict[str, Any]]:
+        """Fingerprint of the knowledge base behind retrieval, None without one"""
+        if not self.pdf_knowledge_available:
+            return None
+        return self.pdf_integrator.knowledge_version()
+    
     def extract_log_context(self, log_content: str) -> Dict[str, Any]:
         """Extract meaningful context from log content"""
         
@@ -216,8 +229,8 @@ class DynamicRAGSystem:
         # First priority: Search proprietary PDF knowledge
         if self.pdf_knowledge_available and self.pdf_integrator:
             print("📖 Searching proprietary Deep Security documentation...")
-            pdf_knowledge_count = 0
             
+            batch = []
             for query in dynamic_queries:
                 # Determine component for targeted search
                 component = None
@@ -225,31 +238,31 @@ class DynamicRAGSystem:
                     if comp in query.lower():
                         component = comp
                         break
-                
-                pdf_results = self.pdf_integrator.search_knowledge(query, component, max_results=2)
-                
-                # Convert PDF results to standard format
-                for result in pdf_results:
-                    formatted_result = {
-                        'id': f"pdf_{result['source_file']}_{result['page_number']}",
-                        'content': result['content'],
-                        'metadata': {
-                            'title': f"{result['document_title']} - {result['section_title']}",
-                            'source': 'Proprietary Deep Security Documentation',
-                            'document': result['document_title'],
-                            'section': result['section_title'],
-                            'page': result['page_number'],
-                            'section_type': result['section_type'],
-                            'source_file': result['source_file']
-                        },
-                        'relevance_score': result['relevance_score']
-                    }
-                    all_knowledge.append(formatted_result)
-                    pdf_knowledge_count += 1
-                
-                print(f"  📚 '{query[:50]}...' → {len(pdf_results)} PDF sections")
+                batch.append((query, component))
+            
+            # One batched search, results fused across all queries
+            pdf_results = self.pdf_integrator.search_knowledge_batch(batch, max_results=2 * len(batch))
+            
+            # Convert PDF results to standard format
+            for result in pdf_results:
+                formatted_result = {
+                    'id': f"pdf_{result['source_file']}_{result['page_number']}",
+                    'content': result['content'],
+                    'metadata': {
+                        'title': f"{result['document_title']} - {result['section_title']}",
+                        'source': 'Proprietary Deep Security Documentation',
+                        'document': result['document_title'],
+                        'section': result['section_title'],
+                        'page': result['page_number'],
+                        'section_type': result['section_type'],
+                        'source_file': result['source_file']
+                    },
+                    'relevance_score': result['relevance_score'],
+                    'fusion_score': result['fusion_score']
+                }
+                all_knowledge.append(formatted_result)
             
-            print(f"✅ Retrieved {pdf_knowledge_count} proprietary knowledge sections")
+            print(f"✅ Retrieved {len(pdf_results)} proprietary knowledge sections for {len(batch)} queries")
         
         # Second priority: Legacy RAG system (if available)
         if self.rag_available and self.rag_system:
@@ -269,15 +282,17 @@ class DynamicRAGSystem:
             print("⚠️ No knowledge bases available - Dynamic RAG will rely on Claude AI intelligence only")
             return []
         
-        # Remove duplicates and sort by relevance
+        # Remove duplicates and sort by relevance (PDF sections by their fused rank first)
+        def rank_key(doc):
+            return (doc.get('fusion_score', 0), doc['relevance_score'])
+        
         unique_knowledge = {}
         for doc in all_knowledge:
             doc_id = doc['id']
-            if doc_id not in unique_knowledge or doc['relevance_score'] > unique_knowledge[doc_id]['relevance_score']:
+            if doc_id not in unique_knowledge or rank_key(doc) > rank_key(unique_knowledge[doc_id]):
                 unique_knowledge[doc_id] = doc
         
-        sorted_knowledge = sorted(unique_knowledge.values(), 
-                                key=lambda x: x['relevance_score'], reverse=True)
+        sorted_knowledge = sorted(unique_knowledge.values(), key=rank_key, reverse=True)
         
         # Prioritize proprietary PDF knowledge
         pdf_knowledge = [k for k in sorted_knowledge if k['id'].startswith('pdf_')]
@@ -395,8 +410,9 @@ Prioritize {analysis_priority.lower()}-level issues requiring immediate attentio
         return prompt
     
     def process_log_with_dynamic_rag(self, log_content: str, 
-                                   ml_insights: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-        """Process log content with dynamic RAG analysis"""
+                                   ml_insights: Optional[Dict[str, Any]] = None,
+                                   analyzer: str = 'dynamic_rag') -> Dict[str, Any]:
+        """Process log content with dynamic RAG analysis (analyzer names the caller in cache statistics)"""
         
         print("🧠 Starting Dynamic RAG Analysis...")
         
@@ -414,6 +430,8 @@ Prioritize {analysis_priority.lower()}-level issues requiring immediate attentio
         
         # Step 4: Generate AI response if available
         ai_response = None
+        ai_response_cached = False
+        ai_degraded = False
         if self.ai_available:
             try:
                 print("🤖 Generating Claude AI response with dynamic prompt...")
@@ -437,38 +455,57 @@ Prioritize {analysis_priority.lower()}-level issues requiring immediate attentio
                     'temperature': 0.2   # Lower temperature for more focused responses
                 }
                 
-                # Make API request with longer timeout and better error handling
-                try:
-                    response = requests.post(
-                        f"{self.base_url.rstrip('/')}/chat/completions",
-                        headers=headers,
-                        json=payload,
-                        timeout=120  # Increased timeout to 2 minutes
-                    )
-                    
-                    if response.status_code == 200:
-                        result = response.json()
-                        ai_response = result['choices'][0]['message']['content']
-                        print(f"✅ Claude AI response generated ({len(ai_response)} characters)")
-                    else:
-                        print(f"⚠️ Claude API error: {response.status_code} - {response.text[:200]}")
-                        ai_response = f"Claude API response failed (HTTP {response.status_code}). Please use the dynamic prompt below for manual analysis."
+                # PERFORMANCE OPTIMIZATION: Reuse responses to previously sent prompts
+                response_cache = get_llm_response_cache()
+                cache_key = None
+                if response_cache:
+                    cache_key = response_cache.key_for(self.model, payload['messages'][0]['content'],
+                                                       payload['temperature'], payload['max_tokens'])
+                    ai_response = response_cache.get_response(analyzer, cache_key)
+                    ai_response_cached = ai_response is not None
+                    if ai_response_cached:
+                        print(f"⚡ LLM response cache hit for {analyzer} ({len(ai_response)} characters)")
+                
+                # Make API request on a cache miss with longer timeout and better error handling
+                if not ai_response_cached:
+                    try:
+                        response = requests.post(
+                            f"{self.base_url.rstrip('/')}/chat/completions",
+                            headers=headers,
+                            json=payload,
+                            timeout=120  # Increased timeout to 2 minutes
+                        )
                         
-                except requests.exceptions.Timeout:
-                    print("⚠️ Claude API request timed out after 2 minutes")
-                    ai_response = "Claude API request timed out. The dynamic prompt below contains comprehensive analysis for manual review."
-                    
-                except requests.exceptions.ConnectionError as e:
-                    print(f"⚠️ Claude API connection error: {str(e)[:100]}")
-                    ai_response = "Claude API connection failed. Please use the dynamic prompt below for manual analysis."
-                    
-                except requests.exceptions.RequestException as e:
-                    print(f"⚠️ Claude API request error: {str(e)[:100]}")
-                    ai_response = "Claude API request failed. Please use the dynamic prompt below for manual analysis."
+                        if response.status_code == 200:
+                            result = response.json()
+                            ai_response = result['choices'][0]['message']['content']
+                            print(f"✅ Claude AI response generated ({len(ai_response)} characters)")
+                            if response_cache and cache_key and ai_response:
+                                response_cache.set_response(analyzer, cache_key, ai_response, self.model)
+                        else:
+                            print(f"⚠️ Claude API error: {response.status_code} - {response.text[:200]}")
+                            ai_response = f"Claude API response failed (HTTP {response.status_code}). Please use the dynamic prompt below for manual analysis."
+                            ai_degraded = True
+                            
+                    except requests.exceptions.Timeout:
+                        print("⚠️ Claude API request timed out after 2 minutes")
+                        ai_response = "Claude API request timed out. The dynamic prompt below contains comprehensive analysis for manual review."
+                        ai_degraded = True
+                        
+                    except requests.exceptions.ConnectionError as e:
+                        print(f"⚠️ Claude API connection error: {str(e)[:100]}")
+                        ai_response = "Claude API connection failed. Please use the dynamic prompt below for manual analysis."
+                        ai_degraded = True
+                        
+                    except requests.exceptions.RequestException as e:
+                        print(f"⚠️ Claude API request error: {str(e)[:100]}")
+                        ai_response = "Claude API request failed. Please use the dynamic prompt below for manual analysis."
+                        ai_degraded = True
                     
             except Exception as e:
                 print(f"⚠️ Claude AI response generation failed: {e}")
                 ai_response = "Claude AI response generation unavailable. Please use the dynamic prompt below for manual analysis."
+                ai_degraded = True
         
         return {
             'log_context': log_context,
@@ -481,24 +518,45 @@ Prioritize {analysis_priority.lower()}-level issues requiring immediate attentio
                 'knowledge_sources_used': len(knowledge_sources),
                 'prompt_length': len(dynamic_prompt),
                 'ai_available': self.ai_available,
+                'ai_response_cached': ai_response_cached,
+                'ai_degraded': ai_degraded,
                 'ml_enhanced': bool(ml_insights),
                 'ml_insights_used': len(ml_insights.keys()) if ml_insights else 0,
                 'timestamp': datetime.now().isoformat()
             }
         }
 
+_dynamic_rag_system = None
+_dynamic_rag_system_lock = threading.Lock()
+
+def get_dynamic_rag_system() -> DynamicRAGSystem:
+    """Get the process-wide Dynamic RAG system, created on first use"""
+    global _dynamic_rag_system
+    
+    if _dynamic_rag_system is None:
+        with _dynamic_rag_system_lock:
+            if _dynamic_rag_system is None:
+                from config import get_config
+                config = get_config()
+                _dynamic_rag_system = DynamicRAGSystem(
+                    pdf_dir=config.RAG_PDF_DIRECTORY,
+                    knowledge_pool_size=config.RAG_KNOWLEDGE_POOL_SIZE
+                )
+    
+    return _dynamic_rag_system
+
 def apply_dynamic_rag_to_analysis(log_analysis: Dict[str, Any], 
-                                log_content: str = "") -> Dict[str, Any]:
+                                log_content: str = "", analyzer: str = 'dynamic_rag') -> Dict[str, Any]:
     """Apply dynamic RAG analysis to log analysis results"""
     
     try:
-        dynamic_rag = DynamicRAGSystem()
+        dynamic_rag = get_dynamic_rag_system()
         
         # Get ML insights if available
         ml_insights = log_analysis.get('ml_insights')
         
         # Process with dynamic RAG
-        dynamic_results = dynamic_rag.process_log_with_dynamic_rag(log_content, ml_insights)
+        dynamic_results = dynamic_rag.process_log_with_dynamic_rag(log_content, ml_insights, analyzer=analyzer)
         
         # Add dynamic RAG results to analysis
         log_analysis['dynamic_rag_analysis'] = dynamic_results
@@ -520,7 +578,7 @@ def apply_dynamic_rag_to_analysis(log_analysis: Dict[str, Any],
         
     except Exception as e:
         print(f"⚠️ Dynamic RAG analysis failed: {e}")
-        log_analysis['dynamic_rag_analysis'] = {'error': str(e), 'status': 'failed'}
+        log_analysis['dynamic_rag_analysis'] = {'error': str(e), 'status': 'failed', 'ai_degraded': True}
         return log_analysis
 
 if __name__ == "__main__":
@@ -0,0 +1,291 @@
+# -*- coding: utf-8 -*-
+"""
+Knowledge Vector Index
+Local dense retrieval over PDF knowledge sections. Sections are split into fixed-size word
+passages and embedded with TF-IDF + TruncatedSVD (LSA) - no model download. Vectors are kept
+as a memory-mapped float32 matrix next to the knowledge database and searched with FAISS
+when it is installed, NumPy otherwise.
+"""
+
+import os
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Tuple
+
+import numpy as np
+
+try:
+    import joblib
+    from sklearn.decomposition import TruncatedSVD
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.preprocessing import normalize
+    VECTOR_INDEX_AVAILABLE = True
+except ImportError:
+    VECTOR_INDEX_AVAILABLE = False
+    print("⚠️ scikit-learn not available - knowledge vector index disabled")
+
+try:
+    import faiss
+    FAISS_AVAILABLE = True
+except ImportError:
+    FAISS_AVAILABLE = False
+
+# Passages of PASSAGE_WORDS words, consecutive passages sharing PASSAGE_OVERLAP_WORDS
+PASSAGE_WORDS = 120
+PASSAGE_OVERLAP_WORDS = 30
+EMBEDDING_DIMENSIONS = 128
+MAX_VOCABULARY = 50000
+
+# New sections are embedded with the fitted model and appended; once the corpus has grown by
+# this share since the last fit (or sections were removed) the model is refitted from scratch
+REFIT_GROWTH = 0.5
+
+# Passages ranked per query before they are folded into per-section scores
+PASSAGES_PER_RESULT = 4
+
+# The manifest names the current index files; each build writes new files, since a file
+# that another process has memory-mapped cannot be replaced on Windows
+MANIFEST_FILE = 'manifest.json'
+
+
+def split_passages(text: str) -> List[str]:
+    """Overlapping fixed-size word windows of a section (one passage for short sections)"""
+    words = text.split()
+    step = PASSAGE_WORDS - PASSAGE_OVERLAP_WORDS
+    return [' '.join(words[start:start + PASSAGE_WORDS])
+            for start in range(0, max(len(words) - PASSAGE_OVERLAP_WORDS, 1), step)]
+
+
+class KnowledgeVectorIndex:
+    """
+    Passage embeddings of the knowledge sections, synced from the knowledge database at ingest time
+    
+    Rows are ordered by section id. Readers reload when the manifest (written last) changes
+    on disk, so an ingest run in another process is picked up by the next search.
+    """
+    
+    def __init__(self, index_dir: str):
+        self.index_dir = index_dir
+        self._lock = threading.Lock()
+        self._manifest_signature = None
+        # (manifest, embedder, vectors, section_ids, faiss index) swapped in as one reference
+        self._state = None
+    
+    def _path(self, name: str) -> str:
+        return os.path.join(self.index_dir, name)
+    
+    def _load(self):
+        """Current index state, reloaded when the manifest changed; None when there is no index"""
+        try:
+            stat = os.stat(self._path(MANIFEST_FILE))
+            signature = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            signature = None
+        if signature == self._manifest_signature:
+            return self._state
+        
+        with self._lock:
+            if signature == self._manifest_signature:
+                return self._state
+            state = None
+            if signature is not None:
+                try:
+                    with open(self._path(MANIFEST_FILE), 'r', encoding='utf-8') as f:
+                        manifest = json.load(f)
+                    files = manifest['files']
+                    embedder = joblib.load(self._path(files['embedder']))
+                    vectors = np.load(self._path(files['vectors']), mmap_mode='r')
+                    section_ids = np.load(self._path(files['section_ids']))
+                    faiss_index = None
+                    if FAISS_AVAILABLE:
+                        faiss_index = faiss.IndexFlatIP(vectors.shape[1])
+                        faiss_index.add(np.ascontiguousarray(vectors))
+                    state = (manifest, embedder, vectors, section_ids, faiss_index)
+                except Exception as e:
+                    # Keep serving the previous index; a rewrite changes the signature again
+                    print(f"⚠️ Knowledge vector index unreadable: {e}")
+                    return self._state
+            self._state = state
+            self._manifest_signature = signature
+            return state
+    
+    @staticmethod
+    def _embed(embedder: Tuple[Any, Any], texts: List[str]) -> np.ndarray:
+        vectorizer, svd = embedder
+        return normalize(svd.transform(vectorizer.transform(texts))).astype(np.float32)
+    
+    @staticmethod
+    def _section_passages(rows: List[tuple]) -> Tuple[List[str], List[int]]:
+        """Passage texts (prefixed with their section title) and their section ids"""
+        texts, section_ids = [], []
+        for section_id, title, content, keywords in rows:
+            prefix = ' '.join(part for part in (title, keywords) if part)
+            for passage in split_passages(content or ''):
+                texts.append(f"{prefix}. {passage}" if prefix else passage)
+                section_ids.append(section_id)
+        return texts, section_ids
+    
+    def sync(self, conn: sqlite3.Connection) -> Dict[str, Any]:
+        """Bring the index up to date with pdf_sections: append new sections, refit when needed"""
+        if not VECTOR_INDEX_AVAILABLE:
+            return {'status': 'unavailable'}
+        
+        current_ids = [row[0] for row in conn.execute('SELECT id FROM pdf_sections ORDER BY id')]
+        state = self._load()
+        indexed_ids = np.unique(state[3]) if state else np.array([], dtype=np.int64)
+        new_ids = np.setdiff1d(np.asarray(current_ids, dtype=np.int64), indexed_ids)
+        
+        refit = (
+            state is None
+            or len(np.setdiff1d(indexed_ids, current_ids))
+            or (len(new_ids) and len(indexed_ids) and new_ids[0] < indexed_ids[-1])
+            or len(current_ids) > state[0]['fitted_sections'] * (1 + REFIT_GROWTH)
+        )
+        if not refit and not len(new_ids):
+            return {'status': 'current', 'sections': len(current_ids), 'passages': int(len(state[3]))}
+        
+        if refit:
+            rows = conn.execute(
+                'SELECT id, section_title, content, keywords FROM pdf_sections ORDER BY id'
+            ).fetchall()
+        else:
+            rows = []
+            for start in range(0, len(new_ids), 500):
+                chunk = [int(i) for i in new_ids[start:start + 500]]
+                rows += conn.execute(
+                    f"SELECT id, section_title, content, keywords FROM pdf_sections "
+                    f"WHERE id IN ({','.join('?' * len(chunk))}) ORDER BY id", chunk
+                ).fetchall()
+        texts, section_ids = self._section_passages(rows)
+        
+        if refit:
+            embedder = self._fit(texts)
+            if embedder is None:
+                return {'status': 'too_small', 'sections': len(current_ids), 'passages': len(texts)}
+            vectors = self._embed(embedder, texts)
+            ids = np.asarray(section_ids, dtype=np.int64)
+            fitted_sections = len(current_ids)
+        else:
+            manifest, embedder, old_vectors, old_ids, _ = state
+            vectors = np.concatenate([old_vectors, self._embed(embedder, texts)])
+            ids = np.concatenate([old_ids, np.asarray(section_ids, dtype=np.int64)])
+            fitted_sections = manifest['fitted_sections']
+        
+        self._write(vectors, ids, embedder if refit else None, fitted_sections, state[0] if state else None)
+        return {
+            'status': 'refitted' if refit else 'appended',
+            'sections': len(current_ids),
+            'passages': int(len(ids)),
+            'passages_embedded': len(texts)
+        }
+    
+    @staticmethod
+    def _fit(texts: List[str]) -> Optional[Tuple[Any, Any]]:
+        """Fit TF-IDF + LSA on the passages; None when there is too little text for a projection"""
+        if len(texts) < 3:
+            return None
+        vectorizer = TfidfVectorizer(sublinear_tf=True, stop_words='english', max_features=MAX_VOCABULARY,
+                                     dtype=np.float32)
+        tfidf = vectorizer.fit_transform(texts)
+        dimensions = min(EMBEDDING_DIMENSIONS, tfidf.shape[0] - 1, tfidf.shape[1] - 1)
+        if dimensions < 2:
+            return None
+        svd = TruncatedSVD(n_components=dimensions, random_state=42)
+        svd.fit(tfidf)
+        return vectorizer, svd
+    
+    def _write(self, vectors: np.ndarray, section_ids: np.ndarray, embedder: Optional[Tuple[Any, Any]],
+               fitted_sections: int, previous: Optional[Dict[str, Any]]):
+        """Write a new set of index files; the manifest goes last so readers never see a partial index"""
+        os.makedirs(self.index_dir, exist_ok=True)
+        build = datetime.now().strftime('%Y%m%d%H%M%S%f')
+        files = {'vectors': f'vectors-{build}.npy', 'section_ids': f'section_ids-{build}.npy'}
+        np.save(self._path(files['vectors']), vectors)
+        np.save(self._path(files['section_ids']), section_ids)
+        if embedder is not None:
+            files['embedder'] = f'embedder-{build}.joblib'
+            joblib.dump(embedder, self._path(files['embedder']))
+        else:
+            files['embedder'] = previous['files']['embedder']
+        
+        manifest = {
+            'built_at': datetime.now().isoformat(),
+            'passages': int(len(section_ids)),
+            'sections': int(len(np.unique(section_ids))),
+            'fitted_sections': int(fitted_sections),
+            'dimensions': int(vectors.shape[1]),
+            'passage_words': PASSAGE_WORDS,
+            'passage_overlap_words': PASSAGE_OVERLAP_WORDS,
+            'files': files
+        }
+        with open(self._path(MANIFEST_FILE + '.tmp'), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(self._path(MANIFEST_FILE + '.tmp'), self._path(MANIFEST_FILE))
+        
+        # Superseded files; ones still mapped by a reader are removed by a later build
+        for name in os.listdir(self.index_dir):
+            if name != MANIFEST_FILE and name not in files.values():
+                try:
+                    os.remove(self._path(name))
+                except OSError:
+                    pass
+    
+    def section_scores(self, query: str, candidate_ids: List[int], top_k: int) -> Dict[int, float]:
+        """
+        Best passage cosine similarity per section, for the top_k nearest sections plus the candidates
+        
+        Returns an empty dict when there is no index or the query has no known terms.
+        """
+        state = self._load()
+        if state is None:
+            return {}
+        _, embedder, vectors, section_ids, faiss_index = state
+        
+        query_vector = self._embed(embedder, [query])[0]
+        if not query_vector.any():
+            return {}
+        
+        passages = min(top_k * PASSAGES_PER_RESULT, len(section_ids))
+        if faiss_index is not None:
+            scores, rows = faiss_index.search(query_vector[None, :], passages)
+            scores, rows = scores[0], rows[0]
+        else:
+            all_scores = vectors @ query_vector
+            rows = np.argpartition(-all_scores, passages - 1)[:passages]
+            scores = all_scores[rows]
+        
+        results = {}
+        for row, score in sorted(zip(rows.tolist(), scores.tolist()), key=lambda pair: -pair[1]):
+            if row < 0:
+                continue
+            section_id = int(section_ids[row])
+            if section_id not in results:
+                if len(results) >= top_k:
+                    continue
+                results[section_id] = score
+        
+        # Exact scores for candidates outside the nearest passages; rows are ordered by section id
+        missing = np.asarray([i for i in candidate_ids if i not in results], dtype=np.int64)
+        if len(missing):
+            starts = np.searchsorted(section_ids, missing, side='left')
+            ends = np.searchsorted(section_ids, missing, side='right')
+            for section_id, start, end in zip(missing.tolist(), starts, ends):
+                if end > start:
+                    results[section_id] = float((vectors[start:end] @ query_vector).max())
+        
+        return results
+    
+    def version(self) -> Optional[str]:
+        """Build time of the index being served, None when there is no index"""
+        state = self._load()
+        return state[0].get('built_at') if state else None
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Manifest of the current index plus the search backend"""
+        state = self._load()
+        stats = dict(state[0]) if state else {'passages': 0}
+        stats['backend'] = 'faiss' if FAISS_AVAILABLE else 'numpy'
+        stats['index_dir'] = self.index_dir
+        return stats
@@ -8,74 +8,341 @@ Uses free, open-source ML libraries for local processing
 import pandas as pd
 import numpy as np
 
-# COMPREHENSIVE THREADING FIX: Set environment before any ML library imports
 import os
 import sys
 
-# Set threading environment variables at the system level
-def configure_ml_threading():
-    """Configure threading environment for stable ML operations"""
-    threading_config = {
-        'OMP_NUM_THREADS': '1',
-        'MKL_NUM_THREADS': '1', 
-        'OPENBLAS_NUM_THREADS': '1',
-        'VECLIB_MAXIMUM_THREADS': '1',
-        'NUMEXPR_NUM_THREADS': '1',
-        'BLIS_NUM_THREADS': '1',
-        'SKLEARN_THREAD_POOL_LIMIT': '1',
-        'THREADPOOLCTL_LIMIT': '1'
-    }
-    
-    for key, value in threading_config.items():
-        os.environ[key] = value
-    
-    print(f"🔧 Threading environment configured: {len(threading_config)} variables set")
+# BLAS/OpenMP thread variables; only ML worker processes set them (the web process keeps its defaults)
+THREAD_ENV_VARS = (
+    'OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS',
+    'VECLIB_MAXIMUM_THREADS', 'NUMEXPR_NUM_THREADS', 'BLIS_NUM_THREADS'
+)
 
-# Apply threading configuration immediately
-configure_ml_threading()
-
-# DIRECT FIX 2: Disable all warnings and force single threading
 import warnings
 warnings.filterwarnings('ignore')
 
-# Configure NumPy threading before sklearn imports
+# Scoped BLAS/OpenMP limits (threadpoolctl ships with scikit-learn)
 try:
-    if hasattr(np, 'set_num_threads'):
-        np.set_num_threads(1)
-    print("📊 NumPy threading configured")
-except Exception as e:
-    print(f"⚠️ NumPy threading config warning: {e}")
-
-# DIRECT FIX 3: Enhanced threadpoolctl configuration
-# Completely disable threadpoolctl to avoid recursion issues
-print("🔧 Using simplified threading approach without threadpoolctl")
-
-class SafeThreadpoolLimits:
-    """Thread-safe context manager that prevents recursion issues"""
-    def __init__(self, **kwargs):
-        self.kwargs = kwargs
-        
-    def __enter__(self):
-        return self
-        
-    def __exit__(self, *args):
-        pass
-
-def threadpool_limits(**kwargs):
-    """Safe threadpool limits that prevents recursion"""
-    return SafeThreadpoolLimits(**kwargs)
+    from threadpoolctl import threadpool_limits
+    THREADPOOLCTL_AVAILABLE = True
+except ImportError:
+    THREADPOOLCTL_AVAILABLE = False
+    
+    class SafeThreadpoolLimits:
+        """No-op stand-in when threadpoolctl is not installed"""
+        def __init__(self, **kwargs):
+            self.kwargs = kwargs
+            
+        def __enter__(self):
+            return self
+            
+        def __exit__(self, *args):
+            pass
+    
+    def threadpool_limits(**kwargs):
+        """Safe threadpool limits that prevents recursion"""
+        return SafeThreadpoolLimits(**kwargs)
 
-# Now import sklearn components with full threading protection
 from sklearn.ensemble import IsolationForest, RandomForestClassifier
-from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer
 from sklearn.cluster import KMeans
-from sklearn.preprocessing import StandardScaler
+from sklearn.preprocessing import StandardScaler, normalize
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import classification_report, confusion_matrix
+from scipy import sparse
 import joblib
 import re
+import copy
+import json
+import threading
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Tuple
+from itertools import islice
+from typing import Dict, List, Any, Tuple, Optional, Iterable
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FuturesTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+# Log line formats, tried in order (anchored - a line takes the first format that matches)
+LOG_LINE_PATTERNS = [re.compile('^' + pattern) for pattern in [
+    # DS Agent format: 2025-07-25 00:03:47.451678 [+0100]: [Component/Level] | Message | Source | ThreadID
+    r'(?P<timestamp>\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2}\.\d+)\s+\[(?P<timezone>[^\]]+)\]:\s+\[(?P<component>[^/]+)/(?P<level>\d+)\]\s+\|\s+(?P<message>[^|]+?)\s+\|\s+(?P<source>[^|]+?)\s+\|\s+(?P<thread_id>.*)',
+    # DS Agent alternative: timestamp [timezone]: [component/level] | message
+    r'(?P<timestamp>\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2}\.\d+)\s+\[(?P<timezone>[^\]]+)\]:\s+\[(?P<component>[^/]+)/(?P<level>\d+)\]\s+\|\s+(?P<message>.*)',
+    # Standard format: 2024-08-12 10:00:00 LEVEL [Component] Message
+    r'(?P<timestamp>\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2})\s+(?P<level>\w+)\s+\[(?P<component>[^\]]+)\]\s+(?P<message>.*)',
+    # Alternative format: 2024-08-12 10:00:00 LEVEL Component: Message
+    r'(?P<timestamp>\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2})\s+(?P<level>\w+)\s+(?P<component>\w+):\s+(?P<message>.*)',
+    # Simple format: 2024-08-12 10:00:00 LEVEL Message
+    r'(?P<timestamp>\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2})\s+(?P<level>\w+)\s+(?P<message>.*)',
+]]
+
+# Keyword flags, matched against the lowercased message as one alternation each
+ERROR_KEYWORDS = re.compile('error|failed|exception|crash')
+WARNING_KEYWORDS = re.compile('warning|timeout|retry')
+CRITICAL_KEYWORDS = re.compile('critical|fatal|emergency')
+CONNECTION_KEYWORDS = re.compile('connect')  # also covers 'connection' and 'disconnect'
+NUMERIC_CODE_PATTERN = r'\b\d{3,}\b'
+IP_ADDRESS_PATTERN = r'\b\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}\b'
+DS_LEVEL_SEVERITY = {'1': 'CRITICAL', '2': 'WARNING', '3': 'INFO', '4': 'DEBUG', '5': 'TRACE'}
+
+# Rule-based severity keywords (lowercased message)
+RULE_CRITICAL_KEYWORDS = re.compile('crash|fatal|emergency|system failure|scan engine crashed')
+RULE_HIGH_KEYWORDS = re.compile('error|failed|exception|denied|timeout|not_support')
+RULE_MEDIUM_KEYWORDS = re.compile('warning|retry|slow|notification')
+
+# Columns accepted from analyzer-parsed entries -> ML frame columns (first present source wins)
+PARSED_ENTRY_COLUMNS = {
+    'timestamp': 'timestamp',
+    'timezone': 'timezone',
+    'component': 'component',
+    'level': 'level',
+    'message': 'message',
+    'location': 'source',
+    'source': 'source',
+    'thread': 'thread_id',
+    'thread_id': 'thread_id'
+}
+
+ANOMALY_FEATURE_NAMES = [
+    'message_length', 'has_error_keywords', 'has_warning_keywords',
+    'has_critical_keywords', 'numeric_codes', 'ip_addresses',
+    'hour', 'day_of_week', 'is_critical', 'is_warning', 'is_error',
+    'is_command', 'is_heartbeat', 'is_connection', 'has_http',
+    'has_lua_error', 'thread_id_present', 'metrics_failure', 'amsp_related'
+]
+
+# Message text features: unigrams + bigrams hashed into a fixed width - no vocabulary to fit,
+# so every request and worker process shares one feature space. Counts are IDF-weighted when
+# trained weights (message_idf) exist, then L2-normalized.
+MESSAGE_HASH_FEATURES = 2 ** 18
+MESSAGE_BATCH_ROWS = 50000
+MESSAGE_HASHER = HashingVectorizer(
+    n_features=MESSAGE_HASH_FEATURES,
+    stop_words='english',
+    ngram_range=(1, 2),
+    alternate_sign=False,
+    norm=None
+)
+
+# Leader clustering: cosine similarity needed to join a representative, rows per sparse batch
+CLUSTER_SIMILARITY_THRESHOLD = 0.5
+CLUSTER_BATCH_ROWS = 65536
+
+# Persisted model files, by attribute name on MLLogAnalyzer (pattern_* are used by DSAgentLogAnalyzer)
+MODEL_FILES = {
+    'anomaly_detector': 'anomaly_detector.joblib',
+    'severity_classifier': 'severity_classifier.joblib',
+    'message_idf': 'message_idf.joblib',
+    'scaler': 'scaler.joblib',
+    'pattern_scaler': 'pattern_scaler.joblib',
+    'pattern_clusterer': 'pattern_clusterer.joblib'
+}
+
+# Names the active model version (a sub-directory written by train_models); absent = flat layout
+MODEL_MANIFEST = 'manifest.json'
+
+# Offline training
+TRAINING_FILE_EXTENSIONS = ('.log', '.txt')
+PATTERN_CLUSTER_COUNT = 5
+
+class ModelRegistry:
+    """
+    Process-wide cache of the persisted ML models
+
+    Each model is loaded once per worker process (memory-mapped where joblib can)
+    and reloaded when its file changes on disk or the manifest switches to another
+    version - every lookup re-checks the manifest and model file signatures with stat calls.
+    """
+    
+    def __init__(self, model_dir: str):
+        self.model_dir = model_dir
+        self._lock = threading.Lock()
+        self._models = {name: None for name in MODEL_FILES}
+        self._signatures = {name: None for name in MODEL_FILES}
+        self.load_count = 0
+        self.version = None
+        self._active_dir = model_dir
+        self._manifest_signature = None
+        
+        os.makedirs(model_dir, exist_ok=True)
+    
+    def _manifest_stat(self):
+        """(mtime_ns, size) of the manifest, None when there is none"""
+        try:
+            stat = os.stat(os.path.join(self.model_dir, MODEL_MANIFEST))
+            return (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return None
+    
+    def _resolve_active_dir(self, signature) -> str:
+        """Directory of the version named by the manifest, the model directory itself without one (call with the lock held)"""
+        if signature != self._manifest_signature:
+            if signature is None:
+                self.version, self._active_dir = None, self.model_dir
+            else:
+                try:
+                    with open(os.path.join(self.model_dir, MODEL_MANIFEST), 'r', encoding='utf-8') as f:
+                        version = json.load(f)['version']
+                    self.version, self._active_dir = version, os.path.join(self.model_dir, version)
+                except Exception as e:
+                    # Keep serving the previous version; a rewrite changes the signature again
+                    print(f"Warning: Could not read model manifest: {e}")
+            self._manifest_signature = signature
+        return self._active_dir
+    
+    def _signature(self, active_dir: str, name: str):
+        """(path, mtime_ns, size) of a model file, None when it does not exist"""
+        path = os.path.join(active_dir, MODEL_FILES[name])
+        try:
+            stat = os.stat(path)
+            return (path, stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return None
+    
+    @staticmethod
+    def _load(path: str):
+        try:
+            # Uncompressed numpy payloads are mapped instead of copied into memory
+            return joblib.load(path, mmap_mode='r')
+        except Exception:
+            return joblib.load(path)
+    
+    def fingerprint(self) -> Dict[str, Any]:
+        """Active version and model file signatures (stat calls only), for keys of results built from the models"""
+        with self._lock:
+            active_dir = self._resolve_active_dir(self._manifest_stat())
+            version = self.version
+        files = {}
+        for name in MODEL_FILES:
+            signature = self._signature(active_dir, name)
+            files[name] = list(signature[1:]) if signature else None
+        return {'version': version, 'files': files}
+    
+    def get_models(self) -> Dict[str, Any]:
+        """Current models by name (None for models that are not on disk)"""
+        if self._manifest_stat() == self._manifest_signature:
+            current = {name: self._signature(self._active_dir, name) for name in MODEL_FILES}
+            if current == self._signatures:
+                return dict(self._models)
+        
+        with self._lock:
+            # Re-check under the lock so a manifest switch is applied by one thread as a whole
+            active_dir = self._resolve_active_dir(self._manifest_stat())
+            current = {name: self._signature(active_dir, name) for name in MODEL_FILES}
+            for name, signature in current.items():
+                if signature == self._signatures[name]:
+                    continue
+                if signature is None:
+                    self._models[name] = None
+                else:
+                    try:
+                        self._models[name] = self._load(signature[0])
+                        self.load_count += 1
+                        print(f"📦 Loaded ML model {name} (pid {os.getpid()})")
+                    except Exception as e:
+                        # Keep serving the previous model; a rewrite changes the signature again
+                        print(f"Warning: Could not load model {name}: {e}")
+                self._signatures[name] = signature
+            return dict(self._models)
+
+_model_registries = {}
+_model_registries_lock = threading.Lock()
+
+def get_model_registry(model_dir: str = "ml_models") -> ModelRegistry:
+    """Registry for a model directory, shared by every MLLogAnalyzer in this process"""
+    key = os.path.abspath(model_dir)
+    registry = _model_registries.get(key)
+    if registry is None:
+        with _model_registries_lock:
+            registry = _model_registries.get(key)
+            if registry is None:
+                registry = _model_registries[key] = ModelRegistry(model_dir)
+    return registry
+
+def _reset_model_registries():
+    """Forked workers start with their own registries (and an unheld lock)"""
+    global _model_registries_lock
+    _model_registries.clear()
+    _model_registries_lock = threading.Lock()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_model_registries)
+
+# Dedicated ML worker pool (created lazily, reused across requests)
+_ml_pool = None
+_ml_pool_lock = threading.Lock()
+
+# BLAS/OpenMP threads of this process when it is an ML worker, 0 in the web process
+_ml_worker_threads = 0
+
+def configure_ml_threading(num_threads: int):
+    """Pin BLAS/OpenMP thread pools of an ML worker process to num_threads"""
+    global _ml_worker_threads
+    for key in THREAD_ENV_VARS:
+        os.environ[key] = str(num_threads)
+    if THREADPOOLCTL_AVAILABLE:
+        # Libraries are already loaded by now, so the environment alone is not enough
+        threadpool_limits(limits=num_threads)
+    _ml_worker_threads = num_threads
+    print(f"🔧 ML worker {os.getpid()} configured: {num_threads} BLAS/OpenMP threads")
+
+def get_ml_pool() -> Optional[ProcessPoolExecutor]:
+    """Get the process-wide ML worker pool (None when disabled or unavailable)"""
+    global _ml_pool
+    
+    if _ml_pool is None:
+        with _ml_pool_lock:
+            if _ml_pool is None:
+                try:
+                    import multiprocessing
+                    from config import get_config
+                    config = get_config()
+                    workers = config.ML_WORKER_PROCESSES
+                    if workers <= 0:
+                        return None
+                    threads = config.ML_WORKER_THREADS or max(1, (os.cpu_count() or 1) // workers)
+                    # spawn avoids forking a multi-threaded Flask worker
+                    _ml_pool = ProcessPoolExecutor(
+                        max_workers=workers,
+                        mp_context=multiprocessing.get_context('spawn'),
+                        initializer=configure_ml_threading,
+                        initargs=(threads,)
+                    )
+                    print(f"🧠 ML worker pool started: {workers} processes x {threads} threads")
+                except Exception as e:
+                    print(f"⚠️ ML worker pool unavailable, running ML in-process: {e}")
+                    return None
+    
+    return _ml_pool
+
+def _reset_ml_pool(pool: ProcessPoolExecutor, terminate: bool = False):
+    """Drop a broken or stuck ML worker pool so the next request gets a fresh one"""
+    global _ml_pool
+    with _ml_pool_lock:
+        if _ml_pool is pool:
+            _ml_pool = None
+    # A timed-out job keeps running in its worker - stop the workers rather than queue behind it
+    processes = list((getattr(pool, '_processes', None) or {}).values()) if terminate else []
+    pool.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        try:
+            process.terminate()
+        except Exception as e:
+            print(f"⚠️ Failed to stop ML worker {process.pid}: {e}")
+
+def _run_ml_task(func, *args) -> Dict[str, Any]:
+    """Queue an ML entry point on the worker pool; in-process when the pool is disabled, broken or stuck"""
+    pool = get_ml_pool()
+    if pool is not None:
+        from config import get_config
+        timeout = get_config().ML_WORKER_TIMEOUT
+        try:
+            return pool.submit(func, *args).result(timeout=timeout)
+        except BrokenProcessPool as e:
+            print(f"⚠️ ML worker pool broken, running ML in-process: {e}")
+            _reset_ml_pool(pool)
+        except FuturesTimeoutError:
+            print(f"⚠️ ML worker timed out after {timeout}s, restarting the pool and running ML in-process")
+            _reset_ml_pool(pool, terminate=True)
+    return func(*args)
 
 class MLLogAnalyzer:
     """Machine Learning powered log analyzer for enhanced cybersecurity insights"""
@@ -84,50 +351,27 @@ class MLLogAnalyzer:
         self.model_dir = model_dir
         self.anomaly_detector = None
         self.severity_classifier = None
-        self.log_vectorizer = None
+        self.message_idf = None
         self.scaler = StandardScaler()
         
-        # Ensure model directory exists
-        os.makedirs(model_dir, exist_ok=True)
+        # Offline-trained scaler + detector: requests only transform and predict
+        self.pretrained_anomaly_model = False
         
-        # DIRECT FIX 6: Initialize system-level threading protection
-        self._configure_threading_environment()
-        
-        # Load existing models if available
+        # Load existing models if available (warm, from the process-wide registry)
         self._load_models()
     
-    def _configure_threading_environment(self):
-        """Configure threading environment for stable ML operations"""
-        try:
-            # Set additional thread limits at runtime
-            os.environ.setdefault('SKLEARN_THREAD_POOL_LIMIT', '1')
-            os.environ.setdefault('THREADPOOLCTL_LIMIT', '1')
-            
-            # Configure NumPy threading
-            import numpy as np
-            if hasattr(np, 'set_num_threads'):
-                np.set_num_threads(1)
-                
-            print("🔧 Threading environment configured for ML stability")
-        except Exception as e:
-            print(f"⚠️ Threading configuration warning: {e}")
-    
     def _load_models(self):
         """Load pre-trained models if they exist"""
         try:
-            anomaly_path = os.path.join(self.model_dir, "anomaly_detector.joblib")
-            classifier_path = os.path.join(self.model_dir, "severity_classifier.joblib")
-            vectorizer_path = os.path.join(self.model_dir, "log_vectorizer.joblib")
-            scaler_path = os.path.join(self.model_dir, "scaler.joblib")
+            models = get_model_registry(self.model_dir).get_models()
             
-            if os.path.exists(anomaly_path):
-                self.anomaly_detector = joblib.load(anomaly_path)
-            if os.path.exists(classifier_path):
-                self.severity_classifier = joblib.load(classifier_path)
-            if os.path.exists(vectorizer_path):
-                self.log_vectorizer = joblib.load(vectorizer_path)
-            if os.path.exists(scaler_path):
-                self.scaler = joblib.load(scaler_path)
+            self.anomaly_detector = models['anomaly_detector']
+            self.severity_classifier = models['severity_classifier']
+            self.message_idf = models['message_idf']
+            if models['scaler'] is not None:
+                # detect_anomalies refits the scaler; a shallow copy keeps the shared one intact
+                self.scaler = copy.copy(models['scaler'])
+            self.pretrained_anomaly_model = models['anomaly_detector'] is not None and models['scaler'] is not None
                 
         except Exception as e:
             print(f"Warning: Could not load existing models: {e}")
@@ -139,8 +383,8 @@ class MLLogAnalyzer:
                 joblib.dump(self.anomaly_detector, os.path.join(self.model_dir, "anomaly_detector.joblib"))
             if self.severity_classifier:
                 joblib.dump(self.severity_classifier, os.path.join(self.model_dir, "severity_classifier.joblib"))
-            if self.log_vectorizer:
-                joblib.dump(self.log_vectorizer, os.path.join(self.model_dir, "log_vectorizer.joblib"))
+            if self.message_idf:
+                joblib.dump(self.message_idf, os.path.join(self.model_dir, "message_idf.joblib"))
             if self.scaler:
                 joblib.dump(self.scaler, os.path.join(self.model_dir, "scaler.joblib"))
         except Exception as e:
@@ -148,86 +392,103 @@ class MLLogAnalyzer:
     
     def parse_log_entries(self, log_content: str) -> pd.DataFrame:
         """Parse log content into structured DataFrame for ML analysis"""
-        entries = []
-        lines = log_content.strip().split('\n')
+        lines = pd.Series(log_content.strip().split('\n')).str.strip()
+        lines = lines[lines != '']
         
-        for line in lines:
-            if not line.strip():
-                continue
-                
-            entry = self._parse_single_log_entry(line)
-            if entry:
-                entries.append(entry)
-        
-        return pd.DataFrame(entries)
-    
-    def _parse_single_log_entry(self, line: str) -> Dict[str, Any]:
-        """Parse a single log entry into structured data"""
-        # Enhanced regex patterns for various log formats including DS Agent
-        patterns = [
-            # DS Agent format: 2025-07-25 00:03:47.451678 [+0100]: [Component/Level] | Message | Source | ThreadID
-            r'(?P<timestamp>\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2}\.\d+)\s+\[(?P<timezone>[^\]]+)\]:\s+\[(?P<component>[^/]+)/(?P<level>\d+)\]\s+\|\s+(?P<message>[^|]+?)\s+\|\s+(?P<source>[^|]+?)\s+\|\s+(?P<thread_id>.*)',
-            # DS Agent alternative: timestamp [timezone]: [component/level] | message
-            r'(?P<timestamp>\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2}\.\d+)\s+\[(?P<timezone>[^\]]+)\]:\s+\[(?P<component>[^/]+)/(?P<level>\d+)\]\s+\|\s+(?P<message>.*)',
-            # Standard format: 2024-08-12 10:00:00 LEVEL [Component] Message
-            r'(?P<timestamp>\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2})\s+(?P<level>\w+)\s+\[(?P<component>[^\]]+)\]\s+(?P<message>.*)',
-            # Alternative format: 2024-08-12 10:00:00 LEVEL Component: Message
-            r'(?P<timestamp>\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2})\s+(?P<level>\w+)\s+(?P<component>\w+):\s+(?P<message>.*)',
-            # Simple format: 2024-08-12 10:00:00 LEVEL Message
-            r'(?P<timestamp>\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2})\s+(?P<level>\w+)\s+(?P<message>.*)',
-        ]
+        # Each format claims the lines it matches; the rest fall through to the next one
+        parts = []
+        for pattern in LOG_LINE_PATTERNS:
+            if lines.empty:
+                break
+            extracted = lines.str.extract(pattern)
+            matched = extracted['timestamp'].notna()
+            if matched.any():
+                parts.append(extracted[matched])
+            lines = lines[~matched]
         
-        for pattern in patterns:
-            match = re.match(pattern, line.strip())
-            if match:
-                entry = match.groupdict()
-                
-                # Add derived features for ML
-                entry['message_length'] = len(entry['message'])
-                entry['has_error_keywords'] = any(keyword in entry['message'].lower() 
-                                                for keyword in ['error', 'failed', 'exception', 'crash'])
-                entry['has_warning_keywords'] = any(keyword in entry['message'].lower() 
-                                                  for keyword in ['warning', 'timeout', 'retry'])
-                entry['has_critical_keywords'] = any(keyword in entry['message'].lower() 
-                                                   for keyword in ['critical', 'fatal', 'emergency'])
-                entry['numeric_codes'] = len(re.findall(r'\b\d{3,}\b', entry['message']))
-                entry['ip_addresses'] = len(re.findall(r'\b\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}\b', entry['message']))
-                
-                # DS Agent specific features
-                entry['is_command'] = 'command' in entry['message'].lower() or entry.get('component', '').lower() == 'cmd'
-                entry['is_heartbeat'] = 'heartbeat' in entry.get('component', '').lower()
-                entry['is_connection'] = any(conn in entry['message'].lower() for conn in ['connection', 'connect', 'disconnect'])
-                entry['has_http'] = 'http' in entry['message'].lower()
-                entry['has_lua_error'] = '.lua:' in entry['message']
-                entry['thread_id_present'] = bool(entry.get('thread_id'))
-                entry['source_file_present'] = bool(entry.get('source'))
-                entry['metrics_failure'] = 'metrics failed' in entry['message'].lower()
-                entry['amsp_related'] = 'amsp' in entry['message'].lower() or 'AMSP' in entry['message']
-                
-                # Convert numeric level to meaningful severity for DS Agent logs
-                level_num = entry.get('level', '0')
-                if level_num.isdigit():
-                    level_mapping = {'1': 'CRITICAL', '2': 'WARNING', '3': 'INFO', '4': 'DEBUG', '5': 'TRACE'}
-                    entry['severity'] = level_mapping.get(level_num, 'UNKNOWN')
-                else:
-                    entry['severity'] = entry.get('level', 'UNKNOWN').upper()
-                
-                # Extract hour for time-based analysis (handle microseconds)
-                try:
-                    # Try DS agent format first (with microseconds)
-                    if '.' in entry['timestamp']:
-                        dt = datetime.strptime(entry['timestamp'].split('.')[0], '%Y-%m-%d %H:%M:%S')
-                    else:
-                        dt = datetime.strptime(entry['timestamp'], '%Y-%m-%d %H:%M:%S')
-                    entry['hour'] = dt.hour
-                    entry['day_of_week'] = dt.weekday()
-                except:
-                    entry['hour'] = 0
-                    entry['day_of_week'] = 0
-                
-                return entry
+        if not parts:
+            return pd.DataFrame()
+        
+        df = pd.concat(parts).sort_index().reset_index(drop=True)
+        return self._add_derived_features(df)
+    
+    def entries_to_dataframe(self, entries) -> pd.DataFrame:
+        """
+        Build the ML frame from entries an analyzer has already parsed
+
+        Accepts a DataFrame or a list of entry dicts with timestamp, component, level,
+        message and thread (optionally timezone and location), as produced by
+        DSAgentLogAnalyzer.parse_log_entry. Columns of a DataFrame are referenced, not copied.
+        """
+        if isinstance(entries, pd.DataFrame):
+            source = entries
+        else:
+            if not entries:
+                return pd.DataFrame()
+            source = pd.DataFrame.from_records(entries, columns=[c for c in PARSED_ENTRY_COLUMNS if c in entries[0]])
+        
+        columns = {}
+        for name, target in PARSED_ENTRY_COLUMNS.items():
+            if name in source.columns and target not in columns:
+                columns[target] = source[name]
+        if source.empty or 'message' not in columns or 'timestamp' not in columns:
+            return pd.DataFrame()
+        if 'level' not in columns:
+            columns['level'] = pd.Series('0', index=source.index)
+        if pd.api.types.is_datetime64_any_dtype(columns['timestamp']):
+            columns['timestamp'] = columns['timestamp'].dt.strftime('%Y-%m-%d %H:%M:%S')
+        
+        df = pd.DataFrame(columns, copy=False)
+        return self._add_derived_features(df)
+    
+    def _add_derived_features(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Add the keyword, count, DS Agent and time features as whole columns"""
+        message = df['message'].fillna('')
+        lowered = message.str.lower()
+        component = df['component'].fillna('').str.lower() if 'component' in df.columns else pd.Series('', index=df.index)
+        
+        def present(column):
+            if column not in df.columns:
+                return pd.Series(False, index=df.index)
+            return df[column].fillna('').astype(str) != ''
+        
+        df['message_length'] = message.str.len()
+        df['has_error_keywords'] = lowered.str.contains(ERROR_KEYWORDS)
+        df['has_warning_keywords'] = lowered.str.contains(WARNING_KEYWORDS)
+        df['has_critical_keywords'] = lowered.str.contains(CRITICAL_KEYWORDS)
+        df['numeric_codes'] = message.str.count(NUMERIC_CODE_PATTERN)
+        df['ip_addresses'] = message.str.count(IP_ADDRESS_PATTERN)
+        
+        # DS Agent specific features
+        df['is_command'] = lowered.str.contains('command', regex=False) | (component == 'cmd')
+        df['is_heartbeat'] = component.str.contains('heartbeat', regex=False)
+        df['is_connection'] = lowered.str.contains(CONNECTION_KEYWORDS)
+        df['has_http'] = lowered.str.contains('http', regex=False)
+        df['has_lua_error'] = message.str.contains('.lua:', regex=False)
+        df['thread_id_present'] = present('thread_id')
+        df['source_file_present'] = present('source')
+        df['metrics_failure'] = lowered.str.contains('metrics failed', regex=False)
+        df['amsp_related'] = lowered.str.contains('amsp', regex=False)
+        
+        # Convert numeric level to meaningful severity for DS Agent logs
+        level = df['level'].fillna('0').astype(str)
+        numeric_level = level.str.isdigit()
+        df['severity'] = level.map(DS_LEVEL_SEVERITY).fillna('UNKNOWN').where(numeric_level, level.str.upper())
+        
+        # Extract hour for time-based analysis (fractional seconds dropped, unparseable -> 0)
+        timestamps = pd.to_datetime(df['timestamp'].str.slice(0, 19), format='%Y-%m-%d %H:%M:%S', errors='coerce')
+        # Only lines with extra whitespace between date and time need the slower normalization
+        retry = timestamps.isna() & df['timestamp'].notna()
+        if retry.any():
+            timestamps[retry] = pd.to_datetime(
+                df.loc[retry, 'timestamp'].str.split('.').str[0].str.replace(r'\s+', ' ', regex=True),
+                format='%Y-%m-%d %H:%M:%S',
+                errors='coerce'
+            )
+        df['hour'] = timestamps.dt.hour.fillna(0).astype(int)
+        df['day_of_week'] = timestamps.dt.dayofweek.fillna(0).astype(int)
         
-        return None
+        return df
     
     def detect_anomalies(self, df: pd.DataFrame) -> Dict[str, Any]:
         """Detect anomalous log entries using Isolation Forest"""
@@ -240,19 +501,24 @@ class MLLogAnalyzer:
         if features.empty:
             return {'anomalies': [], 'anomaly_score': 0, 'total_entries': len(df)}
         
-        # Train anomaly detector if not exists or retrain with new data
-        if self.anomaly_detector is None or len(features) > 100:
-            # Use statistical anomaly detection by default to avoid all threading issues
-            print("🔄 Using statistical anomaly detection to avoid threading issues...")
-            features_scaled = self.scaler.fit_transform(features)
-            self.anomaly_detector = None  # Mark as using fallback
-        else:
-            features_scaled = self.scaler.transform(features)
+        features_scaled = None
+        if self.pretrained_anomaly_model:
+            # Offline-trained scaler and detector - a scoring pass only, stable across uploads
+            try:
+                features_scaled = self.scaler.transform(features)
+            except Exception as e:
+                print(f"⚠️ Pre-trained anomaly model unusable: {e}, fitting per request")
+                self.pretrained_anomaly_model = False
+                self.anomaly_detector = None
+                self.scaler = StandardScaler()
+        
+        if features_scaled is None:
+            features_scaled = self._fit_anomaly_model(features)
         
         # Predict anomalies with enhanced thread protection
         try:
             if self.anomaly_detector is not None:
-                with threadpool_limits(limits=1, user_api='blas'):
+                with threadpool_limits(limits=_ml_worker_threads or 1, user_api='blas'):
                     anomaly_predictions = self.anomaly_detector.predict(features_scaled)
                     anomaly_scores = self.anomaly_detector.decision_function(features_scaled)
             else:
@@ -262,22 +528,30 @@ class MLLogAnalyzer:
             print(f"⚠️ Anomaly prediction failed: {prediction_error}, using statistical fallback")
             anomaly_predictions, anomaly_scores = self._statistical_anomaly_detection(features_scaled)
         
-        # Identify anomalous entries
-        anomalies = []
-        for idx, (prediction, score) in enumerate(zip(anomaly_predictions, anomaly_scores)):
-            if prediction == -1:  # Anomaly detected
-                anomaly_entry = {
-                    'index': idx,
-                    'timestamp': df.iloc[idx]['timestamp'],
-                    'level': df.iloc[idx]['level'],
-                    'message': df.iloc[idx]['message'],
-                    'anomaly_score': score,
-                    'confidence': abs(score)
-                }
-                anomalies.append(anomaly_entry)
+        # Identify anomalous entries, most anomalous first (stable for equal confidence)
+        anomaly_index = np.flatnonzero(np.asarray(anomaly_predictions) == -1)
+        scores = np.asarray(anomaly_scores, dtype=float)[anomaly_index]
+        order = np.argsort(-np.abs(scores), kind='stable')
+        anomaly_index, scores = anomaly_index[order], scores[order]
+        selected = df.iloc[anomaly_index]
         
-        # Sort by confidence (most anomalous first)
-        anomalies.sort(key=lambda x: x['confidence'], reverse=True)
+        anomalies = [
+            {
+                'index': idx,
+                'timestamp': timestamp,
+                'level': level,
+                'message': message,
+                'anomaly_score': score,
+                'confidence': abs(score)
+            }
+            for idx, timestamp, level, message, score in zip(
+                anomaly_index.tolist(),
+                selected['timestamp'].tolist(),
+                selected['level'].tolist(),
+                selected['message'].tolist(),
+                scores.tolist()
+            )
+        ]
         
         return {
             'anomalies': anomalies,
@@ -286,70 +560,74 @@ class MLLogAnalyzer:
             'anomaly_count': len(anomalies)
         }
     
+    def _fit_anomaly_model(self, features: pd.DataFrame) -> np.ndarray:
+        """Per-request scaler/detector fit, used when no offline-trained model is available"""
+        # Train anomaly detector if not exists or retrain with new data
+        if self.anomaly_detector is None or len(features) > 100:
+            features_scaled = self.scaler.fit_transform(features)
+            if _ml_worker_threads:
+                # Dedicated ML worker - its thread pools belong to this process alone
+                try:
+                    with threadpool_limits(limits=_ml_worker_threads):
+                        self.anomaly_detector = IsolationForest(
+                            contamination=0.1, random_state=42, n_jobs=_ml_worker_threads
+                        ).fit(features_scaled)
+                except Exception as e:
+                    print(f"⚠️ Isolation Forest training failed: {e}, using statistical fallback")
+                    self.anomaly_detector = None
+            else:
+                # Use statistical anomaly detection in the web process to avoid threading issues
+                print("🔄 Using statistical anomaly detection to avoid threading issues...")
+                self.anomaly_detector = None  # Mark as using fallback
+        else:
+            features_scaled = self.scaler.transform(features)
+        return features_scaled
+    
+    def vectorize_messages(self, messages: Iterable[str]) -> sparse.csr_matrix:
+        """Hashed message features, consumed in batches (any iterable, e.g. a streaming generator)"""
+        messages = iter(messages)
+        batches = []
+        while True:
+            batch = list(islice(messages, MESSAGE_BATCH_ROWS))
+            if not batch:
+                break
+            counts = MESSAGE_HASHER.transform(batch)
+            batches.append(self.message_idf.transform(counts) if self.message_idf is not None else normalize(counts))
+        if not batches:
+            return sparse.csr_matrix((0, MESSAGE_HASH_FEATURES))
+        return sparse.vstack(batches, format='csr')
+    
     def _extract_anomaly_features(self, df: pd.DataFrame) -> pd.DataFrame:
         """Extract numerical features for anomaly detection"""
-        features = []
-        
-        for _, row in df.iterrows():
-            feature_vector = [
-                row.get('message_length', 0),
-                int(row.get('has_error_keywords', False)),
-                int(row.get('has_warning_keywords', False)),
-                int(row.get('has_critical_keywords', False)),
-                row.get('numeric_codes', 0),
-                row.get('ip_addresses', 0),
-                row.get('hour', 0),
-                row.get('day_of_week', 0),
-                1 if row.get('severity', '').upper() == 'CRITICAL' else 0,
-                1 if row.get('severity', '').upper() == 'WARNING' else 0,
-                1 if row.get('level', '').upper() == 'ERROR' else 0,
-                # DS Agent specific features
-                int(row.get('is_command', False)),
-                int(row.get('is_heartbeat', False)),
-                int(row.get('is_connection', False)),
-                int(row.get('has_http', False)),
-                int(row.get('has_lua_error', False)),
-                int(row.get('thread_id_present', False)),
-                int(row.get('metrics_failure', False)),
-                int(row.get('amsp_related', False)),
-            ]
-            features.append(feature_vector)
-        
-        feature_names = [
-            'message_length', 'has_error_keywords', 'has_warning_keywords',
-            'has_critical_keywords', 'numeric_codes', 'ip_addresses',
-            'hour', 'day_of_week', 'is_critical', 'is_warning', 'is_error',
-            'is_command', 'is_heartbeat', 'is_connection', 'has_http',
-            'has_lua_error', 'thread_id_present', 'metrics_failure', 'amsp_related'
-        ]
+        def column(name):
+            if name not in df.columns:
+                return np.zeros(len(df), dtype=np.int64)
+            return df[name].fillna(0).to_numpy().astype(np.int64)
+        
+        def upper_equals(name, value):
+            if name not in df.columns:
+                return np.zeros(len(df), dtype=np.int64)
+            return (df[name].fillna('').astype(str).str.upper() == value).to_numpy().astype(np.int64)
+        
+        features = {name: column(name) for name in ANOMALY_FEATURE_NAMES}
+        features['is_critical'] = upper_equals('severity', 'CRITICAL')
+        features['is_warning'] = upper_equals('severity', 'WARNING')
+        features['is_error'] = upper_equals('level', 'ERROR')
         
-        return pd.DataFrame(features, columns=feature_names)
+        return pd.DataFrame(features, columns=ANOMALY_FEATURE_NAMES)
     
     def classify_severity(self, df: pd.DataFrame) -> Dict[str, Any]:
         """Intelligently classify log entry severity using ML"""
         if df.empty:
             return {'predictions': [], 'confidence_scores': []}
         
-        # Prepare text features
-        if self.log_vectorizer is None:
-            self.log_vectorizer = TfidfVectorizer(
-                max_features=1000,
-                stop_words='english',
-                ngram_range=(1, 2)
-            )
-            
-            # Train on existing log messages
-            messages = df['message'].fillna('').tolist()
-            self.log_vectorizer.fit(messages)
-        
-        # Transform messages to feature vectors
-        message_features = self.log_vectorizer.transform(df['message'].fillna(''))
-        
         # If we don't have a trained classifier, use rule-based classification
         if self.severity_classifier is None:
             predictions = self._rule_based_severity_classification(df)
             confidences = [0.8] * len(predictions)  # Medium confidence for rule-based
         else:
+            # Transform messages to feature vectors
+            message_features = self.vectorize_messages(df['message'].fillna(''))
             predictions = self.severity_classifier.predict(message_features)
             confidences = self.severity_classifier.predict_proba(message_features).max(axis=1)
         
@@ -360,40 +638,36 @@ class MLLogAnalyzer:
     
     def _rule_based_severity_classification(self, df: pd.DataFrame) -> List[str]:
         """Enhanced rule-based severity classification for DS Agent logs"""
-        severities = []
+        def text(name):
+            if name not in df.columns:
+                return pd.Series('', index=df.index)
+            return df[name].fillna('').astype(str)
         
-        for _, row in df.iterrows():
-            message = row.get('message', '').lower()
-            level = row.get('level', '').upper()
-            severity_mapped = row.get('severity', '').upper()
-            component = row.get('component', '').lower()
-            
-            # DS Agent specific critical indicators
-            if (severity_mapped == 'CRITICAL' or level == '1' or 
-                any(word in message for word in ['crash', 'fatal', 'emergency', 'system failure', 'scan engine crashed'])):
-                severity = 'CRITICAL'
-            
-            # DS Agent high severity indicators
-            elif (severity_mapped == 'WARNING' or level == '2' or
-                  row.get('metrics_failure', False) or
-                  row.get('has_lua_error', False) or
-                  any(word in message for word in ['error', 'failed', 'exception', 'denied', 'timeout', 'not_support'])):
-                severity = 'HIGH'
-            
-            # Medium severity for connection issues and commands
-            elif (row.get('is_connection', False) or 
-                  row.get('is_command', False) or
-                  'heartbeat' in component or
-                  any(word in message for word in ['warning', 'retry', 'slow', 'notification'])):
-                severity = 'MEDIUM'
-            
-            # Low severity for normal operations
-            else:
-                severity = 'LOW'
-            
-            severities.append(severity)
+        def flag(name):
+            if name not in df.columns:
+                return pd.Series(False, index=df.index)
+            return df[name].fillna(False).astype(bool)
+        
+        message = text('message').str.lower()
+        level = text('level').str.upper()
+        severity_mapped = text('severity').str.upper()
+        component = text('component').str.lower()
         
-        return severities
+        # DS Agent specific critical indicators
+        critical = (severity_mapped == 'CRITICAL') | (level == '1') | message.str.contains(RULE_CRITICAL_KEYWORDS)
+        
+        # DS Agent high severity indicators
+        high = ((severity_mapped == 'WARNING') | (level == '2') |
+                flag('metrics_failure') | flag('has_lua_error') |
+                message.str.contains(RULE_HIGH_KEYWORDS))
+        
+        # Medium severity for connection issues and commands
+        medium = (flag('is_connection') | flag('is_command') |
+                  component.str.contains('heartbeat', regex=False) |
+                  message.str.contains(RULE_MEDIUM_KEYWORDS))
+        
+        # Low severity for normal operations
+        return np.select([critical, high, medium], ['CRITICAL', 'HIGH', 'MEDIUM'], default='LOW').tolist()
     
     def analyze_patterns(self, df: pd.DataFrame) -> Dict[str, Any]:
         """Analyze patterns in log data using clustering"""
@@ -401,23 +675,23 @@ class MLLogAnalyzer:
             return {'clusters': [], 'pattern_summary': 'Insufficient data for pattern analysis'}
         
         # Prepare features for clustering
-        if self.log_vectorizer is None:
-            self.log_vectorizer = TfidfVectorizer(
-                max_features=500,
-                stop_words='english',
-                ngram_range=(1, 2)
-            )
-            messages = df['message'].fillna('').tolist()
-            self.log_vectorizer.fit(messages)
-        
-        message_features = self.log_vectorizer.transform(df['message'].fillna(''))
+        message_features = self.vectorize_messages(df['message'].fillna(''))
         
         # Determine optimal number of clusters (max 5 for readability)
         n_clusters = min(5, max(2, len(df) // 10))
         
-        # DIRECT FIX 7: Use thread-free clustering by default to eliminate NoneType errors
-        print("🔄 Using thread-free clustering fallback to avoid all threading issues...")
-        cluster_labels = self._simple_clustering_fallback(message_features, n_clusters)
+        cluster_labels = None
+        if _ml_worker_threads:
+            # Dedicated ML worker - KMeans can use its thread pools safely
+            try:
+                with threadpool_limits(limits=_ml_worker_threads):
+                    cluster_labels = KMeans(n_clusters=n_clusters, n_init=10, random_state=42).fit_predict(message_features)
+            except Exception as e:
+                print(f"⚠️ KMeans clustering failed: {e}")
+        if cluster_labels is None:
+            # DIRECT FIX 7: Use thread-free clustering in the web process to eliminate NoneType errors
+            print("🔄 Using thread-free clustering fallback to avoid all threading issues...")
+            cluster_labels = self._simple_clustering_fallback(message_features, n_clusters)
         
         # Analyze clusters
         clusters = []
@@ -426,8 +700,6 @@ class MLLogAnalyzer:
             cluster_entries = df[cluster_mask]
             
             if len(cluster_entries) > 0:
-                # Get most common words in this cluster
-                cluster_messages = ' '.join(cluster_entries['message'].fillna(''))
                 common_levels = cluster_entries['level'].value_counts().head(3).to_dict()
                 
                 cluster_info = {
@@ -450,61 +722,57 @@ class MLLogAnalyzer:
         }
     
     def _simple_clustering_fallback(self, message_features, n_clusters):
-        """Thread-free fallback clustering method that completely avoids sklearn threading"""
+        """
+        Thread-free fallback clustering method that completely avoids sklearn threading
+
+        Leader clustering over the rows in order: a row joins the first representative it
+        is more than CLUSTER_SIMILARITY_THRESHOLD cosine-similar to, becomes a new
+        representative while fewer than n_clusters - 1 exist, and otherwise joins its most
+        similar representative. Rows stay sparse (L2-normalized CSR); similarities are one
+        sparse x dense product per batch, so memory is bounded by the batch size.
+        """
         try:
             print("🔄 Using thread-free clustering fallback...")
             
-            # Convert sparse matrix to dense for simple operations
-            features_dense = message_features.toarray()
-            n_samples = features_dense.shape[0]
+            features = normalize(message_features.tocsr(), norm='l2')
+            n_samples = features.shape[0]
             
             if n_samples <= 1:
                 return np.zeros(n_samples)
             
-            # THREAD-FREE CLUSTERING: Manual similarity calculation without sklearn
-            def manual_cosine_similarity(vec1, vec2):
-                """Manual cosine similarity calculation without threading"""
-                dot_product = np.dot(vec1, vec2)
-                norm1 = np.linalg.norm(vec1)
-                norm2 = np.linalg.norm(vec2)
-                if norm1 == 0 or norm2 == 0:
-                    return 0
-                return dot_product / (norm1 * norm2)
-            
-            # Simple clustering: group by similarity thresholds
+            max_representatives = max(n_clusters - 1, 0)
+            representatives = np.zeros((0, features.shape[1]))
             cluster_labels = np.zeros(n_samples, dtype=int)
-            current_cluster = 0
-            cluster_representatives = []
             
-            for i in range(n_samples):
-                assigned = False
+            def assign(similarities):
+                """First representative above the threshold, else the most similar one"""
+                if similarities.shape[1] == 0:
+                    return np.zeros(similarities.shape[0], dtype=int)
+                above = similarities > CLUSTER_SIMILARITY_THRESHOLD
+                return np.where(above.any(axis=1), above.argmax(axis=1), similarities.argmax(axis=1))
+            
+            for start in range(0, n_samples, CLUSTER_BATCH_ROWS):
+                batch = features[start:start + CLUSTER_BATCH_ROWS]
+                similarities = np.asarray(batch @ representatives.T)
+                done = 0
                 
-                # Check similarity to existing clusters
-                for cluster_id, rep_idx in enumerate(cluster_representatives):
-                    similarity = manual_cosine_similarity(features_dense[i], features_dense[rep_idx])
-                    
-                    if similarity > 0.5:  # Similarity threshold
-                        cluster_labels[i] = cluster_id
-                        assigned = True
+                # While there is room, the next row matching no representative becomes one
+                while len(representatives) < max_representatives and done < batch.shape[0]:
+                    unmatched = ~(similarities[done:] > CLUSTER_SIMILARITY_THRESHOLD).any(axis=1)
+                    if not unmatched.any():
                         break
+                    leader = done + int(unmatched.argmax())
+                    cluster_labels[start + done:start + leader] = assign(similarities[done:leader])
+                    cluster_labels[start + leader] = len(representatives)
+                    
+                    representative = batch[leader].toarray()
+                    representatives = np.vstack([representatives, representative])
+                    similarities = np.hstack([similarities, np.asarray(batch @ representative.T)])
+                    done = leader + 1
                 
-                # Create new cluster if not similar to existing ones
-                if not assigned and current_cluster < n_clusters - 1:
-                    cluster_representatives.append(i)
-                    cluster_labels[i] = current_cluster
-                    current_cluster += 1
-                elif not assigned:
-                    # Assign to the most similar existing cluster
-                    best_cluster = 0
-                    best_similarity = -1
-                    for cluster_id, rep_idx in enumerate(cluster_representatives):
-                        similarity = manual_cosine_similarity(features_dense[i], features_dense[rep_idx])
-                        if similarity > best_similarity:
-                            best_similarity = similarity
-                            best_cluster = cluster_id
-                    cluster_labels[i] = best_cluster
+                cluster_labels[start + done:start + batch.shape[0]] = assign(similarities[done:])
             
-            print(f"✅ Thread-free clustering completed: {len(set(cluster_labels))} clusters")
+            print(f"✅ Thread-free clustering completed: {np.unique(cluster_labels).size} clusters")
             return cluster_labels
             
         except Exception as e:
@@ -733,12 +1001,49 @@ def enhance_analysis_with_ml(log_content: str, analysis_type: str = 'ds_logs') -
     Returns:
         Dict containing ML-enhanced analysis results
     """
+    return _run_ml_task(_analyze_log_content, log_content, analysis_type)
+
+def enhance_analysis_with_ml_entries(entries, analysis_type: str = 'ds_logs') -> Dict[str, Any]:
+    """
+    Enhance existing log analysis with ML insights from already-parsed entries
+    
+    Args:
+        entries: DataFrame or list of entry dicts (timestamp, component, level, message, thread)
+        analysis_type: Type of analysis being performed
+    
+    Returns:
+        Dict containing ML-enhanced analysis results
+    """
+    return _run_ml_task(_analyze_log_entries, _ml_entry_columns(entries), analysis_type)
+
+def _ml_entry_columns(entries):
+    """Only the columns entries_to_dataframe reads, so raw lines are not pickled into the ML worker"""
+    if isinstance(entries, pd.DataFrame):
+        return entries[[c for c in PARSED_ENTRY_COLUMNS if c in entries.columns]]
+    if not entries:
+        return entries
+    return pd.DataFrame.from_records(entries, columns=[c for c in PARSED_ENTRY_COLUMNS if c in entries[0]])
+
+def _analyze_log_content(log_content: str, analysis_type: str) -> Dict[str, Any]:
+    """ML analysis of raw log text (runs in an ML worker when the pool is enabled)"""
     ml_analyzer = MLLogAnalyzer()
     
     # Parse log content
     df = ml_analyzer.parse_log_entries(log_content)
     
-    # Generate ML insights
+    return _generate_insights(ml_analyzer, df, analysis_type)
+
+def _analyze_log_entries(entries, analysis_type: str) -> Dict[str, Any]:
+    """ML analysis of already-parsed entries (runs in an ML worker when the pool is enabled)"""
+    ml_analyzer = MLLogAnalyzer()
+    
+    # No raw text and no second parse - the analyzer's entries become the frame directly
+    df = ml_analyzer.entries_to_dataframe(entries)
+    
+    return _generate_insights(ml_analyzer, df, analysis_type)
+
+def _generate_insights(ml_analyzer: MLLogAnalyzer, df: pd.DataFrame, analysis_type: str) -> Dict[str, Any]:
+    """Run the ML insight generation and tag the result with its analysis type"""
     ml_insights = ml_analyzer.generate_ml_insights(df)
     
     # Add analysis type context
@@ -747,7 +1052,174 @@ def enhance_analysis_with_ml(log_content: str, analysis_type: str = 'ds_logs') -
     
     return ml_insights
 
+def benchmark_feature_pipeline(row_counts: Tuple[int, ...] = (100000, 1000000)) -> List[Dict[str, Any]]:
+    """Time parsing, anomaly feature extraction and anomaly selection on synthetic DS Agent logs"""
+    import time
+    
+    components = ['Heartbeat', 'Cmd', 'AM', 'dsa_core', 'Metrics', 'Connection']
+    messages = [
+        'Command GetConfiguration received',
+        'Connection to 10.0.{}.1 failed: timeout',
+        'metrics failed for job {}',
+        'AMSP scan engine crashed code 5001',
+        'Heartbeat completed in {} ms',
+        'error in /lib/plugin.lua:{}: attempt to index nil',
+        'retry {} http://relay/update',
+        'normal operation {}'
+    ]
+    
+    analyzer = MLLogAnalyzer()
+    results = []
+    for rows in row_counts:
+        log_content = '\n'.join(
+            f"2025-07-{10 + i % 18:02d} {i % 24:02d}:{i % 60:02d}:{(i * 7) % 60:02d}.{i % 1000000:06d} [+0100]: "
+            f"[{components[i % len(components)]}/{1 + i % 5}] | {messages[i % len(messages)].format(i % 997)} | "
+            f"agent.cpp:{i % 900} | {i % 4096:04X}"
+            for i in range(rows)
+        )
+        
+        timings = {'rows': rows}
+        started = time.perf_counter()
+        df = analyzer.parse_log_entries(log_content)
+        timings['parse_seconds'] = round(time.perf_counter() - started, 3)
+        
+        started = time.perf_counter()
+        features = analyzer._extract_anomaly_features(df)
+        timings['features_seconds'] = round(time.perf_counter() - started, 3)
+        
+        started = time.perf_counter()
+        anomalies = analyzer.detect_anomalies(df)
+        timings['detect_anomalies_seconds'] = round(time.perf_counter() - started, 3)
+        timings['anomaly_count'] = anomalies['anomaly_count']
+        timings['feature_shape'] = features.shape
+        
+        print(f"⏱️  {rows:>9,} rows: parse {timings['parse_seconds']}s, features {timings['features_seconds']}s, "
+              f"detect_anomalies {timings['detect_anomalies_seconds']}s")
+        results.append(timings)
+    return results
+
+def _iter_training_files(corpus_paths: List[str]):
+    """Log files under the given files/directories (directories are walked for .log/.txt files)"""
+    for path in corpus_paths:
+        if os.path.isfile(path):
+            yield path
+            continue
+        for root, _, files in os.walk(path):
+            for file_name in sorted(files):
+                if file_name.lower().endswith(TRAINING_FILE_EXTENSIONS):
+                    yield os.path.join(root, file_name)
+
+def train_models(corpus_paths: List[str], model_dir: str = "ml_models", version: str = None) -> Dict[str, Any]:
+    """
+    Offline training on a corpus of historical logs
+    
+    Fits the anomaly scaler and IsolationForest, the message IDF weights and the DS Agent
+    pattern scaler + KMeans centroids, writes them to <model_dir>/<version>/ and then
+    switches the manifest to that version. Running servers pick it up on their next
+    request; requests only transform and predict with these models.
+    """
+    version = version or datetime.now().strftime('v%Y%m%d_%H%M%S')
+    version_dir = os.path.join(model_dir, version)
+    analyzer = MLLogAnalyzer(model_dir)
+    
+    try:
+        from analyzers.ds_agent_log_analyzer import DSAgentLogAnalyzer
+        ds_analyzer = DSAgentLogAnalyzer()
+    except Exception as e:
+        print(f"⚠️ DS Agent pattern features unavailable, pattern clustering not trained: {e}")
+        ds_analyzer = None
+    
+    anomaly_features, message_batches, pattern_vectors = [], [], []
+    files_used = 0
+    for file_path in _iter_training_files(corpus_paths):
+        try:
+            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+                content = f.read()
+        except Exception as e:
+            print(f"⚠️ Skipping {file_path}: {e}")
+            continue
+        
+        df = analyzer.parse_log_entries(content)
+        if df.empty:
+            continue
+        files_used += 1
+        anomaly_features.append(analyzer._extract_anomaly_features(df))
+        message_batches.append(df['message'].fillna('').tolist())
+        
+        if ds_analyzer is not None:
+            entries = [entry for entry in map(ds_analyzer.parse_log_entry, content.splitlines()) if entry['parsed']]
+            vectors, _ = ds_analyzer._extract_pattern_features(entries)
+            pattern_vectors.extend(vectors)
+        print(f"📄 {file_path}: {len(df)} entries")
+    
+    if not anomaly_features:
+        raise ValueError("No log entries found in the training corpus")
+    
+    features = pd.concat(anomaly_features, ignore_index=True)
+    models = {'scaler': StandardScaler().fit(features)}
+    models['anomaly_detector'] = IsolationForest(
+        contamination=0.1, random_state=42, n_jobs=-1
+    ).fit(models['scaler'].transform(features))
+    # IDF weights for the hashed message features (the hashing itself has nothing to fit)
+    models['message_idf'] = TfidfTransformer().fit(
+        sparse.vstack([MESSAGE_HASHER.transform(batch) for batch in message_batches], format='csr')
+    )
+    
+    if len(pattern_vectors) >= PATTERN_CLUSTER_COUNT:
+        models['pattern_scaler'] = StandardScaler().fit(pattern_vectors)
+        models['pattern_clusterer'] = KMeans(
+            n_clusters=PATTERN_CLUSTER_COUNT, random_state=42, n_init=10
+        ).fit(models['pattern_scaler'].transform(pattern_vectors))
+    
+    os.makedirs(version_dir, exist_ok=True)
+    for name, model in models.items():
+        joblib.dump(model, os.path.join(version_dir, MODEL_FILES[name]))
+    
+    import sklearn
+    manifest = {
+        'version': version,
+        'trained_at': datetime.now().isoformat(),
+        'sklearn_version': sklearn.__version__,
+        'models': sorted(models),
+        'corpus': {
+            'files': files_used,
+            'entries': len(features),
+            'pattern_entries': len(pattern_vectors)
+        },
+        'anomaly_feature_names': ANOMALY_FEATURE_NAMES
+    }
+    with open(os.path.join(version_dir, MODEL_MANIFEST), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    
+    # Atomic switch - a server never sees a half-written manifest
+    manifest_path = os.path.join(model_dir, MODEL_MANIFEST)
+    with open(manifest_path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(manifest_path + '.tmp', manifest_path)
+    
+    print(f"✅ Trained ML models {version}: {files_used} files, {len(features)} entries -> {version_dir}")
+    return manifest
+
 if __name__ == "__main__":
+    if '--benchmark' in sys.argv:
+        benchmark_feature_pipeline()
+        sys.exit(0)
+    
+    if '--train' in sys.argv:
+        # python ml_analyzer.py --train <log files or directories...> [--model-dir DIR] [--version NAME]
+        args = sys.argv[sys.argv.index('--train') + 1:]
+        options = {}
+        for option in ('--model-dir', '--version'):
+            if option in args:
+                position = args.index(option)
+                options[option] = args[position + 1]
+                del args[position:position + 2]
+        if not args:
+            print("Usage: python ml_analyzer.py --train <log files or directories...> [--model-dir DIR] [--version NAME]")
+            sys.exit(2)
+        train_models(args, options.get('--model-dir', 'ml_models'), options.get('--version'))
+        sys.exit(0)
+    
     # Test the ML analyzer
     test_log = """
 2024-08-12 10:00:00 INFO [DS Agent] Service started successfully
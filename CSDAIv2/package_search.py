@@ -0,0 +1,371 @@
+# -*- coding: utf-8 -*-
+"""
+Package Search Index
+Per-session SQLite FTS5 (trigram) index over the text members of a diagnostic package,
+built while members stream out of the ZIP, for grep-style line search with context
+"""
+
+import io
+import os
+import time
+import sqlite3
+import zipfile
+import threading
+from typing import Dict, List, Any, Optional
+
+# Members larger than this are not indexed (matches the diagnostic package indexer)
+MAX_MEMBER_BYTES = 100 * 1024 * 1024
+MAX_LINE_CHARS = 2000
+INSERT_BATCH_ROWS = 5000
+BINARY_SNIFF_BYTES = 8192
+
+MAX_CONTEXT_LINES = 10
+MAX_PAGE_SIZE = 200
+# Matches are counted up to this many; beyond it the total is reported as a lower bound
+MAX_COUNTED_MATCHES = 10000
+
+# The trigram tokenizer only indexes strings of three or more characters
+MIN_INDEXED_QUERY_CHARS = 3
+
+
+def _trigram_tokenizer_available() -> bool:
+    """Whether this SQLite build has FTS5 with the trigram tokenizer (SQLite 3.34 or newer)"""
+    conn = sqlite3.connect(':memory:')
+    try:
+        conn.execute("CREATE VIRTUAL TABLE probe USING fts5(text, tokenize='trigram')")
+        return True
+    except sqlite3.Error:
+        return False
+    finally:
+        conn.close()
+
+
+TRIGRAM_AVAILABLE = _trigram_tokenizer_available()
+if not TRIGRAM_AVAILABLE:
+    print(f"⚠️ SQLite {sqlite3.sqlite_version} has no FTS5 trigram tokenizer (3.34+ required) - package search disabled")
+
+
+class PackageSearchIndex:
+    """Line-level full-text index of one diagnostic package"""
+
+    def __init__(self, db_path: str, max_total_bytes: int = 0):
+        self.db_path = db_path
+        self.max_total_bytes = max_total_bytes
+
+        self.status = 'pending'
+        self.error = None
+        self.stats = {
+            'files_indexed': 0,
+            'files_skipped': 0,
+            'lines_indexed': 0,
+            'bytes_indexed': 0,
+            'truncated': False,
+            'build_seconds': None
+        }
+
+        self._next_line_id = 1
+        self._cancelled = threading.Event()
+        self._thread = None
+
+        # The package ZIP being read by a build; its deletion is deferred until the build closes it.
+        # A drop during a build likewise leaves deleting the database to the build thread.
+        self.zip_path = None
+        self._zip_lock = threading.Lock()
+        self._reading_zip = False
+        self._remove_zip = False
+        self._remove_db = False
+
+        index_dir = os.path.dirname(db_path)
+        if index_dir:
+            os.makedirs(index_dir, exist_ok=True)
+
+    @staticmethod
+    def _member_encoding(head: bytes) -> Optional[str]:
+        """Text encoding of a member from its first bytes, None for binary members"""
+        if head.startswith((b'\xff\xfe', b'\xfe\xff')):
+            return 'utf-16'
+        if b'\x00' in head:
+            return None
+        return 'utf-8'
+
+    def _create_schema(self, conn: sqlite3.Connection):
+        conn.executescript('''
+            CREATE TABLE files (
+                id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                first_line_id INTEGER NOT NULL,
+                last_line_id INTEGER NOT NULL DEFAULT 0,
+                line_count INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE TABLE lines (
+                id INTEGER PRIMARY KEY,
+                file_id INTEGER NOT NULL,
+                line_no INTEGER NOT NULL,
+                text TEXT NOT NULL
+            );
+            CREATE VIRTUAL TABLE lines_fts USING fts5(
+                text, content='lines', content_rowid='id', tokenize='trigram'
+            );
+        ''')
+
+    def build(self, zip_path: str) -> Dict[str, Any]:
+        """
+        Stream every text member of the package into the index
+
+        Lines are bulk-loaded into a plain table first and the FTS index is
+        built in one pass afterwards, which is much faster than indexing row by row.
+        Line ids are contiguous per member, so context lookups are primary-key ranges.
+        """
+        started = time.time()
+        self.status = 'building'
+        with self._zip_lock:
+            self.zip_path = zip_path
+            self._reading_zip = True
+        try:
+            if os.path.exists(self.db_path):
+                os.remove(self.db_path)
+
+            conn = sqlite3.connect(self.db_path)
+            # Throwaway per-session database - durability is not needed while loading
+            conn.execute('PRAGMA journal_mode=OFF')
+            conn.execute('PRAGMA synchronous=OFF')
+            self._create_schema(conn)
+
+            with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+                for info in zip_ref.infolist():
+                    if self._cancelled.is_set():
+                        break
+                    if info.is_dir() or info.flag_bits & 0x1 or info.file_size > MAX_MEMBER_BYTES:
+                        self.stats['files_skipped'] += 1
+                        continue
+                    if self.max_total_bytes and self.stats['bytes_indexed'] + info.file_size > self.max_total_bytes:
+                        self.stats['files_skipped'] += 1
+                        self.stats['truncated'] = True
+                        continue
+                    self._index_member(conn, zip_ref, info)
+
+            if self._cancelled.is_set():
+                conn.close()
+                self.status = 'cancelled'
+                return self.stats
+
+            conn.execute("INSERT INTO lines_fts(lines_fts) VALUES('rebuild')")
+            conn.commit()
+            conn.close()
+
+            self.stats['build_seconds'] = round(time.time() - started, 2)
+            self.status = 'ready'
+            print(f"🔎 Package search index ready: {self.stats['files_indexed']} files, "
+                  f"{self.stats['lines_indexed']} lines in {self.stats['build_seconds']}s")
+        except Exception as e:
+            self.status = 'failed'
+            self.error = str(e)
+            print(f"⚠️ Package search index build failed: {e}")
+        finally:
+            self._release_zip()
+        return self.stats
+
+    def _release_zip(self):
+        """Mark the build as finished, deleting the ZIP and database if their cleanup was handed to it"""
+        with self._zip_lock:
+            self._reading_zip = False
+            remove, self._remove_zip = self._remove_zip, False
+            remove_db, self._remove_db = self._remove_db, False
+        if remove:
+            try:
+                os.remove(self.zip_path)
+            except OSError as e:
+                print(f"⚠️ Failed to remove indexed package {self.zip_path}: {e}")
+        if remove_db:
+            self._remove_db_files()
+
+    def defer_zip_cleanup(self, path: str) -> bool:
+        """
+        Hand deletion of the package ZIP to the index while a build may still read it
+
+        Returns True when the index will delete the file once the build is done,
+        False when the caller can delete it now.
+        """
+        with self._zip_lock:
+            if not self._reading_zip or not self.zip_path or os.path.abspath(path) != os.path.abspath(self.zip_path):
+                return False
+            self._remove_zip = True
+            return True
+
+    def _index_member(self, conn: sqlite3.Connection, zip_ref: zipfile.ZipFile, info: zipfile.ZipInfo):
+        """Insert one member's lines, skipping binary content"""
+        try:
+            with zip_ref.open(info) as member:
+                encoding = self._member_encoding(member.read(BINARY_SNIFF_BYTES))
+            if encoding is None:
+                self.stats['files_skipped'] += 1
+                return
+
+            first_line_id = self._next_line_id
+            file_id = conn.execute(
+                'INSERT INTO files (name, size, first_line_id) VALUES (?, ?, ?)',
+                (info.filename, info.file_size, first_line_id)
+            ).lastrowid
+
+            line_no = 0
+            batch = []
+            with zip_ref.open(info) as member:
+                for line in io.TextIOWrapper(member, encoding=encoding, errors='ignore'):
+                    batch.append((first_line_id + line_no, file_id, line_no + 1, line.rstrip('\r\n')[:MAX_LINE_CHARS]))
+                    line_no += 1
+                    if len(batch) >= INSERT_BATCH_ROWS:
+                        conn.executemany('INSERT INTO lines (id, file_id, line_no, text) VALUES (?, ?, ?, ?)', batch)
+                        batch = []
+                        if self._cancelled.is_set():
+                            return
+            if batch:
+                conn.executemany('INSERT INTO lines (id, file_id, line_no, text) VALUES (?, ?, ?, ?)', batch)
+
+            self._next_line_id = first_line_id + line_no
+            conn.execute(
+                'UPDATE files SET line_count = ?, last_line_id = ? WHERE id = ?',
+                (line_no, first_line_id + line_no - 1, file_id)
+            )
+            self.stats['files_indexed'] += 1
+            self.stats['lines_indexed'] += line_no
+            self.stats['bytes_indexed'] += info.file_size
+        except Exception as e:
+            self.stats['files_skipped'] += 1
+            # Partially loaded lines stay searchable; later members must not reuse their ids
+            self._next_line_id = conn.execute('SELECT COALESCE(MAX(id), 0) + 1 FROM lines').fetchone()[0]
+            print(f"⚠️ Skipped {info.filename} in package search index: {e}")
+
+    def start_build(self, zip_path: str) -> None:
+        """Build the index on a background thread"""
+        self.status = 'building'
+        with self._zip_lock:
+            self.zip_path = zip_path
+            self._reading_zip = True
+        self._thread = threading.Thread(target=self.build, args=(zip_path,), daemon=True, name='package-search-index')
+        self._thread.start()
+
+    def search(self, query: str, file_filter: Optional[str] = None, context_lines: int = 2,
+               page: int = 1, page_size: int = 50) -> Dict[str, Any]:
+        """
+        Case-insensitive substring search, ordered by file and line number
+
+        Returns one page of matches, each with its file, line number and the
+        surrounding lines from the same file.
+        """
+        if self.status != 'ready':
+            raise RuntimeError(f"Search index is {self.status}")
+        query = (query or '').strip()
+        if not query:
+            raise ValueError("Search query is empty")
+
+        context_lines = max(0, min(int(context_lines), MAX_CONTEXT_LINES))
+        page = max(1, int(page))
+        page_size = max(1, min(int(page_size), MAX_PAGE_SIZE))
+        started = time.time()
+
+        conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)
+        try:
+            if len(query) >= MIN_INDEXED_QUERY_CHARS:
+                # FTS5 yields rowids in order, so a page stops scanning once it is full
+                match_sql = 'SELECT rowid AS id FROM lines_fts WHERE lines_fts MATCH ?'
+                params = ['"' + query.replace('"', '""') + '"']
+            else:
+                # Too short for trigrams - plain scan
+                escaped = query.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+                match_sql = "SELECT id FROM lines WHERE text LIKE ? ESCAPE '\\'"
+                params = [f"%{escaped}%"]
+            id_column = match_sql.split()[1]
+
+            if file_filter:
+                # Line ids are contiguous per member, so a file filter is a set of id ranges
+                ranges = conn.execute(
+                    'SELECT first_line_id, last_line_id FROM files WHERE name LIKE ? AND line_count > 0',
+                    (f"%{file_filter}%",)
+                ).fetchall()
+                if not ranges:
+                    ranges = [(0, -1)]
+                match_sql += ' AND (' + ' OR '.join(f'{id_column} BETWEEN ? AND ?' for _ in ranges) + ')'
+                params += [bound for id_range in ranges for bound in id_range]
+
+            counted = conn.execute(
+                f'SELECT COUNT(*) FROM ({match_sql} LIMIT ?)', params + [MAX_COUNTED_MATCHES + 1]
+            ).fetchone()[0]
+            match_ids = [row[0] for row in conn.execute(
+                f'{match_sql} ORDER BY {id_column} LIMIT ? OFFSET ?', params + [page_size, (page - 1) * page_size]
+            )]
+
+            matches = []
+            for line_id in match_ids:
+                file_id, file_name, line_no, text = conn.execute(
+                    'SELECT l.file_id, f.name, l.line_no, l.text FROM lines l JOIN files f ON f.id = l.file_id WHERE l.id = ?',
+                    (line_id,)
+                ).fetchone()
+                before = after = []
+                if context_lines:
+                    context = conn.execute(
+                        'SELECT id, text FROM lines WHERE id BETWEEN ? AND ? AND file_id = ? ORDER BY id',
+                        (line_id - context_lines, line_id + context_lines, file_id)
+                    ).fetchall()
+                    before = [t for i, t in context if i < line_id]
+                    after = [t for i, t in context if i > line_id]
+                matches.append({
+                    'file': file_name,
+                    'line_number': line_no,
+                    'line': text,
+                    'context_before': before,
+                    'context_after': after
+                })
+        finally:
+            conn.close()
+
+        total = min(counted, MAX_COUNTED_MATCHES)
+        return {
+            'query': query,
+            'file_filter': file_filter,
+            'total_matches': total,
+            'total_is_lower_bound': counted > MAX_COUNTED_MATCHES,
+            'page': page,
+            'page_size': page_size,
+            'total_pages': (total + page_size - 1) // page_size,
+            'matches': matches,
+            'elapsed_ms': round((time.time() - started) * 1000, 2)
+        }
+
+    def list_files(self) -> List[Dict[str, Any]]:
+        """Indexed members with their sizes and line counts"""
+        if self.status != 'ready':
+            return []
+        conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)
+        try:
+            return [
+                {'file': name, 'size': size, 'line_count': line_count}
+                for name, size, line_count in conn.execute('SELECT name, size, line_count FROM files ORDER BY id')
+            ]
+        finally:
+            conn.close()
+
+    def drop(self) -> None:
+        """
+        Cancel any running build and delete the index database
+
+        Does not wait for a running build: the build thread deletes the
+        database itself once it has stopped.
+        """
+        self._cancelled.set()
+        self.status = 'dropped'
+        with self._zip_lock:
+            if self._reading_zip:
+                self._remove_db = True
+                return
+        self._remove_db_files()
+
+    def _remove_db_files(self):
+        """Delete the index database and any SQLite side files"""
+        self.status = 'dropped'
+        for path in (self.db_path, self.db_path + '-journal', self.db_path + '-wal', self.db_path + '-shm'):
+            try:
+                if os.path.exists(path):
+                    os.remove(path)
+            except Exception as e:
+                print(f"⚠️ Failed to remove package search index {path}: {e}")
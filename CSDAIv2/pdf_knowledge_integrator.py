@@ -7,9 +7,11 @@ Processes proprietary Deep Security documentation for expert analysis
 import os
 import re
 import json
+import queue
 import sqlite3
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from pathlib import Path
 
 try:
@@ -19,15 +21,55 @@ except ImportError:
     PDF_AVAILABLE = False
     print("⚠️ PyPDF2 not available - PDF processing disabled")
 
+try:
+    from knowledge_vectors import KnowledgeVectorIndex, VECTOR_INDEX_AVAILABLE
+except ImportError:
+    VECTOR_INDEX_AVAILABLE = False
+
+# BM25 column weights of the section index (content, section_title, keywords)
+BM25_WEIGHTS = (1.0, 4.0, 2.0)
+# BM25 score reported as 50% relevance; relevance = score / (score + BM25_HALF_RELEVANCE_SCORE)
+BM25_HALF_RELEVANCE_SCORE = 5.0
+# Shorter query terms are dropped - as prefixes they match almost everything
+MIN_QUERY_TERM_CHARS = 2
+
+# Hybrid ranking: relevance = HYBRID_VECTOR_WEIGHT x vector similarity + the rest x BM25 relevance
+HYBRID_VECTOR_WEIGHT = 0.5
+# Keyword and vector candidates re-ranked per query
+HYBRID_CANDIDATES = 20
+
+# Reciprocal rank fusion of batched queries: score = sum of 1 / (RRF_K + rank) over the queries
+RRF_K = 60
+# Sections ranked per query before fusion
+RRF_QUERY_DEPTH = 10
+
+# Search tie-break: more actionable section types first
+SECTION_TYPE_ORDER_SQL = '''
+    CASE s.section_type
+        WHEN 'troubleshooting' THEN 1
+        WHEN 'best_practices' THEN 2
+        WHEN 'configuration' THEN 3
+        ELSE 4
+    END'''
+
 class PDFKnowledgeIntegrator:
     """Integrates proprietary Deep Security PDF knowledge with Dynamic RAG"""
     
-    def __init__(self, pdf_dir: str = "pdf", db_path: str = "knowledge_base/ds_knowledge.db"):
+    def __init__(self, pdf_dir: str = "pdf", db_path: str = "knowledge_base/ds_knowledge.db", read_pool_size: int = 4):
         self.pdf_dir = pdf_dir
         self.db_path = db_path
         self.knowledge_base = {}
         self.patterns = {}
         
+        # Idle read-only connections kept open between searches
+        self._read_pool = queue.LifoQueue(maxsize=max(1, read_pool_size))
+        self.fts_available = False
+        
+        # Passage vectors next to the database (knowledge_base/ds_knowledge_vectors/)
+        self.vector_index = None
+        if VECTOR_INDEX_AVAILABLE:
+            self.vector_index = KnowledgeVectorIndex(os.path.splitext(db_path)[0] + '_vectors')
+        
         # Ensure knowledge base directory exists
         os.makedirs(os.path.dirname(db_path), exist_ok=True)
         
@@ -79,12 +121,77 @@ class PDFKnowledgeIntegrator:
             ''')
             
             conn.commit()
+            self._init_fts_index(conn)
             conn.close()
             print("✅ PDF Knowledge database initialized")
             
         except Exception as e:
             print(f"⚠️ Knowledge DB initialization failed: {e}")
     
+    def _init_fts_index(self, conn: sqlite3.Connection):
+        """Mirror pdf_sections into an FTS5 index that triggers keep in sync"""
+        try:
+            existed = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'pdf_sections_fts'"
+            ).fetchone()
+            conn.executescript('''
+                CREATE VIRTUAL TABLE IF NOT EXISTS pdf_sections_fts USING fts5(
+                    content, section_title, keywords,
+                    content='pdf_sections', content_rowid='id',
+                    tokenize='porter unicode61', prefix='2 3'
+                );
+                CREATE TRIGGER IF NOT EXISTS pdf_sections_fts_insert AFTER INSERT ON pdf_sections BEGIN
+                    INSERT INTO pdf_sections_fts (rowid, content, section_title, keywords)
+                    VALUES (new.id, new.content, new.section_title, new.keywords);
+                END;
+                CREATE TRIGGER IF NOT EXISTS pdf_sections_fts_delete AFTER DELETE ON pdf_sections BEGIN
+                    INSERT INTO pdf_sections_fts (pdf_sections_fts, rowid, content, section_title, keywords)
+                    VALUES ('delete', old.id, old.content, old.section_title, old.keywords);
+                END;
+                CREATE TRIGGER IF NOT EXISTS pdf_sections_fts_update AFTER UPDATE ON pdf_sections BEGIN
+                    INSERT INTO pdf_sections_fts (pdf_sections_fts, rowid, content, section_title, keywords)
+                    VALUES ('delete', old.id, old.content, old.section_title, old.keywords);
+                    INSERT INTO pdf_sections_fts (rowid, content, section_title, keywords)
+                    VALUES (new.id, new.content, new.section_title, new.keywords);
+                END;
+            ''')
+            if not existed:
+                # Sections stored before the index existed
+                conn.execute("INSERT INTO pdf_sections_fts (pdf_sections_fts) VALUES ('rebuild')")
+                conn.commit()
+            self.fts_available = True
+        except sqlite3.Error as e:
+            print(f"⚠️ Knowledge FTS5 index unavailable, searches will scan sections: {e}")
+    
+    @contextmanager
+    def _read_connection(self):
+        """Borrow a warm read-only connection; it goes back to the pool unless the query failed"""
+        try:
+            conn = self._read_pool.get_nowait()
+        except queue.Empty:
+            conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True, check_same_thread=False)
+        
+        reusable = False
+        try:
+            yield conn
+            reusable = True
+        finally:
+            if reusable:
+                try:
+                    self._read_pool.put_nowait(conn)
+                except queue.Full:
+                    conn.close()
+            else:
+                conn.close()
+    
+    def close(self):
+        """Close the pooled read connections"""
+        while True:
+            try:
+                self._read_pool.get_nowait().close()
+            except queue.Empty:
+                break
+    
     def process_all_pdfs(self):
         """Process all PDF files in the pdf directory"""
         if not PDF_AVAILABLE:
@@ -111,6 +218,7 @@ class PDFKnowledgeIntegrator:
         
         print(f"✅ Successfully processed {processed_count}/{len(pdf_files)} PDF files")
         self.build_knowledge_patterns()
+        self.build_vector_index()
         
     def process_single_pdf(self, filename: str) -> bool:
         """Process a single PDF file"""
@@ -364,6 +472,20 @@ class PDFKnowledgeIntegrator:
         except Exception as e:
             print(f"❌ Error building patterns: {e}")
     
+    def build_vector_index(self) -> Dict[str, Any]:
+        """Sync the passage vector index with the stored sections (new sections are appended)"""
+        if self.vector_index is None:
+            return {'status': 'unavailable'}
+        try:
+            conn = sqlite3.connect(self.db_path)
+            stats = self.vector_index.sync(conn)
+            conn.close()
+            print(f"✅ Knowledge vector index {stats['status']}: {stats.get('passages', 0)} passages")
+            return stats
+        except Exception as e:
+            print(f"❌ Error building vector index: {e}")
+            return {'status': 'failed', 'error': str(e)}
+    
     def extract_troubleshooting_patterns(self, content: str, source_doc: str) -> List[Dict]:
         """Extract troubleshooting patterns from content"""
         patterns = []
@@ -450,12 +572,153 @@ class PDFKnowledgeIntegrator:
         except Exception as e:
             return False
     
+    @staticmethod
+    def _fts_queries(query: str) -> List[str]:
+        """FTS5 match expressions for the query terms as prefixes: all terms, then any term"""
+        terms = [f'"{term}"*' for term in dict.fromkeys(re.findall(r'\w+', query.lower()))
+                 if len(term) >= MIN_QUERY_TERM_CHARS]
+        if len(terms) < 2:
+            return terms
+        return [' AND '.join(terms), ' OR '.join(terms)]
+    
+    @staticmethod
+    def _format_search_result(row: tuple, relevance_score: float) -> Dict[str, Any]:
+        """Search result from a (title, section, content, page, type, filename) row"""
+        return {
+            'document_title': row[0],
+            'section_title': row[1],
+            'content': row[2][:1000] + "..." if len(row[2]) > 1000 else row[2],
+            'page_number': row[3],
+            'section_type': row[4],
+            'source_file': row[5],
+            'relevance_score': relevance_score
+        }
+    
+    def _ranked_sections(self, conn: sqlite3.Connection, query: str, component: Optional[str],
+                         max_results: int) -> List[Tuple[Any, Dict]]:
+        """
+        (section id, result) pairs for one query, best first
+        
+        With a vector index, BM25 candidates and the sections of the nearest passages are
+        merged and re-ranked on a blend of keyword and vector similarity.
+        """
+        component_clause = 'AND s.section_type = ?' if component else ''
+        component_params = [component] if component else []
+        columns = 'd.title, s.section_title, s.content, s.page_number, s.section_type, d.filename, {} AS score, s.id'
+        bm25_score = f"-bm25(pdf_sections_fts, {', '.join(map(str, BM25_WEIGHTS))})"
+        sql = f'''
+            SELECT {columns.format(bm25_score)}
+            FROM pdf_sections_fts
+            JOIN pdf_sections s ON s.id = pdf_sections_fts.rowid
+            JOIN pdf_documents d ON s.doc_id = d.id
+            WHERE pdf_sections_fts MATCH ? {component_clause}
+            ORDER BY score DESC, {SECTION_TYPE_ORDER_SQL}
+            LIMIT ?
+        '''
+        depth = max(max_results, HYBRID_CANDIDATES) if self.vector_index is not None else max_results
+        
+        results = {}
+        for match in self._fts_queries(query):
+            for result in conn.execute(sql, [match] + component_params + [depth]):
+                results.setdefault(result[7], result)
+            if len(results) >= depth:
+                break
+        relevance = {section_id: result[6] / (result[6] + BM25_HALF_RELEVANCE_SCORE)
+                     for section_id, result in results.items()}
+        
+        vector_scores = {}
+        if self.vector_index is not None:
+            vector_scores = self.vector_index.section_scores(query, list(results), HYBRID_CANDIDATES)
+        if vector_scores:
+            # Sections found only by vector similarity
+            missing = [section_id for section_id in vector_scores if section_id not in results]
+            if missing:
+                for result in conn.execute(f'''
+                    SELECT {columns.format('0.0')}
+                    FROM pdf_sections s
+                    JOIN pdf_documents d ON s.doc_id = d.id
+                    WHERE s.id IN ({','.join('?' * len(missing))}) {component_clause}
+                ''', missing + component_params):
+                    results[result[7]] = result
+                    relevance[result[7]] = 0.0
+            relevance = {
+                section_id: HYBRID_VECTOR_WEIGHT * max(vector_scores.get(section_id, 0.0), 0.0)
+                + (1 - HYBRID_VECTOR_WEIGHT) * keyword_relevance
+                for section_id, keyword_relevance in relevance.items()
+            }
+            ranked = sorted(results, key=relevance.get, reverse=True)
+        else:
+            ranked = list(results)
+        
+        return [
+            (section_id, self._format_search_result(results[section_id], round(relevance[section_id], 4)))
+            for section_id in ranked[:max_results]
+        ]
+    
     def search_knowledge(self, query: str, component: str = None, max_results: int = 5) -> List[Dict]:
-        """Search processed PDF knowledge"""
+        """
+        Search processed PDF knowledge, ranked by BM25 over section content, titles and keywords
+        
+        Sections matching every query term come first; sections matching only some
+        terms fill the remaining slots. Ranking only scores matching sections, so
+        selective queries stay fast as the corpus grows.
+        """
+        if not self.fts_available:
+            return self._scan_knowledge(query, component, max_results)
+        
+        try:
+            with self._read_connection() as conn:
+                return [result for _, result in self._ranked_sections(conn, query, component, max_results)]
+        
+        except Exception as e:
+            print(f"❌ Knowledge search error: {e}")
+            return []
+    
+    def search_knowledge_batch(self, queries: List[Tuple[str, Optional[str]]], max_results: int = 8,
+                               per_query_results: int = RRF_QUERY_DEPTH) -> List[Dict]:
+        """
+        Search several (query, component) pairs in one pass over a single pooled connection
+        
+        Each query's ranked sections are fused with reciprocal rank fusion, so sections
+        that several queries rank highly come first. Each result keeps its best BM25
+        relevance_score and adds fusion_score and matched_queries.
+        """
+        fused = {}
+        try:
+            if self.fts_available:
+                with self._read_connection() as conn:
+                    ranked_lists = [
+                        self._ranked_sections(conn, query, component, per_query_results)
+                        for query, component in queries
+                    ]
+            else:
+                ranked_lists = [
+                    [((r['source_file'], r['page_number'], r['section_title']), r)
+                     for r in self._scan_knowledge(query, component, per_query_results)]
+                    for query, component in queries
+                ]
+            
+            for ranked in ranked_lists:
+                for rank, (section_id, result) in enumerate(ranked, 1):
+                    entry = fused.get(section_id)
+                    if entry is None:
+                        entry = fused[section_id] = dict(result, fusion_score=0.0, matched_queries=0)
+                    entry['fusion_score'] += 1.0 / (RRF_K + rank)
+                    entry['matched_queries'] += 1
+                    entry['relevance_score'] = max(entry['relevance_score'], result['relevance_score'])
+        
+        except Exception as e:
+            print(f"❌ Batched knowledge search error: {e}")
+            return []
+        
+        results = sorted(fused.values(), key=lambda r: (r['fusion_score'], r['relevance_score']), reverse=True)
+        for result in results:
+            result['fusion_score'] = round(result['fusion_score'], 6)
+        return results[:max_results]
+    
+    def _scan_knowledge(self, query: str, component: str = None, max_results: int = 5) -> List[Dict]:
+        """Keyword scan of every section, for SQLite builds without FTS5"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
             # Build search query
             search_terms = query.lower().split()
             where_conditions = []
@@ -486,37 +749,17 @@ class PDFKnowledgeIntegrator:
                 FROM pdf_sections s
                 JOIN pdf_documents d ON s.doc_id = d.id
                 WHERE {where_clause}
-                ORDER BY 
-                    CASE s.section_type
-                        WHEN 'troubleshooting' THEN 1
-                        WHEN 'best_practices' THEN 2
-                        WHEN 'configuration' THEN 3
-                        ELSE 4
-                    END,
+                ORDER BY {SECTION_TYPE_ORDER_SQL},
                     LENGTH(s.content) DESC
                 LIMIT ?
             '''
             
             params.append(max_results)
-            cursor.execute(sql, params)
-            results = cursor.fetchall()
-            
-            conn.close()
-            
-            # Format results
-            formatted_results = []
-            for result in results:
-                formatted_results.append({
-                    'document_title': result[0],
-                    'section_title': result[1],
-                    'content': result[2][:1000] + "..." if len(result[2]) > 1000 else result[2],
-                    'page_number': result[3],
-                    'section_type': result[4],
-                    'source_file': result[5],
-                    'relevance_score': 0.8  # Base relevance score
-                })
+            with self._read_connection() as conn:
+                results = conn.execute(sql, params).fetchall()
             
-            return formatted_results
+            # Unranked matches share a base relevance score
+            return [self._format_search_result(result, 0.8) for result in results]
             
         except Exception as e:
             print(f"❌ Knowledge search error: {e}")
@@ -525,18 +768,13 @@ class PDFKnowledgeIntegrator:
     def get_patterns_for_component(self, component: str) -> List[Dict]:
         """Get troubleshooting patterns for specific component"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                SELECT pattern_name, pattern_regex, severity, resolution, confidence_score
-                FROM ds_patterns 
-                WHERE component = ?
-                ORDER BY confidence_score DESC
-            ''', (component,))
-            
-            results = cursor.fetchall()
-            conn.close()
+            with self._read_connection() as conn:
+                results = conn.execute('''
+                    SELECT pattern_name, pattern_regex, severity, resolution, confidence_score
+                    FROM ds_patterns 
+                    WHERE component = ?
+                    ORDER BY confidence_score DESC
+                ''', (component,)).fetchall()
             
             patterns = []
             for result in results:
@@ -554,29 +792,34 @@ class PDFKnowledgeIntegrator:
             print(f"❌ Pattern retrieval error: {e}")
             return []
     
+    def knowledge_version(self) -> Dict[str, Any]:
+        """Fingerprint of the stored documents, sections, patterns and vector index"""
+        with self._read_connection() as conn:
+            documents = conn.execute('SELECT COUNT(*), MAX(id), MAX(processed_date) FROM pdf_documents').fetchone()
+            sections = conn.execute('SELECT COUNT(*), MAX(id) FROM pdf_sections').fetchone()
+            patterns = conn.execute('SELECT COUNT(*), MAX(id) FROM ds_patterns').fetchone()
+        return {
+            'documents': list(documents),
+            'sections': list(sections),
+            'patterns': list(patterns),
+            'vector_index': self.vector_index.version() if self.vector_index else None
+        }
+    
     def get_knowledge_stats(self) -> Dict[str, Any]:
         """Get statistics about processed knowledge"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Document stats
-            cursor.execute('SELECT COUNT(*) FROM pdf_documents')
-            doc_count = cursor.fetchone()[0]
-            
-            # Section stats
-            cursor.execute('SELECT COUNT(*) FROM pdf_sections')
-            section_count = cursor.fetchone()[0]
-            
-            # Pattern stats
-            cursor.execute('SELECT COUNT(*) FROM ds_patterns')
-            pattern_count = cursor.fetchone()[0]
-            
-            # Section type breakdown
-            cursor.execute('SELECT section_type, COUNT(*) FROM pdf_sections GROUP BY section_type')
-            section_types = dict(cursor.fetchall())
-            
-            conn.close()
+            with self._read_connection() as conn:
+                # Document stats
+                doc_count = conn.execute('SELECT COUNT(*) FROM pdf_documents').fetchone()[0]
+                
+                # Section stats
+                section_count = conn.execute('SELECT COUNT(*) FROM pdf_sections').fetchone()[0]
+                
+                # Pattern stats
+                pattern_count = conn.execute('SELECT COUNT(*) FROM ds_patterns').fetchone()[0]
+                
+                # Section type breakdown
+                section_types = dict(conn.execute('SELECT section_type, COUNT(*) FROM pdf_sections GROUP BY section_type').fetchall())
             
             return {
                 'total_documents': doc_count,
@@ -584,6 +827,7 @@ class PDFKnowledgeIntegrator:
                 'total_patterns': pattern_count,
                 'section_types': section_types,
                 'pdf_processing_available': PDF_AVAILABLE,
+                'vector_index': self.vector_index.get_stats() if self.vector_index is not None else None,
                 'database_path': self.db_path
             }
             
@@ -3,10 +3,15 @@ Security utilities for the CSD AntiVirus Conflict Analyzer
 Contains functions to handle security-related operations safely
 """
 import os
+import re
+import codecs
+import hashlib
 import tempfile
+import threading
 import uuid
+from collections import OrderedDict
 from werkzeug.utils import secure_filename
-from typing import Optional, List
+from typing import Optional, List, Tuple, Union
 import xml.etree.ElementTree as ET
 from xml.parsers.expat import ExpatError
 
@@ -61,16 +66,22 @@ def validate_file(file) -> str:
     
     return file_type
 
-def create_secure_temp_file(file, temp_dir: str = "temp") -> str:
+UPLOAD_STREAM_CHUNK_SIZE = 1024 * 1024
+
+def create_secure_temp_file(file, temp_dir: str = "temp", return_digest: bool = False) -> Union[str, Tuple[str, str]]:
     """
     Create a secure temporary file from uploaded file
     
+    The upload is streamed to disk in chunks and SHA-256 hashed on the way,
+    so callers can content-address the file without reading it twice.
+    
     Args:
         file: Flask file object
         temp_dir: Directory for temporary files
+        return_digest: Also return the hex SHA-256 of the file content
         
     Returns:
-        str: Path to secure temporary file
+        str: Path to secure temporary file, or (path, sha256) when return_digest is set
         
     Raises:
         SecurityError: If file operations fail
@@ -93,14 +104,149 @@ def create_secure_temp_file(file, temp_dir: str = "temp") -> str:
         temp_filename = f"upload_{unique_id}{file_ext}"
         temp_path = os.path.join(temp_dir, temp_filename)
         
-        # Save file securely
-        file.save(temp_path)
+        # Save file securely, hashing each chunk as it is written
+        digest = hashlib.sha256()
+        stream = getattr(file, 'stream', file)
+        with open(temp_path, 'wb') as out:
+            while True:
+                chunk = stream.read(UPLOAD_STREAM_CHUNK_SIZE)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                out.write(chunk)
         
+        if return_digest:
+            return temp_path, digest.hexdigest()
         return temp_path
         
     except Exception as e:
         raise SecurityError(f"Failed to create secure temporary file: {str(e)}")
 
+# Streaming XML validation settings
+XML_STREAM_CHUNK_SIZE = 64 * 1024
+
+DANGEROUS_XML_PATTERNS = [
+    '<!entity',     # External entities
+    '<!doctype',    # Document type declarations with external entities
+    'file://',      # File protocol
+    'ftp://',       # FTP protocol
+    'jar://',       # JAR protocol
+    'netdoc://',    # NetDoc protocol
+    'gopher://',    # Gopher protocol
+    'ldap://',      # LDAP protocol
+]
+
+# More specific system-related patterns that are actually dangerous
+DANGEROUS_XML_SYSTEM_PATTERNS = [
+    'system(',           # System function calls
+    'system "',          # System command execution
+    'system\'',          # System command execution with single quotes
+    '<!entity system',   # External system entity
+    'system public',     # System public identifier
+]
+
+STANDARD_XML_ENTITIES = ['&quot;', '&amp;', '&lt;', '&gt;', '&apos;']
+MAX_NON_STANDARD_ENTITIES = 500
+# Named entity references other than the five predefined ones, and parameter entity
+# declarations - bare '&' / '%' characters (e.g. msinfo's %SystemRoot% paths) are not counted
+NON_STANDARD_ENTITY_PATTERN = re.compile(
+    r'&(?!(?:' + '|'.join(entity[1:-1] for entity in STANDARD_XML_ENTITIES) + r');)[a-z_:][\w.:-]*;|<!entity\s+%'
+)
+
+class XMLSecurityScanner:
+    """Incremental security scanner applied to raw XML bytes before they reach the parser"""
+    
+    def __init__(self):
+        self.entity_count = 0
+        self._tail = ''
+        self._overlap = max(len(p) for p in DANGEROUS_XML_PATTERNS + DANGEROUS_XML_SYSTEM_PATTERNS) - 1
+        self._decoder = None
+    
+    @staticmethod
+    def _detect_encoding(first_chunk: bytes) -> str:
+        """Pick the decoder from the byte order mark (UTF-16 exports such as msinfo.nfo)"""
+        if first_chunk.startswith(codecs.BOM_UTF16_LE):
+            return 'utf-16-le'
+        if first_chunk.startswith(codecs.BOM_UTF16_BE):
+            return 'utf-16-be'
+        return 'utf-8'
+    
+    def feed(self, chunk: bytes) -> None:
+        """
+        Scan the next chunk of raw XML
+        
+        Raises:
+            SecurityError: If the chunk contains dangerous declarations or entity abuse
+        """
+        if self._decoder is None:
+            self._decoder = codecs.getincrementaldecoder(self._detect_encoding(chunk))(errors='ignore')
+        # Incremental decoding keeps multi-byte characters split across chunks intact
+        text = self._decoder.decode(chunk).lower()
+        # Carry the previous chunk's tail so patterns split across chunks are still caught
+        window = self._tail + text
+        
+        for pattern in DANGEROUS_XML_PATTERNS:
+            if pattern in window:
+                raise SecurityError(f"Potentially dangerous XML pattern detected: {pattern}")
+        
+        for pattern in DANGEROUS_XML_SYSTEM_PATTERNS:
+            if pattern in window:
+                raise SecurityError(f"Potentially dangerous XML system pattern detected: {pattern}")
+        
+        # Check for excessive entity references (billion laughs attack)
+        # Matches ending inside the carried tail were counted with the previous chunk
+        tail_length = len(self._tail)
+        self.entity_count += sum(
+            1 for match in NON_STANDARD_ENTITY_PATTERN.finditer(window) if match.end() > tail_length
+        )
+        
+        # Allow reasonable number of non-standard entities
+        if self.entity_count > MAX_NON_STANDARD_ENTITIES:
+            raise SecurityError("Excessive non-standard entity references detected")
+        
+        self._tail = window[-self._overlap:]
+
+def iter_xml_events(xml_path: str, events=('start', 'end')):
+    """
+    Stream parse events from an XML file with security checks applied as it is read
+    
+    Each chunk is scanned before it is fed to the pull parser, so DOCTYPE/ENTITY
+    declarations are rejected before expat ever processes them. Callers are
+    responsible for clearing elements they no longer need.
+    
+    Args:
+        xml_path: Path to XML file
+        events: ElementTree event names to report
+        
+    Yields:
+        tuple: (event, element) pairs as produced by ET.XMLPullParser
+        
+    Raises:
+        SecurityError: If XML contains security issues or is malformed
+    """
+    scanner = XMLSecurityScanner()
+    parser = ET.XMLPullParser(events=events)
+    
+    try:
+        with open(xml_path, 'rb') as f:
+            while True:
+                chunk = f.read(XML_STREAM_CHUNK_SIZE)
+                if not chunk:
+                    break
+                scanner.feed(chunk)
+                parser.feed(chunk)
+                yield from parser.read_events()
+        
+        parser.close()
+        yield from parser.read_events()
+        
+    except SecurityError:
+        raise
+    except (ET.ParseError, ExpatError) as e:
+        raise SecurityError(f"Invalid XML format: {str(e)}")
+    except Exception as e:
+        raise SecurityError(f"XML validation failed: {str(e)}")
+
 def validate_xml_content(xml_path: str) -> bool:
     """
     Validate XML content for security issues
@@ -114,70 +260,80 @@ def validate_xml_content(xml_path: str) -> bool:
     Raises:
         SecurityError: If XML contains security issues
     """
-    try:
-        with open(xml_path, 'rb') as f:
-            content = f.read()
-            
-        # Check for potentially dangerous XML features
-        content_str = content.decode('utf-8', errors='ignore').lower()
-        
-        dangerous_patterns = [
-            '<!entity',     # External entities
-            '<!doctype',    # Document type declarations with external entities
-            'file://',      # File protocol
-            'ftp://',       # FTP protocol
-            'jar://',       # JAR protocol
-            'netdoc://',    # NetDoc protocol
-            'gopher://',    # Gopher protocol
-            'ldap://',      # LDAP protocol
-        ]
-        
-        # More specific system-related patterns that are actually dangerous
-        dangerous_system_patterns = [
-            'system(',           # System function calls
-            'system "',          # System command execution
-            'system\'',          # System command execution with single quotes
-            '<!entity system',   # External system entity
-            'system public',     # System public identifier
-        ]
-        
-        for pattern in dangerous_patterns:
-            if pattern in content_str:
-                raise SecurityError(f"Potentially dangerous XML pattern detected: {pattern}")
-        
-        for pattern in dangerous_system_patterns:
-            if pattern in content_str:
-                raise SecurityError(f"Potentially dangerous XML system pattern detected: {pattern}")
-        
-        # Check for excessive entity references (billion laughs attack)
-        # Count only potentially dangerous entities, not standard HTML entities
-        dangerous_entity_patterns = ['&[a-zA-Z]+;', '%[a-zA-Z]+;']
-        standard_html_entities = ['&quot;', '&amp;', '&lt;', '&gt;', '&apos;']
+    # Single streaming pass: only 'end' events, each element cleared once seen
+    for _, elem in iter_xml_events(xml_path, events=('end',)):
+        elem.clear()
+    
+    return True
+
+# Shared results for RunningProcesses.xml so conflict and resource analysis parse a file once
+_RUNNING_PROCESSES_CACHE_SIZE = 16
+_running_processes_cache = OrderedDict()
+_running_processes_lock = threading.Lock()
+
+def extract_running_processes(xml_path: str) -> List[str]:
+    """
+    Validate and extract sanitized process names from RunningProcesses.xml in one streaming pass
+    
+    Reads HostMetaData/Attribute[name=process] values while discarding each
+    HostMetaData subtree once processed, so memory stays flat for large hosts.
+    Results are memoized per (path, mtime, size) so analyzers sharing a file reuse them.
+    
+    Args:
+        xml_path: Path to RunningProcesses.xml
         
-        # Count total entities
-        total_entities = content_str.count('&') + content_str.count('%')
+    Returns:
+        List[str]: Sanitized process names in document order
         
-        # Subtract standard HTML entities from the count
-        for entity in standard_html_entities:
-            total_entities -= content_str.count(entity.lower())
+    Raises:
+        SecurityError: If XML contains security issues or is malformed
+    """
+    try:
+        stat = os.stat(xml_path)
+    except OSError as e:
+        raise SecurityError(f"XML validation failed: {str(e)}")
+    
+    cache_key = (os.path.abspath(xml_path), stat.st_mtime_ns, stat.st_size)
+    with _running_processes_lock:
+        if cache_key in _running_processes_cache:
+            _running_processes_cache.move_to_end(cache_key)
+            return list(_running_processes_cache[cache_key])
+    
+    processes = []
+    element_stack = []
+    host_depth = 0
+    
+    for event, elem in iter_xml_events(xml_path):
+        if event == 'start':
+            # The document root itself is not a HostMetaData match (mirrors findall(".//HostMetaData"))
+            if element_stack and elem.tag == 'HostMetaData':
+                host_depth += 1
+            element_stack.append(elem)
+            continue
         
-        # Allow reasonable number of non-standard entities
-        if total_entities > 500:  # Increased limit for legitimate use
-            raise SecurityError("Excessive non-standard entity references detected")
+        element_stack.pop()
+        parent = element_stack[-1] if element_stack else None
         
-        # Try to parse the XML safely without setting readonly attributes
-        try:
-            # Use defusedxml approach - disable dangerous features by not enabling them
-            ET.fromstring(content)
-        except ET.ParseError as e:
-            raise SecurityError(f"Invalid XML format: {str(e)}")
+        if host_depth and elem.tag == 'Attribute' and elem.attrib.get('name') == 'process':
+            proc_name = elem.attrib.get('value')
+            if proc_name:
+                sanitized_name = sanitize_process_name(proc_name)
+                if sanitized_name:
+                    processes.append(sanitized_name)
         
-        return True
+        if parent is not None and elem.tag == 'HostMetaData':
+            host_depth -= 1
         
-    except ExpatError as e:
-        raise SecurityError(f"Invalid XML format: {str(e)}")
-    except Exception as e:
-        raise SecurityError(f"XML validation failed: {str(e)}")
+        # Drop finished subtrees that are not inside an open HostMetaData
+        if parent is not None and host_depth == 0:
+            parent.remove(elem)
+    
+    with _running_processes_lock:
+        _running_processes_cache[cache_key] = tuple(processes)
+        while len(_running_processes_cache) > _RUNNING_PROCESSES_CACHE_SIZE:
+            _running_processes_cache.popitem(last=False)
+    
+    return processes
 
 def sanitize_process_name(process_name: str) -> str:
     """
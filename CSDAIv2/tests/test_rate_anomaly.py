@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+"""Regression tests for the per-component rate anomaly detector"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from analyzers import rate_anomaly
+from analyzers.rate_anomaly import RateAnomalyDetector
+
+
+def _label(minute):
+    return str(np.datetime64('2024-01-01T00:00') + np.timedelta64(minute, 'm')).replace('T', ' ')
+
+
+def test_out_of_order_chunks_stay_in_window(monkeypatch):
+    monkeypatch.setattr(rate_anomaly, 'CHUNK_ENTRIES', 100)
+    detector = RateAnomalyDetector()
+    # Later minutes arrive first, as with a rotated log read newest file first
+    for minute in list(range(200, 400)) + list(range(0, 200)):
+        detector.add('Engine', _label(minute), False)
+    result = detector.result()
+    assert result['entries_out_of_window'] == 0
+    assert result['window_start'] == _label(0)
+    assert result['window_minutes'] == 400
+    assert int(detector.counts.sum()) == 400
+
+
+def test_per_component_totals_are_not_truncated(monkeypatch):
+    monkeypatch.setattr(rate_anomaly, 'MAX_REPORTED_EVENTS', 1)
+    detector = RateAnomalyDetector()
+    for component, burst_errors in (('Big', 50), ('Small', 20)):
+        for minute in range(120):
+            detector.add(component, _label(minute), False)
+        for _ in range(burst_errors):
+            detector.add(component, _label(60), True)
+    result = detector.result()
+    assert len(result['bursts']) == 1
+    assert result['burst_count'] == 2
+    assert result['per_component']['Small']['burst_count'] == 1
+    assert result['per_component']['Small']['burst_errors'] == 20
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""
+Regression tests for the streaming XML security scanner
+Entity-expansion limits must only count real entity references, not the bare '%' / '&'
+characters that ordinary diagnostic exports are full of
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from security import XMLSecurityScanner, SecurityError, MAX_NON_STANDARD_ENTITIES
+from analyzers.xml_artifacts import extract_xml_artifacts
+
+
+def write_msinfo(path, driver_count):
+    """UTF-16 msinfo32 export whose driver paths use %SystemRoot%-style variables"""
+    drivers = ''.join(
+        '<Data><Name>drv{0}</Name><Type>File System Driver</Type><State>Running</State>'
+        '<Start_Mode>Boot</Start_Mode><File>%SystemRoot%\\system32\\drivers\\drv{0}.sys</File></Data>'.format(i)
+        for i in range(driver_count)
+    )
+    content = (
+        '<?xml version="1.0"?><MsInfo><Category name="System Summary">'
+        '<Data><Item>Version</Item><Value>10.0.17763 Build 17763</Value></Data>'
+        '<Data><Item>Boot Device</Item><Value>%SystemDrive% &amp; %WinDir%</Value></Data>'
+        '</Category><Category name="Software Environment"><Category name="System Drivers">'
+        + drivers +
+        '</Category></Category></MsInfo>'
+    )
+    with open(path, 'wb') as f:
+        f.write(b'\xff\xfe' + content.encode('utf-16-le'))
+
+
+def test_percent_variables_in_msinfo_are_not_entities(tmp_path):
+    path = tmp_path / 'msinfo.nfo'
+    write_msinfo(str(path), MAX_NON_STANDARD_ENTITIES + 100)
+
+    artifacts = extract_xml_artifacts([str(path)])
+
+    assert 'error' not in artifacts['msinfo']
+    assert artifacts['msinfo']['driver_count'] == MAX_NON_STANDARD_ENTITIES + 100
+    assert artifacts['msinfo']['os_build'] == '17763'
+
+
+def test_named_entity_references_are_limited():
+    scanner = XMLSecurityScanner()
+    scanner.feed(b'<root>' + b'&amp;&lt;&#160;%PATH%;' * 1000)
+    assert scanner.entity_count == 0
+
+    with pytest.raises(SecurityError):
+        scanner.feed(b'&lol;' * (MAX_NON_STANDARD_ENTITIES + 1))
+
+
+def test_entity_references_split_across_chunks_are_counted_once():
+    scanner = XMLSecurityScanner()
+    for _ in range(10):
+        scanner.feed(b'x' * 100 + b'&lo')
+        scanner.feed(b'l;')
+    assert scanner.entity_count == 10
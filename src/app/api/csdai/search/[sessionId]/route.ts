@@ -0,0 +1,36 @@
+import { NextRequest, NextResponse } from 'next/server';
+
+const BACKEND_URL = 'http://localhost:5003';
+
+export async function GET(
+  request: NextRequest,
+  { params }: { params: Promise<{ sessionId: string }> }
+) {
+  try {
+    const { sessionId } = await params;
+    
+    // Forward q, file, context, page and page_size unchanged
+    const response = await fetch(`${BACKEND_URL}/search/${sessionId}?${request.nextUrl.searchParams.toString()}`, {
+      method: 'GET',
+      headers: {
+        'Content-Type': 'application/json',
+      },
+    });
+
+    const data = await response.json();
+    
+    return NextResponse.json(data, { 
+      status: response.status,
+      headers: {
+        'Access-Control-Allow-Origin': '*',
+        'Access-Control-Allow-Methods': 'GET, OPTIONS',
+        'Access-Control-Allow-Headers': 'Content-Type',
+      }
+    });
+  } catch (error) {
+    return NextResponse.json({ 
+      success: false, 
+      error: error instanceof Error ? error.message : 'Package search failed'
+    }, { status: 500 });
+  }
+}